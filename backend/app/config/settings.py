@@ -1,5 +1,7 @@
 # Default settings for Analysis module
 # These act as defaults; runtime overrides are stored in data/analysis/config.json
+import json
+import os
 
 # Columns that should be excluded from numeric statistics by default
 EXCLUDED_COLUMNS = [
@@ -40,3 +42,83 @@ CODE_COLUMNS = [
 # For example, when viewing 'ProductCategory', we list the SKUs within it.
 # This should be a column with high cardinality that uniquely identifies items.
 PRIMARY_CODE_COLUMN = "SKU"
+
+
+# --- Forecast engine ---
+# Number of worker processes used to fit series in parallel (0 -> os.cpu_count(), 1 -> always serial)
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", "0"))
+
+# Uploads with fewer series than this are fitted serially; the process pool only pays off on larger inputs
+FORECAST_PARALLEL_MIN_SERIES = int(os.getenv("FORECAST_PARALLEL_MIN_SERIES", "32"))
+
+# Start method of the pool workers: forkserver or spawn (fork is unsafe in the multi-threaded server)
+FORECAST_POOL_START_METHOD = os.getenv("FORECAST_POOL_START_METHOD", "forkserver")
+
+# Number of series sent to a worker per task (0 -> about 4 chunks per worker)
+FORECAST_CHUNK_SIZE = int(os.getenv("FORECAST_CHUNK_SIZE", "0"))
+
+# time_budget_ms: share of the budget kept for building the response once fitting stops,
+# and the number of series per task once a deadline is set (serial path and process pool)
+FORECAST_BUDGET_RESERVE = float(os.getenv("FORECAST_BUDGET_RESERVE", "0.1"))
+FORECAST_BUDGET_CHUNK_SIZE = int(os.getenv("FORECAST_BUDGET_CHUNK_SIZE", "4"))
+
+# Forecast jobs (/forecast/jobs/*): worker threads, max queued+running jobs, finished jobs kept in memory
+FORECAST_JOB_WORKERS = int(os.getenv("FORECAST_JOB_WORKERS", "2"))
+FORECAST_JOB_MAX_PENDING = int(os.getenv("FORECAST_JOB_MAX_PENDING", "16"))
+FORECAST_JOB_RETENTION = int(os.getenv("FORECAST_JOB_RETENTION", "100"))
+
+# Forecast result cache (data/forecast/cache): size budgets of the in-memory LRU (results are kept pickled,
+# the budget counts those bytes) and of the on-disk layer
+FORECAST_CACHE_ENABLED = os.getenv("FORECAST_CACHE_ENABLED", "true").lower() == "true"
+FORECAST_CACHE_MEMORY_BYTES = int(os.getenv("FORECAST_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+FORECAST_CACHE_DISK_BYTES = int(os.getenv("FORECAST_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+
+# Random forest budget for model=rf (defaults reproduce the original 200 fully grown trees)
+RF_N_ESTIMATORS = int(os.getenv("RF_N_ESTIMATORS", "200"))
+RF_MAX_DEPTH = int(os.getenv("RF_MAX_DEPTH", "0"))  # 0 -> unlimited
+# Cores used to build trees when fitting outside the process pool (-1 -> all cores)
+RF_N_JOBS = int(os.getenv("RF_N_JOBS", "-1"))
+# Number of compiled forests rolled out together; bounds the memory held by tree tables
+RF_ROLLOUT_BATCH = int(os.getenv("RF_ROLLOUT_BATCH", "32"))
+
+# Pooled model for model=global_rf / global_linreg (one regressor trained across all series)
+GLOBAL_RF_N_ESTIMATORS = int(os.getenv("GLOBAL_RF_N_ESTIMATORS", "100"))
+GLOBAL_RF_MAX_DEPTH = int(os.getenv("GLOBAL_RF_MAX_DEPTH", "12"))  # 0 -> unlimited
+GLOBAL_RF_MIN_SAMPLES_LEAF = int(os.getenv("GLOBAL_RF_MIN_SAMPLES_LEAF", "5"))
+# Random subsample of pooled lag rows used to train global_rf
+GLOBAL_MAX_TRAIN_ROWS = int(os.getenv("GLOBAL_MAX_TRAIN_ROWS", "500000"))
+
+# Smoothing parameters for model=croston / sba / ses / holt_winters
+CROSTON_ALPHA = float(os.getenv("CROSTON_ALPHA", "0.1"))
+SES_ALPHA = float(os.getenv("SES_ALPHA", "0.3"))
+HW_ALPHA = float(os.getenv("HW_ALPHA", "0.3"))
+HW_BETA = float(os.getenv("HW_BETA", "0.05"))
+HW_GAMMA = float(os.getenv("HW_GAMMA", "0.2"))
+HW_SEASON_LENGTH = int(os.getenv("HW_SEASON_LENGTH", "7"))
+
+# model=auto: demand classification thresholds (Syntetos-Boylan) and the model used per class
+AUTO_ADI_THRESHOLD = float(os.getenv("AUTO_ADI_THRESHOLD", "1.32"))
+AUTO_CV2_THRESHOLD = float(os.getenv("AUTO_CV2_THRESHOLD", "0.49"))
+AUTO_ROUTING: dict[str, str] = json.loads(
+    os.getenv(
+        "FORECAST_AUTO_ROUTING",
+        '{"smooth": "holt_winters", "erratic": "ses", "intermittent": "croston", "lumpy": "sba"}',
+    )
+)
+
+
+# --- Model result files (data/model_result) ---
+# Seconds between background checks of result files for changes (0 -> no background reloader)
+RESULT_RELOAD_INTERVAL_S = float(os.getenv("RESULT_RELOAD_INTERVAL_S", "5"))
+
+# Serialized JSON bodies of /pc-forecast and /forecast/sku kept in memory (LRU by total bytes, 0 -> disabled)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Cache-Control sent with ETag/Last-Modified on result endpoints (no-cache -> browsers revalidate and get 304s)
+RESULT_CACHE_CONTROL = os.getenv("RESULT_CACHE_CONTROL", "no-cache")
+
+# Maximum number of keys accepted by POST /pc-forecast/batch in one request
+PC_BATCH_MAX_ITEMS = int(os.getenv("PC_BATCH_MAX_ITEMS", "50000"))
+
+# Records per page of the SKU / RandomForest list endpoints when the client does not ask for a size
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "200"))
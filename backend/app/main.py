@@ -5,10 +5,15 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from .db import init_db
+from .services.forecast_job_service import shutdown_job_executor
+from .services.forecast_service import shutdown_process_pool
+from .services.pc_forecast_service import pc_results
+from .services.rf_pc_results import rf_results
+from .services.sku_forecast_service import sku_results
 from .utils.logger import get_logger, setup_logging
 from .routers import forecast
 from .routers import sku_forecast_router
-from .routers import analysis, auth
+from .routers import analysis, auth, search
 
 setup_logging()
 logger = get_logger("app")
@@ -38,7 +43,19 @@ def root() -> dict:
             "/forecast/sku",
             "/forecast/product",
             "/forecast/product_customer",
+            "/forecast/jobs/product",
+            "/forecast/jobs/product_customer",
+            "/forecast/jobs/{job_id}",
+            "/forecast/jobs/{job_id}/result",
             "/forecast/product-customer/randomforest",
+            "/pc-forecast/batch",
+            "/pc-forecast/compare",
+            "/pc-forecast/rollup",
+            "/pc-forecast/leaderboard",
+            "/forecast/sku/leaderboard",
+            "/pc-forecast/reload-status",
+            "/search/products?q=...",
+            "/search/customers?q=...",
             "/analysis/upload",
             "/analysis/status/{job_id}",
             "/analysis/summary?job_id=...",
@@ -57,6 +74,16 @@ def root() -> dict:
 def on_startup() -> None:
     init_db()
     logger.info("DB initialized")
+    for watcher in (pc_results, sku_results, rf_results):
+        watcher.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    for watcher in (pc_results, sku_results, rf_results):
+        watcher.stop()
+    shutdown_job_executor()
+    shutdown_process_pool()
 
 
 @app.middleware("http")
@@ -81,6 +108,7 @@ app.include_router(forecast.router)
 app.include_router(sku_forecast_router.router)
 app.include_router(auth.router)
 app.include_router(analysis.router)
+app.include_router(search.router)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,71 @@
 from __future__ import annotations
-from fastapi import APIRouter, Body, Depends, File, Form, UploadFile, Query, HTTPException
+from fastapi import APIRouter, Body, Depends, File, Form, UploadFile, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, condecimal
 from typing import Optional, List
 from time import perf_counter
 from sqlalchemy.orm import Session
 
+from ..config.settings import PC_BATCH_MAX_ITEMS, RESULT_PAGE_SIZE
 from ..db import get_db
 from ..services.forecast_service import (
     forecast_by_product,
     forecast_by_product_customer,
 )
-from ..services.rf_pc_results import load_rf_pc_records
-from ..services.pc_forecast_service import find_pc_forecast_record, get_pc_models
-from ..services.sku_forecast_service import find_sku_forecast_record, get_sku_models
+from ..services.forecast_job_service import (
+    JobQueueFull,
+    get_job,
+    submit_forecast_job,
+)
+from ..services.forecast_rollup import ROLLUP_DIMENSIONS
+from ..services.leaderboard import LEADERBOARD_METRICS, leaderboard_page
+from ..services.result_listing import InvalidCursor, parse_fields
+from ..services.result_snapshot import RecordView, prefix_total
+from ..services.rf_pc_results import RF_SCHEMA, get_rf_pc_listing, rf_results
+from ..services.pc_forecast_service import (
+    find_pc_forecast_record,
+    find_pc_forecast_records_all_models,
+    get_pc_models,
+    index_key,
+    iter_pc_forecast_records,
+    load_model_results,
+    pc_model_name,
+    pc_results,
+)
+from ..services.response_cache import (
+    cached_json_response,
+    dumps,
+    invalidate as invalidate_responses,
+    is_not_modified,
+    not_modified_response,
+    result_validators,
+)
+from ..services.sku_forecast_service import find_sku_forecast_record, get_sku_models, sku_results
 from ..services.inventory_service import calculate_safety_stock, get_pc_demand_stats, get_demand_stats
 from ..utils.logger import get_logger
 
 router = APIRouter()
 log = get_logger("router.forecast")
 
+# Cached response bodies are dropped as soon as the result files they were built from reload
+pc_results.subscribe(lambda registry: invalidate_responses("pc"))
+sku_results.subscribe(lambda registry: invalidate_responses("sku"))
+
 
 @router.post("/forecast/product")
 async def product_forecast(
     file: UploadFile = File(...),
     horizon: int = Form(7),
     model: str = Form("arima"),
+    time_budget_ms: Optional[int] = Form(None, ge=1),
     db: Session = Depends(get_db),
 ):
     log.info(
-        f"/forecast/product called - model={model}, horizon={horizon}, file={file.filename}"
+        f"/forecast/product called - model={model}, horizon={horizon}, time_budget_ms={time_budget_ms}, file={file.filename}"
+    )
+    result = await forecast_by_product(
+        file, horizon=horizon, model_type=model, db=db, time_budget_ms=time_budget_ms
     )
-    result = await forecast_by_product(file, horizon=horizon, model_type=model, db=db)
     return result
 
 
@@ -39,31 +74,106 @@ async def product_customer_forecast(
     file: UploadFile = File(...),
     horizon: int = Form(7),
     model: str = Form("arima"),
+    time_budget_ms: Optional[int] = Form(None, ge=1),
     db: Session = Depends(get_db),
 ):
     log.info(
-        f"/forecast/product_customer called - model={model}, horizon={horizon}, file={file.filename}"
+        f"/forecast/product_customer called - model={model}, horizon={horizon}, time_budget_ms={time_budget_ms}, file={file.filename}"
     )
     result = await forecast_by_product_customer(
-        file, horizon=horizon, model_type=model, db=db
+        file, horizon=horizon, model_type=model, db=db, time_budget_ms=time_budget_ms
     )
     return result
 
 
+async def _submit_job(
+    kind: str, file: UploadFile, horizon: int, model: str, time_budget_ms: Optional[int]
+) -> dict:
+    log.info(
+        f"/forecast/jobs/{kind} called - model={model}, horizon={horizon}, time_budget_ms={time_budget_ms}, file={file.filename}"
+    )
+    content = await file.read()
+    try:
+        job = submit_forecast_job(kind, content, file.filename, horizon, model, time_budget_ms)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {
+        "status": "success",
+        "message": "Forecast job submitted.",
+        "job_id": job.job_id,
+        "filename": file.filename,
+    }
+
+
+@router.post("/forecast/jobs/product")
+async def submit_product_forecast_job(
+    file: UploadFile = File(...),
+    horizon: int = Form(7),
+    model: str = Form("arima"),
+    time_budget_ms: Optional[int] = Form(None, ge=1),
+):
+    """Tạo job dự báo theo sản phẩm chạy nền, trả về job_id ngay lập tức."""
+    return await _submit_job("product", file, horizon, model, time_budget_ms)
+
+
+@router.post("/forecast/jobs/product_customer")
+async def submit_product_customer_forecast_job(
+    file: UploadFile = File(...),
+    horizon: int = Form(7),
+    model: str = Form("arima"),
+    time_budget_ms: Optional[int] = Form(None, ge=1),
+):
+    """Tạo job dự báo theo sản phẩm & khách hàng chạy nền, trả về job_id ngay lập tức."""
+    return await _submit_job("product_customer", file, horizon, model, time_budget_ms)
+
+
+@router.get("/forecast/jobs/{job_id}")
+async def forecast_job_status(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job '{job_id}'")
+    return job.to_dict()
+
+
+@router.get("/forecast/jobs/{job_id}/result")
+async def forecast_job_result(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job '{job_id}'")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail={"status": "failed", "message": job.error})
+    if job.status != "finished":
+        return JSONResponse(status_code=202, content={"detail": "processing", "status": job.status, "job": job.to_dict()})
+    return job.result
+
+
+RF_LIST_FIELDS = [f.name for f in RF_SCHEMA if not f.hidden]
+RF_KEY_FIELDS = ("customer_code", "product_code", "model")
+
+
 @router.get("/forecast/product-customer/randomforest")
 def get_product_customer_randomforest(
+    request: Request,
+    response: Response,
     customer_code: Optional[str] = None,
     product_code: Optional[str] = None,
-    limit: Optional[int] = Query(None, ge=1, le=10000),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Số bản ghi mỗi trang (mặc định RESULT_PAGE_SIZE)"),
+    cursor: Optional[str] = Query(None, description="Giá trị next_cursor của trang trước"),
+    fields: Optional[str] = Query(None, description="Danh sách trường cần trả về, cách nhau bởi dấu phẩy"),
 ):
     """Đọc kết quả RandomForest (Product-Customer) từ file JSON đã sinh sẵn.
 
-    Hỗ trợ filter theo customer_code, product_code và giới hạn số bản ghi trả về.
+    Hỗ trợ filter theo customer_code, product_code và phân trang bằng cursor theo thứ tự
+    (customer_code, product_code, model): mỗi trang tối đa `limit` bản ghi, truyền `next_cursor`
+    của trang trước vào `cursor` để lấy trang tiếp theo. `fields` chỉ trả về các trường được liệt kê
+    (luôn kèm customer_code, product_code, model), ví dụ bỏ `history`.
     Trả về định dạng:
     {
       "model": "RandomForest",
       "metrics": { "MAE": ..., "RMSE": ..., "MAPE": ... },  # trung bình trên tập trả về
-      "count": N,
+      "count": N,                  # số bản ghi trong trang
+      "total": M,                  # số bản ghi khớp bộ lọc
+      "next_cursor": "..." | null,
       "data": [
         {
           "customer_code": "...",
@@ -76,27 +186,37 @@ def get_product_customer_randomforest(
     }
     """
     t0 = perf_counter()
-    records = load_rf_pc_records()
-
-    def _match(v: Optional[str], q: Optional[str]) -> bool:
-        if not q:
-            return True
-        return (v or "").strip().upper() == q.strip().upper()
-
-    filtered = [
-        r
-        for r in records
-        if _match(r.get("customer_code"), customer_code)
-        and _match(r.get("product_code"), product_code)
-    ]
+    try:
+        projection = parse_fields(fields, RF_LIST_FIELDS, RF_KEY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    size = limit or RESULT_PAGE_SIZE
+    validators = result_validators(
+        rf_results.current(),
+        "/forecast/product-customer/randomforest",
+        (
+            customer_code.strip().upper() if customer_code else None,
+            product_code.strip().upper() if product_code else None,
+            size,
+            cursor,
+            tuple(sorted(projection)) if projection is not None else None,
+        ),
+    )
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
 
-    if limit is not None:
-        filtered = filtered[: limit]
+    try:
+        page, total, next_cursor = get_rf_pc_listing().page(
+            {"customer_code": customer_code, "product_code": product_code}, cursor, size
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Tính metrics trung bình trên tập trả về (nếu có)
-    mae_vals = [r.get("metrics", {}).get("MAE") for r in filtered if r.get("metrics", {}).get("MAE") is not None]
-    rmse_vals = [r.get("metrics", {}).get("RMSE") for r in filtered if r.get("metrics", {}).get("RMSE") is not None]
-    mape_vals = [r.get("metrics", {}).get("MAPE") for r in filtered if r.get("metrics", {}).get("MAPE") is not None]
+    mae_vals = [r.get("metrics", {}).get("MAE") for r in page if r.get("metrics", {}).get("MAE") is not None]
+    rmse_vals = [r.get("metrics", {}).get("RMSE") for r in page if r.get("metrics", {}).get("RMSE") is not None]
+    mape_vals = [r.get("metrics", {}).get("MAPE") for r in page if r.get("metrics", {}).get("MAPE") is not None]
 
     def _avg(xs):
         return float(sum(xs) / len(xs)) if xs else None
@@ -107,21 +227,37 @@ def get_product_customer_randomforest(
         "MAPE": _avg(mape_vals),
     }
 
+    data = [RecordView(r, fields=projection) for r in page] if projection is not None else page
+
     dur = (perf_counter() - t0) * 1000
     log.info(
-        f"GET /forecast/product-customer/randomforest returned count={len(filtered)} (filter: customer={customer_code}, product={product_code}, limit={limit}) in {dur:.1f} ms"
+        f"GET /forecast/product-customer/randomforest returned count={len(page)}/{total} (filter: customer={customer_code}, product={product_code}, limit={limit}) in {dur:.1f} ms"
     )
 
     return {
         "model": "RandomForest",
         "metrics": agg_metrics,
-        "count": len(filtered),
-        "data": filtered,
+        "count": len(page),
+        "total": total,
+        "next_cursor": next_cursor,
+        "data": data,
     }
 
 
+def _pc_forecast_view(record, forecast_weeks: int) -> RecordView:
+    # Trim the forecast to the requested number of weeks and add the total, on a view:
+    # the cached record is shared by all requests and must not be modified.
+    forecast_days = forecast_weeks * 7
+    return RecordView(
+        record,
+        limits={"forecast": forecast_days},
+        extra={"total_qty": lambda v: prefix_total(v["forecast_cumsum"], forecast_days)},
+    )
+
+
 @router.get("/pc-forecast")
 def get_pc_forecast(
+    request: Request,
     customer_code: str = Query(..., description="Customer code is required"),
     product_code: str = Query(..., description="Product code is required"),
     model: str = Query(..., description="Model name is required, e.g., Random Forest, Prophet"),
@@ -131,37 +267,273 @@ def get_pc_forecast(
     t0 = perf_counter()
     log.info(f"GET /pc-forecast called with: C='{customer_code}', P='{product_code}', M='{model}', Weeks='{forecast_weeks}'")
 
-    result_record = find_pc_forecast_record(
-        customer_code=customer_code,
-        product_code=product_code,
-        model=model
+    registry = pc_results.current()
+    params = (index_key(customer_code, product_code), model.lower(), forecast_weeks)
+    validators = result_validators(registry, "/pc-forecast", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        result_record = find_pc_forecast_record(
+            customer_code=customer_code,
+            product_code=product_code,
+            model=model
+        )
+
+        if not result_record:
+            log.warning(f"No data found for C={customer_code}, P={product_code}, M={model}")
+            raise HTTPException(status_code=404, detail=f"No forecast data available for C='{customer_code}', P='{product_code}' with model '{model}'.")
+
+        return {"data": _pc_forecast_view(result_record, forecast_weeks)}
+
+    response = cached_json_response("pc", registry.version, "/pc-forecast", params, build)
+    response.headers.update(validators.headers())
+
+    dur = (perf_counter() - t0) * 1000
+    log.info(
+        f"GET /pc-forecast returned 1 record for C={customer_code}, P={product_code}, M={model} "
+        f"(cache {response.headers['X-Cache']}) in {dur:.1f} ms"
     )
+    return response
 
-    if not result_record:
-        log.warning(f"No data found for C={customer_code}, P={product_code}, M={model}")
-        raise HTTPException(status_code=404, detail=f"No forecast data available for C='{customer_code}', P='{product_code}' with model '{model}'.")
 
-    # Trim the forecast to the requested number of weeks
-    forecast_days = forecast_weeks * 7
-    if 'forecast' in result_record and isinstance(result_record['forecast'], list):
-        # The service already sorts the data, but let's be safe.
-        sorted_forecast = sorted(result_record['forecast'], key=lambda x: x.get('date', ''))
-        result_record['forecast'] = sorted_forecast[:forecast_days]
+class PCBatchItem(BaseModel):
+    customer_code: str
+    product_code: str
+    model: str
+    forecast_weeks: int = Field(4, ge=1, le=4)
+
+
+class PCBatchRequest(BaseModel):
+    items: List[PCBatchItem] = Field(..., max_length=PC_BATCH_MAX_ITEMS)
 
-    # Calculate total forecast quantity
-    total_qty = sum(item.get('yhat', 0) for item in result_record.get('forecast', []))
-    result_record['total_qty'] = total_qty
+
+@router.post("/pc-forecast/batch")
+def get_pc_forecast_batch(request: PCBatchRequest = Body(...)):
+    """Tra cứu nhiều cặp (customer_code, product_code, model, forecast_weeks) trong một request.
+
+    Kết quả trả về dạng NDJSON, mỗi dòng ứng với một item theo đúng thứ tự gửi lên:
+    - tìm thấy: {"index": i, "status": "ok", ..., "data": <giống /pc-forecast>}
+    - không có: {"index": i, "status": "not_found", ..., "detail": "..."}
+    Key không tồn tại được báo ngay trên dòng tương ứng, không làm hỏng cả request.
+    """
+    items = request.items
+    log.info(f"POST /pc-forecast/batch called with {len(items)} items")
+
+    def lines():
+        t0 = perf_counter()
+        found = 0
+        chunk: List[bytes] = []
+        records = iter_pc_forecast_records((it.customer_code, it.product_code, it.model) for it in items)
+        for i, (item, record) in enumerate(zip(items, records)):
+            line = {
+                "index": i,
+                "customer_code": item.customer_code,
+                "product_code": item.product_code,
+                "model": item.model,
+                "forecast_weeks": item.forecast_weeks,
+            }
+            if record is None:
+                line["status"] = "not_found"
+                line["detail"] = "No forecast data available for this customer, product and model."
+            else:
+                found += 1
+                line["status"] = "ok"
+                line["data"] = _pc_forecast_view(record, item.forecast_weeks)
+            chunk.append(dumps(line) + b"\n")
+            if len(chunk) >= 256:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+        dur = (perf_counter() - t0) * 1000
+        log.info(f"POST /pc-forecast/batch streamed {len(items)} items ({found} found) in {dur:.1f} ms")
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/pc-forecast/compare")
+def compare_pc_forecast_models(
+    request: Request,
+    customer_code: str = Query(..., description="Customer code is required"),
+    product_code: str = Query(..., description="Product code is required"),
+    forecast_weeks: int = Query(4, ge=1, le=4, description="Number of forecast weeks (1-4)"),
+):
+    """So sánh dự báo của tất cả mô hình cho một cặp khách hàng - sản phẩm trong một response.
+
+    Trả về định dạng:
+    {
+      "customer_code": "...",
+      "product_code": "...",
+      "models": ["Croston", ...],          # mô hình có kết quả cho cặp này
+      "missing_models": ["SARIMA", ...],   # mô hình đã nạp nhưng không có cặp này
+      "data": { "<model>": <giống data của /pc-forecast> }
+    }
+    """
+    t0 = perf_counter()
+    registry = pc_results.current()
+    key = index_key(customer_code, product_code)
+    params = (key, forecast_weeks)
+    validators = result_validators(registry, "/pc-forecast/compare", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        by_model = find_pc_forecast_records_all_models(customer_code, product_code)
+        if not by_model:
+            log.warning(f"No data found in any model for C={customer_code}, P={product_code}")
+            raise HTTPException(status_code=404, detail=f"No forecast data available for C='{customer_code}', P='{product_code}' in any model.")
+
+        # The body is shared by every spelling of the key, so it echoes the normalized codes
+        return {
+            "customer_code": key[0],
+            "product_code": key[1],
+            "models": list(by_model),
+            "missing_models": [m for m in get_pc_models() if m not in by_model],
+            "data": {m: _pc_forecast_view(r, forecast_weeks) for m, r in by_model.items()},
+        }
+
+    response = cached_json_response("pc", registry.version, "/pc-forecast/compare", params, build)
+    response.headers.update(validators.headers())
+
+    dur = (perf_counter() - t0) * 1000
+    log.info(
+        f"GET /pc-forecast/compare returned C={customer_code}, P={product_code} "
+        f"(cache {response.headers['X-Cache']}) in {dur:.1f} ms"
+    )
+    return response
+
+
+@router.get("/pc-forecast/rollup")
+def rollup_pc_forecast(
+    request: Request,
+    model: str = Query(..., description="Model name is required, e.g., Random Forest, XGBoost"),
+    group_by: str = Query("product", description="Chiều gộp, cách nhau bởi dấu phẩy: product, customer, week"),
+    product_code: Optional[str] = Query(None, description="Chỉ gộp các bản ghi của sản phẩm này (tùy chọn)"),
+    customer_code: Optional[str] = Query(None, description="Chỉ gộp các bản ghi của khách hàng này (tùy chọn)"),
+    forecast_weeks: Optional[int] = Query(None, ge=1, le=4, description="Chỉ lấy n điểm dự báo đầu tiên của mỗi bản ghi"),
+):
+    """Tổng dự báo của một mô hình theo sản phẩm, khách hàng và/hoặc tuần, tính trên toàn bộ catalog.
+
+    `group_by` rỗng trả về một dòng tổng. `yhat_lower_80` / `yhat_upper_80` là tổng các cận của
+    từng bản ghi, không phải khoảng tin cậy 80% của tổng.
+    Trả về định dạng:
+    {
+      "model": "...",
+      "group_by": ["product", "week"],
+      "count": N,
+      "totals": {"yhat": ..., "yhat_lower_80": ..., "yhat_upper_80": ..., "points": ...},
+      "data": [ {"product_code": "...", "week": "YYYY-MM-DD", "yhat": ..., "yhat_lower_80": ..., "yhat_upper_80": ..., "points": n} ]
+    }
+    """
+    t0 = perf_counter()
+    dims = [d.strip().lower() for d in group_by.split(",") if d.strip()]
+    unknown = sorted(set(dims) - set(ROLLUP_DIMENSIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by dimensions: {unknown}. Allowed: {list(ROLLUP_DIMENSIONS)}")
+
+    registry = pc_results.current()
+    model_name = pc_model_name(model)
+    params = (
+        model_name,
+        tuple(d for d in ROLLUP_DIMENSIONS if d in dims),
+        product_code.strip().upper() if product_code else None,
+        customer_code.strip().upper() if customer_code else None,
+        forecast_weeks,
+    )
+    validators = result_validators(registry, "/pc-forecast/rollup", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        cube = load_model_results(model).cube
+        if cube is None:
+            raise HTTPException(status_code=404, detail=f"No forecast data available for model '{model}'.")
+        result = cube.rollup(dims, product_code=product_code, customer_code=customer_code, weeks=forecast_weeks)
+        return {"model": model_name, **result}
+
+    response = cached_json_response("pc", registry.version, "/pc-forecast/rollup", params, build)
+    response.headers.update(validators.headers())
 
     dur = (perf_counter() - t0) * 1000
     log.info(
-        f"GET /pc-forecast returned 1 record for C={customer_code}, P={product_code}, M={model} in {dur:.1f} ms"
+        f"GET /pc-forecast/rollup M={model} group_by={params[1]} (filter: product={product_code}, customer={customer_code}, "
+        f"weeks={forecast_weeks}) (cache {response.headers['X-Cache']}) in {dur:.1f} ms"
     )
-    return {"data": result_record}
+    return response
+
+
+@router.get("/pc-forecast/leaderboard")
+def get_pc_leaderboard(
+    request: Request,
+    model: str = Query(..., description="Model name is required, e.g., XGBoost"),
+    metric: str = Query("forecast_qty", description=f"Chỉ số xếp hạng: {', '.join(LEADERBOARD_METRICS)}"),
+    forecast_weeks: Optional[int] = Query(None, ge=1, le=4, description="Với forecast_qty: tổng n tuần dự báo đầu tiên (mặc định tất cả)"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="desc: lớn nhất trước, asc: nhỏ nhất trước"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Bảng xếp hạng cặp khách hàng - sản phẩm của một mô hình theo dự báo hoặc sai số.
+
+    Ví dụ: top 50 theo tổng dự báo 4 tuần (`metric=forecast_qty&forecast_weeks=4`), 100 cặp có MAPE
+    tệ nhất của XGBoost (`model=XGBoost&metric=MAPE&limit=100`). Thứ tự được tính sẵn khi nạp file
+    kết quả của mô hình; bản ghi không có giá trị của chỉ số bị bỏ qua.
+    """
+    t0 = perf_counter()
+    registry = pc_results.current()
+    model_name = pc_model_name(model)
+    params = (model_name, metric, forecast_weeks, order, offset, limit)
+    validators = result_validators(registry, "/pc-forecast/leaderboard", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        results = load_model_results(model)
+        if not results.index:
+            raise HTTPException(status_code=404, detail=f"No forecast data available for model '{model}'.")
+        try:
+            page, total = leaderboard_page(results.leaderboards, metric, forecast_weeks, offset, limit, order == "asc")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "model": model_name,
+            "metric": metric,
+            "forecast_weeks": forecast_weeks,
+            "order": order,
+            "total": total,
+            "offset": offset,
+            "count": len(page),
+            "data": [
+                {
+                    "rank": rank,
+                    "value": value,
+                    "customer_code": r.get("customer_code"),
+                    "product_code": r.get("product_code"),
+                    "model": r.get("model"),
+                    "metrics": r.get("metrics"),
+                }
+                for rank, value, r in page
+            ],
+        }
+
+    response = cached_json_response("pc", registry.version, "/pc-forecast/leaderboard", params, build)
+    response.headers.update(validators.headers())
+
+    dur = (perf_counter() - t0) * 1000
+    log.info(
+        f"GET /pc-forecast/leaderboard M={model} metric={metric} weeks={forecast_weeks} order={order} "
+        f"offset={offset} limit={limit} (cache {response.headers['X-Cache']}) in {dur:.1f} ms"
+    )
+    return response
 
 
 @router.get("/pc-forecast/models")
-def get_product_customer_models():
+def get_product_customer_models(request: Request, response: Response):
     """Returns a list of available models for product-customer forecasting."""
+    validators = result_validators(pc_results.current(), "/pc-forecast/models", ())
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
     try:
         models = get_pc_models()
         return {"models": models}
@@ -170,6 +542,12 @@ def get_product_customer_models():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/pc-forecast/reload-status")
+def get_pc_reload_status():
+    """Trạng thái nạp lại file kết quả Product-Customer: version registry, thời điểm kiểm tra/nạp, lỗi gần nhất."""
+    return pc_results.status()
+
+
 class PCSafetyStockRequest(BaseModel):
     customerId: str
     productId: str
@@ -250,6 +628,7 @@ async def get_pc_safety_stock(request: PCSafetyStockRequest):
 
 @router.get("/forecast/sku")
 def get_sku_forecast(
+    request: Request,
     product_code: str = Query(..., description="Product code is required"),
     model: str = Query(..., description="Model name is required"),
 ):
@@ -257,59 +636,69 @@ def get_sku_forecast(
     t0 = perf_counter()
     log.info(f"GET /forecast/sku called with: P='{product_code}', M='{model}'")
 
-    record = find_sku_forecast_record(product_code=product_code, model=model)
-
-    if not record:
-        log.warning(f"No data found for P={product_code}, M={model}")
-        # Use 404 for not found
-        raise HTTPException(status_code=404, detail=f"No forecast data available for product '{product_code}' with model '{model}'.")
+    registry = sku_results.current()
+    params = (str(product_code).strip(), model.strip().lower())
+    validators = result_validators(registry, "/forecast/sku", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        record = find_sku_forecast_record(product_code=product_code, model=model)
+
+        if not record:
+            log.warning(f"No data found for P={product_code}, M={model}")
+            # Use 404 for not found
+            raise HTTPException(status_code=404, detail=f"No forecast data available for product '{product_code}' with model '{model}'.")
+
+        # --- Prepare data for frontend ---
+        # 1. Total forecast quantity and confidence interval maps are precomputed at load time
+        total_forecast_qty = prefix_total(record["forecast_cumsum"])
+
+        # 2. Assemble chart_data object
+        chart_data = {
+            "history": record.get("history", []),
+            "forecast": record.get("forecast", []),
+            "confidence_interval": {
+                "lower": record["ci_lower"],
+                "upper": record["ci_upper"],
+            },
+            "train_end_date": record.get("train_end_date"),
+        }
 
-    # --- Prepare data for frontend ---
-    forecast_list = record.get("forecast", [])
-    
-    # 1. Calculate total forecast quantity
-    total_forecast_qty = sum(item.get("forecast", 0) for item in forecast_list if item.get("forecast") is not None)
-
-    # 2. Assemble chart_data object
-    ci_lower = {item["date"]: item.get("lower_80") for item in forecast_list if item.get("date") and item.get("lower_80") is not None}
-    ci_upper = {item["date"]: item.get("upper_80") for item in forecast_list if item.get("date") and item.get("upper_80") is not None}
-
-    chart_data = {
-        "history": record.get("history", []),
-        "forecast": forecast_list,
-        "confidence_interval": {
-            "lower": ci_lower,
-            "upper": ci_upper,
-        },
-        "train_end_date": record.get("train_end_date"),
-    }
+        # 3. Final response object
+        return {
+            "product_code": record.get("product_code"),
+            "model": record.get("model"),
+            "metrics": record.get("metrics"),
+            "forecast_quantity": total_forecast_qty,
+            "chart_data": chart_data,
+        }
 
-    # 3. Final response object
-    response_data = {
-        "product_code": record.get("product_code"),
-        "model": record.get("model"),
-        "metrics": record.get("metrics"),
-        "forecast_quantity": total_forecast_qty,
-        "chart_data": chart_data,
-    }
+    response = cached_json_response("sku", registry.version, "/forecast/sku", params, build)
+    response.headers.update(validators.headers())
 
     dur = (perf_counter() - t0) * 1000
     log.info(
-        f"GET /forecast/sku returned 1 record for P={product_code}, M={model} in {dur:.1f} ms"
+        f"GET /forecast/sku returned 1 record for P={product_code}, M={model} "
+        f"(cache {response.headers['X-Cache']}) in {dur:.1f} ms"
     )
 
-    return response_data
+    return response
 
 
 @router.get("/forecast/sku/models")
-def get_available_sku_models():
+def get_available_sku_models(request: Request, response: Response):
     """Returns a list of available models for SKU-level forecasting."""
+    validators = result_validators(sku_results.current(), "/forecast/sku/models", ())
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
     try:
         models = get_sku_models()
         return {"models": models}
     except Exception as e:
-        log.info(f"Discovered SKU models: {models}")
-    return models
+        log.exception(f"Error getting SKU models: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 class SafetyStockRequest(BaseModel):
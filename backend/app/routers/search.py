@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from time import perf_counter
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..services.code_search_service import search_customers, search_products
+from ..utils.logger import get_logger
+
+router = APIRouter(prefix="/search", tags=["search"])
+log = get_logger("router.search")
+
+
+def _prefix(q: str) -> str:
+    # Codes are matched after strip(), so an all-whitespace q would be an empty prefix matching every code
+    prefix = q.strip()
+    if not prefix:
+        raise HTTPException(status_code=400, detail="Query 'q' must contain at least one non-space character.")
+    return prefix
+
+
+@router.get("/products")
+def search_product_codes(
+    q: str = Query(..., min_length=1, description="Tiền tố mã sản phẩm"),
+    limit: int = Query(10, ge=1, le=100, description="Số kết quả tối đa"),
+):
+    """Gợi ý mã sản phẩm theo tiền tố (không phân biệt hoa thường).
+
+    Trả về: {"query": q, "total": số mã khớp, "data": [{"code": "...", "models": {"sku": [...], "pc": [...]}}]}
+    trong đó `models` cho biết mô hình nào có kết quả dự báo SKU / Product-Customer cho mã đó.
+    """
+    t0 = perf_counter()
+    matches, total = search_products(_prefix(q), limit)
+    dur = (perf_counter() - t0) * 1000
+    log.info(f"GET /search/products q='{q}' returned {len(matches)}/{total} in {dur:.2f} ms")
+    return {"query": q, "total": total, "data": matches}
+
+
+@router.get("/customers")
+def search_customer_codes(
+    q: str = Query(..., min_length=1, description="Tiền tố mã khách hàng"),
+    limit: int = Query(10, ge=1, le=100, description="Số kết quả tối đa"),
+):
+    """Gợi ý mã khách hàng theo tiền tố (không phân biệt hoa thường).
+
+    Trả về: {"query": q, "total": số mã khớp, "data": [{"code": "...", "models": {"pc": [...]}}]}
+    """
+    t0 = perf_counter()
+    matches, total = search_customers(_prefix(q), limit)
+    dur = (perf_counter() - t0) * 1000
+    log.info(f"GET /search/customers q='{q}' returned {len(matches)}/{total} in {dur:.2f} ms")
+    return {"query": q, "total": total, "data": matches}
@@ -1,40 +1,94 @@
 from __future__ import annotations
-from typing import Optional, List, Dict
+from typing import Optional
 from time import perf_counter
-from fastapi import APIRouter, Query
-
-from ..services.sku_forecast_service import load_sku_records
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from ..config.settings import RESULT_PAGE_SIZE
+from ..services.leaderboard import LEADERBOARD_METRICS, leaderboard_page
+from ..services.result_listing import InvalidCursor, parse_fields
+from ..services.result_snapshot import RecordView, prefix_total
+from ..services.response_cache import (
+    cached_json_response,
+    is_not_modified,
+    not_modified_response,
+    result_validators,
+)
+from ..services.sku_forecast_service import SKU_SCHEMA, get_sku_leaderboards, get_sku_listing, sku_results
 from ..utils.logger import get_logger
 
 router = APIRouter()
 log = get_logger("router.sku_forecast")
 
+SKU_LIST_FIELDS = [f.name for f in SKU_SCHEMA if not f.hidden] + ["TotalForecastQty"]
+SKU_KEY_FIELDS = ("product_code", "model")
 
-def _match_exact_str(val: Optional[str], q: Optional[str]) -> bool:
-    if not q:
-        return True
-    if val is None:
-        return False
-    return str(val).strip().upper() == str(q).strip().upper()
 
+@router.get("/forecast/sku/leaderboard")
+def get_sku_leaderboard(
+    request: Request,
+    model: str = Query(..., description="Tên mô hình, ví dụ LightGBM"),
+    metric: str = Query("forecast_qty", description=f"Chỉ số xếp hạng: {', '.join(LEADERBOARD_METRICS)}"),
+    forecast_weeks: Optional[int] = Query(None, ge=1, le=4, description="Với forecast_qty: tổng n tuần dự báo đầu tiên (mặc định tất cả)"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="desc: lớn nhất trước, asc: nhỏ nhất trước"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Bảng xếp hạng SKU của một mô hình theo dự báo hoặc sai số.
 
-def _sum_forecast_qty(forecast_list: Optional[List[Dict]]) -> float:
-    if not forecast_list:
-        return 0.0
-    total = 0.0
-    for it in forecast_list:
+    Ví dụ: top 50 SKU theo tổng dự báo 4 tuần tới (`metric=forecast_qty&forecast_weeks=4`).
+    Thứ tự được tính sẵn khi nạp kết quả SKU; bản ghi không có giá trị của chỉ số bị bỏ qua.
+    """
+    t0 = perf_counter()
+    registry = sku_results.current()
+    params = (model.strip().lower(), metric, forecast_weeks, order, offset, limit)
+    validators = result_validators(registry, "/forecast/sku/leaderboard", params)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    def build():
+        model_name, boards = get_sku_leaderboards(model)
+        if not boards:
+            raise HTTPException(status_code=404, detail=f"No forecast data available for model '{model}'.")
         try:
-            v = it.get("forecast")
-            if v is None:
-                continue
-            total += float(v)
-        except Exception:
-            continue
-    return float(total)
+            page, total = leaderboard_page(boards, metric, forecast_weeks, offset, limit, order == "asc")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "model": model_name,
+            "metric": metric,
+            "forecast_weeks": forecast_weeks,
+            "order": order,
+            "total": total,
+            "offset": offset,
+            "count": len(page),
+            "data": [
+                {
+                    "rank": rank,
+                    "value": value,
+                    "product_code": r.get("product_code"),
+                    "model": r.get("model"),
+                    "metrics": r.get("metrics"),
+                }
+                for rank, value, r in page
+            ],
+        }
+
+    response = cached_json_response("sku", registry.version, "/forecast/sku/leaderboard", params, build)
+    response.headers.update(validators.headers())
+
+    dur = (perf_counter() - t0) * 1000
+    log.info(
+        f"GET /forecast/sku/leaderboard M={model} metric={metric} weeks={forecast_weeks} order={order} "
+        f"offset={offset} limit={limit} (cache {response.headers['X-Cache']}) in {dur:.1f} ms"
+    )
+    return response
 
 
-@router.get("/forecast/sku")
-def get_sku_forecast(
+# GET /forecast/sku is the single-record lookup of the forecast router (used by the SKU page)
+@router.get("/forecast/sku/list")
+def list_sku_forecasts(
+    request: Request,
+    response: Response,
     product_code: Optional[str] = Query(None, description="Mã sản phẩm để lọc (tùy chọn)"),
     model: Optional[str] = Query(None, description="Tên mô hình để lọc (tùy chọn)"),
     limit: Optional[int] = Query(
@@ -49,6 +103,13 @@ def get_sku_forecast(
         le=4,
         description="Số tuần muốn dự báo (1-4). Nếu có, chỉ trả về số tuần đầu tiên trong forecast.",
     ),
+    page_size: Optional[int] = Query(
+        None, ge=1, le=10000, description="Số bản ghi mỗi trang (mặc định RESULT_PAGE_SIZE)"
+    ),
+    cursor: Optional[str] = Query(None, description="Giá trị next_cursor của trang trước"),
+    fields: Optional[str] = Query(
+        None, description="Danh sách trường cần trả về, cách nhau bởi dấu phẩy, ví dụ product_code,model,metrics"
+    ),
 ):
     """Đọc kết quả dự báo SKU-level từ các file JSON và trả về danh sách bản ghi.
 
@@ -56,10 +117,15 @@ def get_sku_forecast(
     - Hỗ trợ lọc theo `product_code` và/hoặc `model`.
     - Nếu có `weeks` (1..4), chỉ lấy số tuần đầu tiên trong mảng `forecast` trên mỗi item.
     - Sau đó áp dụng `limit` để cắt bớt số điểm dự báo; nếu client KHÔNG truyền `limit`, hệ thống mặc định dùng `200`.
+    - Phân trang bằng cursor theo thứ tự (product_code, model): mỗi trang tối đa `page_size` bản ghi,
+      truyền `next_cursor` của trang trước vào `cursor` để lấy trang tiếp theo (null khi hết).
+    - `fields` chỉ trả về các trường được liệt kê (luôn kèm product_code, model), ví dụ bỏ `history`.
 
     Output dạng:
     {
-      "count": N,
+      "count": N,                # số bản ghi trong trang
+      "total": M,                # số bản ghi khớp bộ lọc
+      "next_cursor": "..." | null,
       "data": [
         {
           "product_code": "20100002",
@@ -75,33 +141,53 @@ def get_sku_forecast(
     }
     """
     t0 = perf_counter()
-    all_records: List[Dict] = load_sku_records()
-
-    filtered = [
-        r for r in all_records
-        if _match_exact_str(r.get("product_code"), product_code)
-        and _match_exact_str(r.get("model"), model)
-    ]
-
-    # Áp dụng weeks trước (nếu có)
-    if weeks is not None:
-        for r in filtered:
-            fc = r.get("forecast") or []
-            r["forecast"] = fc[: int(weeks)]
-
-    # Sau đó áp dụng limit (mặc định 200 nếu client không truyền)
+    try:
+        projection = parse_fields(fields, SKU_LIST_FIELDS, SKU_KEY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    size = page_size or RESULT_PAGE_SIZE
+    validators = result_validators(
+        sku_results.current(),
+        "/forecast/sku:list",
+        (
+            product_code.strip().upper() if product_code else None,
+            model.strip().upper() if model else None,
+            limit,
+            weeks,
+            size,
+            cursor,
+            tuple(sorted(projection)) if projection is not None else None,
+        ),
+    )
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
+
+    try:
+        page, total, next_cursor = get_sku_listing().page(
+            {"product_code": product_code, "model": model}, cursor, size
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Áp dụng weeks trước (nếu có), sau đó limit (mặc định 200 nếu client không truyền).
+    # Bản ghi trong cache dùng chung giữa các request nên chỉ bọc bằng view, không sửa trực tiếp;
+    # việc cắt forecast và tính TotalForecastQty diễn ra khi serialize.
     eff_limit = 200 if limit is None else int(limit)
-    for r in filtered:
-        fc = r.get("forecast") or []
-        r["forecast"] = fc[: eff_limit]
-
-    # Tính tổng số lượng dự báo dựa trên danh sách forecast hiện có (sau khi cắt limit nếu có)
-    for r in filtered:
-        r["TotalForecastQty"] = _sum_forecast_qty(r.get("forecast"))
+    n_points = min(int(weeks), eff_limit) if weeks is not None else eff_limit
+    data = [
+        RecordView(
+            r,
+            limits={"forecast": n_points},
+            extra={"TotalForecastQty": lambda v: prefix_total(v["forecast_cumsum"], n_points)},
+            fields=projection,
+        )
+        for r in page
+    ]
 
     dur = (perf_counter() - t0) * 1000
     log.info(
-        f"GET /forecast/sku returned count={len(filtered)} (filter: product={product_code}, model={model}, weeks={weeks}, limit={limit}) in {dur:.1f} ms"
+        f"GET /forecast/sku returned count={len(data)}/{total} (filter: product={product_code}, model={model}, weeks={weeks}, limit={limit}, page_size={size}) in {dur:.1f} ms"
     )
 
-    return {"count": len(filtered), "data": filtered}
+    return {"count": len(data), "total": total, "next_cursor": next_cursor, "data": data}
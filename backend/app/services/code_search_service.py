@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from ..utils.logger import get_logger
+from .pc_forecast_service import get_pc_key_index, pc_results
+from .result_listing import norm_code
+from .sku_forecast_service import load_sku_records, sku_results
+
+log = get_logger("service.code_search")
+
+
+@dataclass(frozen=True)
+class CodeIndex:
+    """Sorted normalized codes with the models that have results for each, for prefix lookup."""
+
+    codes: List[str]
+    # models per code, parallel to `codes`: {"sku": [...], "pc": [...]}
+    models: List[Dict[str, List[str]]]
+
+    def search(self, prefix: str, k: int) -> Tuple[List[Dict], int]:
+        """First k codes starting with `prefix` in code order, and the number of matching codes."""
+        q = norm_code(prefix)
+        lo = bisect_left(self.codes, q)
+        # every code with the prefix sorts before prefix + the highest code point
+        hi = bisect_left(self.codes, q + "\U0010ffff", lo)
+        matches = [{"code": self.codes[i], "models": self.models[i]} for i in range(lo, min(hi, lo + k))]
+        return matches, hi - lo
+
+
+def _build_index(sources: Dict[str, Dict[str, Set[str]]]) -> CodeIndex:
+    """sources: {source name: {code: model names}} -> one index over the codes of all sources."""
+    per_code: Dict[str, Dict[str, List[str]]] = {}
+    for source, code_models in sources.items():
+        for code, models in code_models.items():
+            per_code.setdefault(code, {})[source] = sorted(models)
+    codes = sorted(c for c in per_code if c)
+    return CodeIndex(codes=codes, models=[per_code[c] for c in codes])
+
+
+@dataclass(frozen=True)
+class _SearchState:
+    """Product and customer indexes built from one (PC registry, SKU registry) version pair."""
+
+    versions: Tuple[int, int]
+    products: CodeIndex
+    customers: CodeIndex
+
+
+_state = _SearchState(versions=(-1, -1), products=CodeIndex([], []), customers=CodeIndex([], []))
+_state_lock = threading.Lock()
+
+
+def _build_state() -> _SearchState:
+    start = time.perf_counter()
+    # Versions first: if a reload lands while reading, the index is tagged older than its data and rebuilt
+    versions = (pc_results.current().version, sku_results.current().version)
+    pc_index = get_pc_key_index()
+    sku_records = load_sku_records()
+
+    pc_products: Dict[str, Set[str]] = {}
+    pc_customers: Dict[str, Set[str]] = {}
+    for (customer_code, product_code), by_model in pc_index.items():
+        pc_products.setdefault(product_code, set()).update(by_model)
+        pc_customers.setdefault(customer_code, set()).update(by_model)
+    sku_products: Dict[str, Set[str]] = {}
+    for r in sku_records:
+        if r.get("model"):
+            sku_products.setdefault(norm_code(r.get("product_code")), set()).add(str(r["model"]).strip())
+
+    products = _build_index({"sku": sku_products, "pc": pc_products})
+    customers = _build_index({"pc": pc_customers})
+    dur = (time.perf_counter() - start) * 1000
+    log.info(
+        f"Built code search indexes for PC v{versions[0]} / SKU v{versions[1]}: "
+        f"products={len(products.codes)} customers={len(customers.codes)} ({dur:.1f} ms)"
+    )
+    return _SearchState(versions=versions, products=products, customers=customers)
+
+
+def _install_state(registry=None) -> _SearchState:
+    global _state
+    state = _build_state()
+    with _state_lock:
+        # a slow rebuild for older versions must not replace a newer one
+        if all(new >= old for new, old in zip(state.versions, _state.versions)):
+            _state = state
+    return state
+
+
+def _current_state() -> _SearchState:
+    """Indexes for the current result registries; built on each reload, or here if a read races ahead of it."""
+    state = _state
+    if state.versions != (pc_results.current().version, sku_results.current().version):
+        state = _install_state()
+    return state
+
+
+# Rebuild the indexes as soon as either result registry is swapped, not on the first search
+pc_results.subscribe(_install_state)
+sku_results.subscribe(_install_state)
+
+
+def search_products(prefix: str, k: int) -> Tuple[List[Dict], int]:
+    """Product codes starting with `prefix`, with the SKU and product-customer models that cover them."""
+    return _current_state().products.search(prefix, k)
+
+
+def search_customers(prefix: str, k: int) -> Tuple[List[Dict], int]:
+    """Customer codes starting with `prefix`, with the product-customer models that cover them."""
+    return _current_state().customers.search(prefix, k)
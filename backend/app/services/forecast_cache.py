@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+
+from ..config.settings import FORECAST_CACHE_DISK_BYTES, FORECAST_CACHE_MEMORY_BYTES
+from ..utils.logger import get_logger
+
+log = get_logger("service.forecast_cache")
+
+# --- Paths ---
+BASE_DIR = Path(__file__).resolve().parents[2]  # -> backend/
+CACHE_DIR = BASE_DIR / "data" / "forecast" / "cache"
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+# --- In-memory state ---
+# key -> pickled result; most recently used last. Results are held serialized so the
+# budget counts the bytes actually kept, and every hit returns a fresh copy.
+_memory: "OrderedDict[str, bytes]" = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+def cache_key(content: bytes, *parts: Any) -> str:
+    """Content hash of the upload combined with everything else that determines the result."""
+    h = hashlib.md5(content)
+    for p in parts:
+        h.update(b"\x00" + str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+def cache_path_for(key: str) -> Path:
+    return CACHE_DIR / f"{key}.joblib"
+
+
+def _remember(key: str, blob: bytes) -> None:
+    """Insert into the memory LRU and evict least recently used entries over budget (caller holds the lock)."""
+    global _memory_bytes
+    if key in _memory:
+        _memory_bytes -= len(_memory.pop(key))
+    if len(blob) > FORECAST_CACHE_MEMORY_BYTES:
+        return
+    _memory[key] = blob
+    _memory_bytes += len(blob)
+    while _memory_bytes > FORECAST_CACHE_MEMORY_BYTES and _memory:
+        _, old = _memory.popitem(last=False)
+        _memory_bytes -= len(old)
+
+
+def _dumps(result: Dict[str, Any]) -> bytes:
+    return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _evict_disk() -> None:
+    """Remove the least recently used cache files until the directory fits its size budget."""
+    entries = []
+    for p in CACHE_DIR.glob("*.joblib"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((max(st.st_atime, st.st_mtime), st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= FORECAST_CACHE_DISK_BYTES:
+            break
+        try:
+            p.unlink()
+            total -= size
+            log.info(f"Evicted forecast cache file {p.name} ({size} bytes)")
+        except OSError:
+            pass
+
+
+def load_cached_forecast(key: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        blob = _memory.get(key)
+        if blob is not None:
+            _memory.move_to_end(key)
+    if blob is not None:
+        return pickle.loads(blob)
+
+    path = cache_path_for(key)
+    if not path.exists():
+        return None
+    try:
+        result = joblib.load(path)
+        os.utime(path)  # keep disk eviction in LRU order
+    except Exception as e:  # noqa: BLE001
+        log.warning(f"Failed to read forecast cache {path.name}: {e}")
+        return None
+    with _lock:
+        _remember(key, _dumps(result))
+    return result
+
+
+def save_cached_forecast(key: str, result: Dict[str, Any]) -> None:
+    path = cache_path_for(key)
+    tmp = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+    try:
+        joblib.dump(result, tmp, compress=3)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+    except Exception as e:  # noqa: BLE001
+        log.warning(f"Failed to write forecast cache {path.name}: {e}")
+        return
+    with _lock:
+        _remember(key, _dumps(result))
+    _evict_disk()
+    log.info(f"Saved forecast cache {key} ({size} bytes)")
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from ..config.settings import (
+    FORECAST_JOB_MAX_PENDING,
+    FORECAST_JOB_RETENTION,
+    FORECAST_JOB_WORKERS,
+)
+from ..db import SessionLocal
+from ..utils.logger import get_logger
+from .forecast_service import run_product_customer_forecast, run_product_forecast
+
+log = get_logger("service.forecast_job")
+
+_RUNNERS = {
+    "product": run_product_forecast,
+    "product_customer": run_product_customer_forecast,
+}
+
+
+# --- Data Models ---
+@dataclass
+class ForecastJob:
+    job_id: str
+    kind: str  # product, product_customer
+    status: str  # queued, running, finished, failed
+    filename: str
+    horizon: int
+    model: str
+    time_budget_ms: Optional[int] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "filename": self.filename,
+            "horizon": self.horizon,
+            "model": self.model,
+            "time_budget_ms": self.time_budget_ms,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class JobQueueFull(Exception):
+    """Raised when too many forecast jobs are already queued or running."""
+
+
+# --- In-memory state ---
+JOBS: Dict[str, ForecastJob] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=FORECAST_JOB_WORKERS, thread_name_prefix="forecast-job")
+    return _executor
+
+
+def shutdown_job_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _evict_old_jobs() -> None:
+    """Drop the oldest finished/failed jobs beyond the retention limit (caller holds the lock)."""
+    done = sorted(
+        (j for j in JOBS.values() if j.status in ("finished", "failed")),
+        key=lambda j: j.updated_at,
+    )
+    for job in done[: max(0, len(done) - FORECAST_JOB_RETENTION)]:
+        JOBS.pop(job.job_id, None)
+
+
+def submit_forecast_job(
+    kind: str,
+    content: bytes,
+    filename: str,
+    horizon: int,
+    model_type: str,
+    time_budget_ms: Optional[int] = None,
+) -> ForecastJob:
+    with _lock:
+        active = sum(1 for j in JOBS.values() if j.status in ("queued", "running"))
+        if active >= FORECAST_JOB_MAX_PENDING:
+            raise JobQueueFull(f"Đang có {active} job dự báo chưa xong, vui lòng thử lại sau")
+        job = ForecastJob(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            status="queued",
+            filename=filename,
+            horizon=horizon,
+            model=model_type,
+            time_budget_ms=time_budget_ms,
+        )
+        JOBS[job.job_id] = job
+        _evict_old_jobs()
+    _get_executor().submit(_run_job, job.job_id, content)
+    log.info(f"Registered forecast job_id={job.job_id} kind={kind} model={model_type}, total_jobs={len(JOBS)}")
+    return job
+
+
+def _run_job(job_id: str, content: bytes) -> None:
+    job = JOBS.get(job_id)
+    if not job:
+        log.error(f"_run_job called with unknown job_id={job_id}")
+        return
+
+    job.status = "running"
+    job.updated_at = datetime.now(timezone.utc)
+    log.info(f"Starting forecast job {job_id} for '{job.filename}'")
+    db = SessionLocal()
+    try:
+        job.result = _RUNNERS[job.kind](
+            content, job.horizon, job.model, db, job.time_budget_ms
+        )
+        job.status = "finished"
+        log.info(f"Forecast job {job_id} finished successfully.")
+    except Exception as e:  # noqa: BLE001
+        job.status = "failed"
+        job.error = str(e)
+        log.exception(f"Forecast job {job_id} failed: {e}")
+    finally:
+        db.close()
+        job.updated_at = datetime.now(timezone.utc)
+
+
+def get_job(job_id: str) -> Optional[ForecastJob]:
+    return JOBS.get(job_id)
+
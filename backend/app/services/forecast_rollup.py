@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .result_snapshot import Snapshot
+
+# Dimensions a rollup can group by, in output key order
+ROLLUP_DIMENSIONS = ("product", "customer", "week")
+_VALUE_PARTS = ("yhat", "yhat_lower_80", "yhat_upper_80")
+
+
+def _codes(snapshot: Snapshot, name: str) -> np.ndarray:
+    # same normalization as the lookup index: stripped, upper-case
+    return np.char.upper(np.char.strip(np.asarray(snapshot.column(name), dtype=str)))
+
+
+@dataclass(frozen=True)
+class ForecastCube:
+    """Forecast rows of one model file as dense arrays, one row per (record, forecast date).
+
+    Each dimension is a sorted array of labels plus, per row, the position of the
+    row's label in it. Rows of records whose key repeats an earlier record are left
+    out, matching the first-wins rule of the lookup index.
+    """
+
+    labels: Dict[str, np.ndarray]  # dimension -> sorted labels
+    codes: Dict[str, np.ndarray]  # dimension -> label position per row (int64)
+    position: np.ndarray  # index of the row within its record's forecast
+    values: np.ndarray  # (rows, 3): yhat, yhat_lower_80, yhat_upper_80; NaN -> 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "ForecastCube":
+        offsets, dates, values = snapshot.series("forecast")
+        offsets = np.asarray(offsets, dtype=np.int64)
+        lengths = np.diff(offsets)
+        record_of_row = np.repeat(np.arange(snapshot.count), lengths)
+        position = np.arange(int(offsets[-1]), dtype=np.int64) - offsets[:-1][record_of_row]
+
+        labels: Dict[str, np.ndarray] = {}
+        per_record: Dict[str, np.ndarray] = {}
+        for dim, column in (("product", "product_code"), ("customer", "customer_code")):
+            labels[dim], per_record[dim] = np.unique(_codes(snapshot, column), return_inverse=True)
+        week_labels, week_codes = np.unique(np.asarray(dates), return_inverse=True)
+        labels["week"] = np.char.decode(week_labels, "ascii")
+
+        # first record of each (customer, product) key wins
+        key = per_record["customer"].astype(np.int64) * max(len(labels["product"]), 1) + per_record["product"]
+        _, first = np.unique(key, return_index=True)
+        keep_record = np.zeros(snapshot.count, dtype=bool)
+        keep_record[first] = True
+        keep = keep_record[record_of_row]
+
+        codes = {dim: per_record[dim][record_of_row][keep].astype(np.int64) for dim in per_record}
+        codes["week"] = week_codes.reshape(-1)[keep].astype(np.int64)
+        return cls(
+            labels=labels,
+            codes=codes,
+            position=position[keep],
+            values=np.nan_to_num(np.asarray(values, dtype=np.float64)[keep]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def _mask(self, product_code: Optional[str], customer_code: Optional[str], weeks: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for dim, code in (("product", product_code), ("customer", customer_code)):
+            if not code:
+                continue
+            q = str(code).strip().upper()
+            labels = self.labels[dim]
+            i = int(np.searchsorted(labels, q))
+            if i >= len(labels) or labels[i] != q:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.codes[dim] == i
+        if weeks is not None:
+            mask &= self.position < weeks
+        return mask
+
+    def rollup(
+        self,
+        group_by: Sequence[str],
+        product_code: Optional[str] = None,
+        customer_code: Optional[str] = None,
+        weeks: Optional[int] = None,
+    ) -> Dict:
+        """Sum yhat and interval bounds per group of `group_by` dimensions over the selected rows.
+
+        `weeks` keeps the first n forecast points of each record. Groups are returned
+        in label order; with no dimensions there is a single group, the total.
+        """
+        dims = [d for d in ROLLUP_DIMENSIONS if d in group_by]
+        mask = self._mask(product_code, customer_code, weeks)
+        values = self.values[mask]
+
+        group = np.zeros(len(values), dtype=np.int64)
+        for dim in dims:
+            group = group * len(self.labels[dim]) + self.codes[dim][mask]
+        groups, inverse = np.unique(group, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sums = [np.bincount(inverse, weights=values[:, j], minlength=len(groups)) for j in range(len(_VALUE_PARTS))]
+        points = np.bincount(inverse, minlength=len(groups))
+
+        # decode the combined group ids back into one label array per dimension
+        keys: Dict[str, np.ndarray] = {}
+        rest = groups
+        for dim in reversed(dims):
+            rest, idx = np.divmod(rest, len(self.labels[dim]))
+            keys[dim] = self.labels[dim][idx]
+
+        columns: List = [(f"{dim}_code" if dim != "week" else "week", keys[dim].tolist()) for dim in dims]
+        columns += [(part, s.tolist()) for part, s in zip(_VALUE_PARTS, sums)]
+        columns.append(("points", points.tolist()))
+        names = [n for n, _ in columns]
+        data = [dict(zip(names, row)) for row in zip(*(c for _, c in columns))]
+        totals = {part: float(values[:, j].sum()) for j, part in enumerate(_VALUE_PARTS)}
+        totals["points"] = int(len(values))
+        return {"group_by": dims, "count": len(data), "totals": totals, "data": data}
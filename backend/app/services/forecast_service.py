@@ -1,24 +1,68 @@
 from __future__ import annotations
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from io import BytesIO, StringIO
-from typing import Dict, List, Tuple
+from itertools import repeat
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sqlalchemy.orm import Session
 from statsmodels.tsa.arima.model import ARIMA
 
+from ..config.settings import (
+    AUTO_ADI_THRESHOLD,
+    AUTO_CV2_THRESHOLD,
+    AUTO_ROUTING,
+    CROSTON_ALPHA,
+    FORECAST_CACHE_ENABLED,
+    FORECAST_BUDGET_CHUNK_SIZE,
+    FORECAST_BUDGET_RESERVE,
+    FORECAST_CHUNK_SIZE,
+    FORECAST_PARALLEL_MIN_SERIES,
+    FORECAST_POOL_START_METHOD,
+    FORECAST_WORKERS,
+    GLOBAL_MAX_TRAIN_ROWS,
+    GLOBAL_RF_MAX_DEPTH,
+    GLOBAL_RF_MIN_SAMPLES_LEAF,
+    GLOBAL_RF_N_ESTIMATORS,
+    HW_ALPHA,
+    HW_BETA,
+    HW_GAMMA,
+    HW_SEASON_LENGTH,
+    RF_MAX_DEPTH,
+    RF_N_ESTIMATORS,
+    RF_N_JOBS,
+    RF_ROLLOUT_BATCH,
+    SES_ALPHA,
+)
 from ..db import save_product_customer_sales_df, save_product_sales_df
+from .forecast_cache import cache_key, load_cached_forecast, save_cached_forecast
 from ..utils.logger import get_logger
 
 log = get_logger("service.forecast")
 
+# Bump whenever a change to the engines alters forecasts, so cached results are not reused
+ENGINE_VERSION = "2.0.0"
 
-def _read_csv_upload(upload: UploadFile) -> pd.DataFrame:
-    upload.file.seek(0)
-    content = upload.file.read()
+_process_pool: Optional[ProcessPoolExecutor] = None
+# Serializes creating and shutting down the pool (requests and forecast jobs run on threads)
+_process_pool_lock = threading.Lock()
+# True inside the workers of the forecast process pool (set by the pool initializer)
+_in_pool_worker = False
+
+
+def _read_csv_bytes(content: bytes) -> pd.DataFrame:
     try:
         s = content.decode("utf-8")
     except Exception:  # noqa: BLE001
@@ -38,22 +82,77 @@ def _ensure_columns(df: pd.DataFrame, cols: List[str]) -> None:
         )
 
 
-def _resample_series(df: pd.DataFrame, group_cols: List[str]) -> List[Tuple[Tuple, pd.Series]]:
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce").dt.tz_convert(None)
-    df = df.dropna(subset=["date"])
-    df = df.sort_values("date")
-    results: List[Tuple[Tuple, pd.Series]] = []
-    for key, g in df.groupby(group_cols):
-        s = (
-            g.set_index("date")["quantity_sold"].astype(float).resample("D").sum().sort_index()
+@dataclass
+class SeriesPanel:
+    """Daily demand of every series as one dense, left-aligned matrix.
+
+    Row i holds series `keys[i]` from its first day `start[i]` for `lengths[i]` days;
+    cells past the series' length are zero padding.
+    """
+
+    keys: List[Tuple]
+    values: np.ndarray  # (n_series, n_days) float
+    start: np.ndarray  # (n_series,) datetime64[D]
+    lengths: np.ndarray  # (n_series,) int
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def row(self, i: int) -> np.ndarray:
+        return self.values[i, : self.lengths[i]]
+
+    def rows(self) -> List[np.ndarray]:
+        return [self.row(i) for i in range(len(self.keys))]
+
+    def take(self, idx: np.ndarray) -> "SeriesPanel":
+        lengths = self.lengths[idx]
+        n_days = int(lengths.max()) if len(idx) else 0
+        return SeriesPanel(
+            keys=[self.keys[i] for i in idx],
+            values=self.values[idx, :n_days],
+            start=self.start[idx],
+            lengths=lengths,
         )
-        results.append((key if isinstance(key, tuple) else (key,), s))
-    return results
 
 
-def _forecast_series_arima(y: pd.Series, horizon: int) -> List[float]:
-    preds = [float(y.iloc[-1]) if len(y) else 0.0] * horizon
+def _resample_series(df: pd.DataFrame, group_cols: List[str]) -> SeriesPanel:
+    """Sum quantities per (group, day) into a dense panel in one vectorized pass.
+
+    Equivalent to resampling each group to daily frequency between its first and
+    last date (missing days are 0), with groups in sorted key order.
+    """
+    dates = pd.to_datetime(df["date"], utc=True, errors="coerce").dt.tz_convert(None)
+    valid = dates.notna().to_numpy()
+    grouped = df.loc[valid, group_cols].groupby(group_cols, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    keep = ~np.isnan(codes)
+    codes = codes[keep].astype(np.intp)
+    index = grouped.size().index
+    keys = [k if isinstance(k, tuple) else (k,) for k in index]
+
+    day = dates[valid].to_numpy().astype("datetime64[D]").astype(np.int64)[keep]
+    qty = np.nan_to_num(df.loc[valid, "quantity_sold"].astype(float).to_numpy()[keep])
+
+    n = len(keys)
+    first = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    last = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+    np.minimum.at(first, codes, day)
+    np.maximum.at(last, codes, day)
+    lengths = (last - first + 1) if n else np.zeros(0, dtype=np.int64)
+    n_days = int(lengths.max()) if n else 0
+
+    flat = codes * n_days + (day - first[codes])
+    values = np.bincount(flat, weights=qty, minlength=n * n_days).reshape(n, n_days)
+    return SeriesPanel(
+        keys=keys,
+        values=values,
+        start=first.astype("datetime64[D]"),
+        lengths=lengths.astype(int),
+    )
+
+
+def _forecast_series_arima(y: np.ndarray, horizon: int) -> List[float]:
+    preds = [float(y[-1]) if len(y) else 0.0] * horizon
     if len(y) < 5:
         return preds
     try:
@@ -71,80 +170,729 @@ def _forecast_series_arima(y: pd.Series, horizon: int) -> List[float]:
         return preds
 
 
-def _forecast_series_regression(y: pd.Series, horizon: int, model_type: str) -> List[float]:
-    df = pd.DataFrame({"y": y})
-    for lag in [1, 7]:
-        df[f"lag_{lag}"] = df["y"].shift(lag)
-    df = df.dropna()
-    if len(df) < 5:
-        return [float(y.iloc[-1]) if len(y) else 0.0] * horizon
-    X = df[[c for c in df.columns if c.startswith("lag_")]].values
-    target = df["y"].values
-    model = RandomForestRegressor(n_estimators=200, random_state=42) if model_type == "rf" else LinearRegression()
-    model.fit(X, target)
-
-    last_values = y.iloc[-7:].tolist()
-    while len(last_values) < 7:
-        last_values = [last_values[0]] + last_values
-    preds: List[float] = []
-    for _ in range(horizon):
-        x_next = np.array([[last_values[-1], last_values[-7]]])
-        yhat = float(model.predict(x_next)[0])
-        yhat = max(0.0, yhat)
-        preds.append(yhat)
-        last_values.append(yhat)
-        if len(last_values) > 7:
-            last_values = last_values[-7:]
-    return preds
-
-
-def _forecast_series(y: pd.Series, horizon: int, model_type: str) -> List[float]:
+def _lag_windows(values: List[np.ndarray]) -> np.ndarray:
+    """Last 7 observations of every series, left-padded with the first value (as in the per-series path)."""
+    window = np.zeros((len(values), 7), dtype=float)
+    for i, v in enumerate(values):
+        tail = v[-7:]
+        if len(tail):
+            window[i, : 7 - len(tail)] = tail[0]
+            window[i, 7 - len(tail) :] = tail
+    return window
+
+
+def _forecast_batch_linreg(values: List[np.ndarray], horizon: int) -> List[List[float]]:
+    """Linear regression on the lags `[y(t-1), y(t-7)]` of every series, fitted per series in one batch.
+
+    The series are stacked into one left-aligned `(n_series, n_days)` panel; the lag columns
+    are shifted views of it, so the least-squares fit of every series comes from masked
+    sums in closed form (centered, minimum-norm when the lags are collinear, like sklearn's
+    LinearRegression). The recursive rollout then advances all series one step at a time.
+    """
+    last = np.array([v[-1] if len(v) else 0.0 for v in values], dtype=float)
+    preds = np.repeat(last[:, None], horizon, axis=1)
+    n_rows = np.array([max(len(v) - 7, 0) for v in values], dtype=int)
+    fit_idx = np.flatnonzero(n_rows >= 5)
+    if not len(fit_idx) or horizon <= 0:
+        return preds.tolist()
+
+    coef, intercept = _fit_lag_ols([values[i] for i in fit_idx], n_rows[fit_idx])
+    window = _lag_windows([values[i] for i in fit_idx])
+    preds[fit_idx] = _recursive_rollout(
+        window, horizon, lambda X: X[:, 0] * coef[:, 0] + X[:, 1] * coef[:, 1] + intercept
+    )
+    return preds.tolist()
+
+
+# Lag pairs whose centered Gram determinant is below this share of its squared trace count as collinear
+_OLS_RANK_TOL = 1e-10
+
+
+def _fit_lag_ols(values: List[np.ndarray], n_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(coef (k, 2), intercept (k,)) of `y(t) ~ y(t-1) + y(t-7)` for every series."""
+    panel = np.zeros((len(values), int(n_rows.max()) + 7), dtype=float)
+    for i, v in enumerate(values):
+        panel[i, : len(v)] = v
+    y, x1, x2 = panel[:, 7:], panel[:, 6:-1], panel[:, :-7]
+    mask = np.arange(y.shape[1])[None, :] < n_rows[:, None]
+    counts = n_rows.astype(float)
+
+    def mean(a: np.ndarray) -> np.ndarray:
+        return np.where(mask, a, 0.0).sum(axis=1) / counts
+
+    my, m1, m2 = mean(y), mean(x1), mean(x2)
+    dy = np.where(mask, y - my[:, None], 0.0)
+    d1 = np.where(mask, x1 - m1[:, None], 0.0)
+    d2 = np.where(mask, x2 - m2[:, None], 0.0)
+    s11, s22, s12 = (d1 * d1).sum(axis=1), (d2 * d2).sum(axis=1), (d1 * d2).sum(axis=1)
+    r1, r2 = (d1 * dy).sum(axis=1), (d2 * dy).sum(axis=1)
+
+    # Minimum-norm solution of the 2x2 normal equations: inverse when the lags are independent,
+    # S / trace(S)^2 (the pseudo-inverse of a rank-1 Gram matrix) when they are collinear, 0 when constant
+    det = s11 * s22 - s12 * s12
+    trace = s11 + s22
+    full = det > _OLS_RANK_TOL * trace * trace
+    inv_det = np.divide(1.0, det, out=np.zeros_like(det), where=full)
+    inv_tr2 = np.divide(1.0, trace * trace, out=np.zeros_like(trace), where=~full & (trace > 0))
+    coef = np.column_stack(
+        [
+            np.where(full, (s22 * r1 - s12 * r2) * inv_det, (s11 * r1 + s12 * r2) * inv_tr2),
+            np.where(full, (s11 * r2 - s12 * r1) * inv_det, (s12 * r1 + s22 * r2) * inv_tr2),
+        ]
+    )
+    intercept = my - coef[:, 0] * m1 - coef[:, 1] * m2
+    return coef, intercept
+
+
+def _recursive_rollout(window: np.ndarray, horizon: int, predict) -> np.ndarray:
+    """Roll `predict` forward over a batch of 7-day lag windows, feeding each step back as a lag."""
+    out = np.empty((len(window), horizon), dtype=float)
+    for h in range(horizon):
+        yhat = np.maximum(0.0, predict(np.column_stack([window[:, -1], window[:, 0]])))
+        out[:, h] = yhat
+        window = np.concatenate([window[:, 1:], yhat[:, None]], axis=1)
+    return out
+
+
+def _compile_forest(model: RandomForestRegressor) -> Dict[str, np.ndarray]:
+    """Flatten a fitted forest into concatenated node arrays.
+
+    Leaves point to themselves, so a fixed number of traversal steps (the maximum
+    tree depth) lands every tree on its leaf.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for est in model.estimators_:
+        t = est.tree_
+        idx = np.arange(t.node_count) + offset
+        leaf = t.children_left < 0
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(t.threshold)
+        lefts.append(np.where(leaf, idx, t.children_left + offset))
+        rights.append(np.where(leaf, idx, t.children_right + offset))
+        values.append(t.value[:, 0, 0])
+        roots.append(offset)
+        offset += t.node_count
+        depth = max(depth, int(t.max_depth))
+    return {
+        "feature": np.concatenate(features).astype(np.intp),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.intp),
+        "depth": np.asarray(depth),
+    }
+
+
+def _stack_forests(tables: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Merge compiled forests of several series into one table with a `(n_series, n_trees)` root matrix."""
+    sizes = np.cumsum([0] + [len(t["value"]) for t in tables[:-1]])
+    return {
+        "feature": np.concatenate([t["feature"] for t in tables]),
+        "threshold": np.concatenate([t["threshold"] for t in tables]),
+        "left": np.concatenate([t["left"] + o for t, o in zip(tables, sizes)]),
+        "right": np.concatenate([t["right"] + o for t, o in zip(tables, sizes)]),
+        "value": np.concatenate([t["value"] for t in tables]),
+        "roots": np.stack([t["roots"] + o for t, o in zip(tables, sizes)]),
+        "depth": max(int(t["depth"]) for t in tables),
+    }
+
+
+def _predict_forests(table: Dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+    """Predict row i of `X` with forest i of a stacked table, traversing all trees at once."""
+    # sklearn evaluates trees on float32 inputs; cast the same way so splits match exactly
+    Xf = X.astype(np.float32).astype(float)
+    rows = np.arange(len(X))[:, None]
+    nodes = table["roots"]
+    for _ in range(table["depth"]):
+        go_left = Xf[rows, table["feature"][nodes]] <= table["threshold"][nodes]
+        nodes = np.where(go_left, table["left"][nodes], table["right"][nodes])
+    return table["value"][nodes].mean(axis=1)
+
+
+def _fit_rf_table(v: np.ndarray, n_jobs: int) -> Optional[Dict[str, np.ndarray]]:
+    if len(v) - 7 < 5:
+        return None
+    X = np.column_stack([v[6:-1], v[:-7]])
+    model = RandomForestRegressor(
+        n_estimators=RF_N_ESTIMATORS,
+        max_depth=RF_MAX_DEPTH or None,
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+    model.fit(X, v[7:])
+    return _compile_forest(model)
+
+
+def _forecast_rf_chunk(chunk: List[np.ndarray], horizon: int) -> List[List[float]]:
+    """Fit one forest per series, then roll out the horizon for a batch of series at once.
+
+    Inside a pool worker trees are built single-threaded; in the parent process
+    `RF_N_JOBS` cores are used for tree building.
+    """
+    n_jobs = 1 if _in_pool_worker else RF_N_JOBS
+    last = np.array([v[-1] if len(v) else 0.0 for v in chunk], dtype=float)
+    preds = np.repeat(last[:, None], horizon, axis=1)
+    for start in range(0, len(chunk), RF_ROLLOUT_BATCH):
+        batch = chunk[start : start + RF_ROLLOUT_BATCH]
+        tables = [_fit_rf_table(v, n_jobs) for v in batch]
+        fit_idx = [i for i, t in enumerate(tables) if t is not None]
+        if not fit_idx or horizon <= 0:
+            continue
+        table = _stack_forests([tables[i] for i in fit_idx])
+        window = _lag_windows([batch[i] for i in fit_idx])
+        preds[[start + i for i in fit_idx]] = _recursive_rollout(
+            window, horizon, lambda X: _predict_forests(table, X)
+        )
+    return preds.tolist()
+
+
+def _forecast_global(values: List[np.ndarray], horizon: int, kind: str) -> List[List[float]]:
+    """Pooled forecasting: one regressor trained on the lag features of every series.
+
+    Each series is divided by its mean level so that products of very different volume
+    share one target scale; the level (log) and the share of zero days are added as
+    series-level encodings. Short series that cannot support a model of their own still
+    get a forecast from the pooled fit.
+    """
+    last = np.array([v[-1] if len(v) else 0.0 for v in values], dtype=float)
+    preds = np.repeat(last[:, None], horizon, axis=1)
+    idx = np.array([i for i, v in enumerate(values) if len(v)], dtype=int)
+    if not len(idx) or horizon <= 0:
+        return preds.tolist()
+
+    level = np.array([values[i].mean() for i in idx], dtype=float)
+    scale = np.where(level > 0, level, 1.0)
+    static = np.column_stack(
+        [np.log1p(np.maximum(level, 0.0)), [float(np.mean(values[i] == 0)) for i in idx]]
+    )
+
+    X_parts, y_parts = [], []
+    for row, i in enumerate(idx):
+        v = values[i] / scale[row]
+        if len(v) <= 7:
+            continue
+        n = len(v) - 7
+        X_parts.append(np.column_stack([v[6:-1], v[:-7], np.repeat(static[row : row + 1], n, axis=0)]))
+        y_parts.append(v[7:])
+    if sum(len(y) for y in y_parts) < 5:
+        return preds.tolist()
+    X = np.concatenate(X_parts)
+    y = np.concatenate(y_parts)
+
+    if kind == "rf":
+        if len(y) > GLOBAL_MAX_TRAIN_ROWS:
+            keep = np.random.default_rng(42).choice(len(y), GLOBAL_MAX_TRAIN_ROWS, replace=False)
+            X, y = X[keep], y[keep]
+        model = RandomForestRegressor(
+            n_estimators=GLOBAL_RF_N_ESTIMATORS,
+            max_depth=GLOBAL_RF_MAX_DEPTH or None,
+            min_samples_leaf=GLOBAL_RF_MIN_SAMPLES_LEAF,
+            random_state=42,
+            n_jobs=RF_N_JOBS,
+        )
+    else:
+        model = LinearRegression()
+    model.fit(X, y)
+
+    window = _lag_windows([values[i] / scale[row] for row, i in enumerate(idx)])
+    scaled = _recursive_rollout(window, horizon, lambda L: model.predict(np.column_stack([L, static])))
+    preds[idx] = scaled * scale[:, None]
+    return preds.tolist()
+
+
+def _forecast_ses(Y: np.ndarray, lengths: np.ndarray, horizon: int, alpha: float = SES_ALPHA) -> np.ndarray:
+    """Simple exponential smoothing over every row of a left-aligned panel at once."""
+    level = Y[:, 0].copy() if Y.shape[1] else np.zeros(len(Y))
+    for t in range(1, Y.shape[1]):
+        active = t < lengths
+        level = np.where(active, alpha * Y[:, t] + (1 - alpha) * level, level)
+    return np.repeat(np.maximum(level, 0.0)[:, None], horizon, axis=1)
+
+
+def _forecast_croston(
+    Y: np.ndarray, lengths: np.ndarray, horizon: int, sba: bool = False, alpha: float = CROSTON_ALPHA
+) -> np.ndarray:
+    """Croston's method (or the Syntetos-Boylan correction) over every row of a panel at once.
+
+    Demand size `z` and inter-demand interval `p` are smoothed only on days with demand;
+    `q` counts the days since the previous demand. Series without any demand forecast 0.
+    """
+    n = len(Y)
+    z = np.zeros(n)
+    p = np.zeros(n)
+    q = np.ones(n)
+    seen = np.zeros(n, dtype=bool)
+    for t in range(Y.shape[1]):
+        y = Y[:, t]
+        active = t < lengths
+        demand = active & (y > 0)
+        first = demand & ~seen
+        update = demand & seen
+        z = np.where(first, y, np.where(update, z + alpha * (y - z), z))
+        p = np.where(first, q, np.where(update, p + alpha * (q - p), p))
+        seen |= first
+        q = np.where(demand, 1.0, np.where(active, q + 1, q))
+    rate = np.divide(z, p, out=np.zeros(n), where=p > 0)
+    if sba:
+        rate *= 1 - alpha / 2
+    return np.repeat(rate[:, None], horizon, axis=1)
+
+
+def _forecast_holt_winters(
+    Y: np.ndarray,
+    lengths: np.ndarray,
+    horizon: int,
+    m: int = HW_SEASON_LENGTH,
+    alpha: float = HW_ALPHA,
+    beta: float = HW_BETA,
+    gamma: float = HW_GAMMA,
+) -> np.ndarray:
+    """Additive Holt-Winters over every row of a panel at once.
+
+    Rows are left-aligned, so day t has the same seasonal slot `t % m` in every series.
+    Series shorter than two seasons fall back to simple exponential smoothing.
+    """
+    out = _forecast_ses(Y, lengths, horizon)
+    idx = np.flatnonzero(lengths >= 2 * m)
+    if not len(idx) or horizon <= 0:
+        return out
+
+    X = Y[idx]
+    L = lengths[idx]
+    level = X[:, :m].mean(axis=1)
+    trend = (X[:, m : 2 * m].mean(axis=1) - level) / m
+    season = X[:, :m] - level[:, None]
+    for t in range(m, X.shape[1]):
+        active = t < L
+        y = X[:, t]
+        s_prev = season[:, t % m]
+        new_level = alpha * (y - s_prev) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, t % m] = np.where(active, gamma * (y - new_level) + (1 - gamma) * s_prev, s_prev)
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+
+    h = np.arange(1, horizon + 1)
+    slots = (L[:, None] - 1 + h[None, :]) % m
+    fc = level[:, None] + h[None, :] * trend[:, None] + np.take_along_axis(season, slots, axis=1)
+    out[idx] = np.maximum(fc, 0.0)
+    return out
+
+
+def _canonical_model(model_type: str) -> str:
     m = (model_type or "arima").lower()
-    if m == "arima":
-        return _forecast_series_arima(y, horizon)
     if m in ("linreg", "linear", "linear_regression"):
-        return _forecast_series_regression(y, horizon, "linreg")
+        return "linreg"
     if m in ("rf", "random_forest"):
-        return _forecast_series_regression(y, horizon, "rf")
-    return [float(y.iloc[-1]) if len(y) else 0.0] * horizon
+        return "rf"
+    if m in ("global_rf", "global_random_forest"):
+        return "global_rf"
+    if m in ("global_linreg", "global_linear"):
+        return "global_linreg"
+    if m in ("ses", "exponential_smoothing"):
+        return "ses"
+    if m in ("holt_winters", "holt-winters", "hw"):
+        return "holt_winters"
+    return m
 
 
-async def forecast_by_product(
-    file: UploadFile, horizon: int, model_type: str, db: Session
+def _forecast_series(y: np.ndarray, horizon: int, model_type: str) -> List[float]:
+    m = _canonical_model(model_type)
+    if m == "arima":
+        return _forecast_series_arima(y, horizon)
+    return _naive(y, horizon)
+
+
+def _worker_count() -> int:
+    return FORECAST_WORKERS if FORECAST_WORKERS > 0 else (os.cpu_count() or 1)
+
+
+def _mark_pool_worker() -> None:
+    global _in_pool_worker
+    _in_pool_worker = True
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Not "fork": the server is multi-threaded and a forked worker could inherit a lock held by another thread
+            ctx = multiprocessing.get_context(FORECAST_POOL_START_METHOD)
+            if FORECAST_POOL_START_METHOD == "forkserver":
+                # the fork server imports the engine once; workers then start without re-importing sklearn & co.
+                ctx.set_forkserver_preload([__name__])
+            _process_pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=ctx,
+                initializer=_mark_pool_worker,
+            )
+            log.info(f"Started forecast process pool with {_worker_count()} workers ({FORECAST_POOL_START_METHOD})")
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def _forecast_chunk(chunk: List[np.ndarray], horizon: int, model_type: str) -> List[List[float]]:
+    return [_forecast_series(s, horizon, model_type) for s in chunk]
+
+
+def _map_chunks(fn, items: List, *args, deadline: Optional[float] = None) -> List:
+    """Apply `fn(chunk, *args)` over chunks of `items`, through the process pool for large inputs.
+
+    Results are concatenated in input order, identical to the serial path. With a
+    `deadline` (a `perf_counter()` value) items are sent in small chunks of
+    `FORECAST_BUDGET_CHUNK_SIZE`, no chunk is started after the deadline, and items of
+    chunks that did not finish in time come back as None.
+    """
+    workers = _worker_count()
+    if workers <= 1 or len(items) < FORECAST_PARALLEL_MIN_SERIES:
+        if deadline is not None:
+            return _map_chunks_serial_budgeted(fn, items, args, deadline)
+        chunk_size = FORECAST_CHUNK_SIZE or max(1, len(items))
+        results: List = []
+        for i in range(0, len(items), chunk_size):
+            results.extend(fn(items[i : i + chunk_size], *args))
+        return results
+
+    try:
+        pool = _get_process_pool()
+        if deadline is not None:
+            return _map_chunks_pool_budgeted(pool, fn, items, args, deadline, workers)
+        chunk_size = FORECAST_CHUNK_SIZE or max(1, math.ceil(len(items) / (workers * 4)))
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+        results = []
+        for part in pool.map(fn, chunks, *[repeat(a) for a in args]):
+            results.extend(part)
+        return results
+    except BrokenProcessPool as e:
+        log.warning(f"Forecast process pool broken, fallback serial: {e}")
+        shutdown_process_pool()
+        if deadline is None:
+            return fn(items, *args)
+        return _map_chunks_serial_budgeted(fn, items, args, deadline)
+
+
+def _map_chunks_pool_budgeted(
+    pool: ProcessPoolExecutor, fn, items: List, args: Tuple, deadline: float, workers: int
+) -> List:
+    """Keep at most one small chunk per worker in flight and stop submitting at the deadline.
+
+    Every chunk that finishes in time keeps its results, and once the deadline passes
+    the workers are left with at most one small chunk each to finish (and drop), so
+    the next request is not held up.
+    """
+    chunk_size = FORECAST_BUDGET_CHUNK_SIZE
+    starts = list(range(0, len(items), chunk_size))
+    results: List = [None] * len(items)
+    in_flight: Dict[Future, int] = {}
+    submitted = 0
+    while True:
+        while submitted < len(starts) and len(in_flight) < workers and perf_counter() < deadline:
+            start = starts[submitted]
+            in_flight[pool.submit(fn, items[start : start + chunk_size], *args)] = start
+            submitted += 1
+        if not in_flight:
+            return results
+        done, _ = wait(in_flight, timeout=max(0.0, deadline - perf_counter()), return_when=FIRST_COMPLETED)
+        if not done:
+            # deadline passed: chunks still running finish in their worker and are dropped
+            return results
+        for f in done:
+            start = in_flight.pop(f)
+            part = f.result()
+            results[start : start + len(part)] = part
+
+
+def _map_chunks_serial_budgeted(fn, items: List, args: Tuple, deadline: float) -> List:
+    chunk_size = FORECAST_BUDGET_CHUNK_SIZE
+    results: List = []
+    for i in range(0, len(items), chunk_size):
+        chunk = items[i : i + chunk_size]
+        results.extend([None] * len(chunk) if perf_counter() >= deadline else fn(chunk, *args))
+    return results
+
+
+def _naive(y: np.ndarray, horizon: int) -> List[float]:
+    return [float(y[-1]) if len(y) else 0.0] * horizon
+
+
+def _forecast_many(
+    panel: SeriesPanel, horizon: int, model_type: str, deadline: Optional[float] = None
+) -> Tuple[List[List[float]], List[int]]:
+    """Forecast every series, spreading the fits over the process pool for large inputs.
+
+    Linear regression is solved for all series at once and never needs the pool;
+    random forests are fitted per series and rolled out through compiled tree tables.
+    The global_* models train a single pooled regressor across all series, and the
+    smoothing models (croston, sba, ses, holt_winters) update every series per time step.
+
+    Only the per-series models (arima, rf) honour `deadline`: series are scheduled
+    largest-first and those not fitted in time get the naive forecast. Returns the
+    predictions and the indices of the series that were degraded that way.
+    """
+    m = _canonical_model(model_type)
+    if m in ("croston", "sba"):
+        return _forecast_croston(panel.values, panel.lengths, horizon, sba=m == "sba").tolist(), []
+    if m == "ses":
+        return _forecast_ses(panel.values, panel.lengths, horizon).tolist(), []
+    if m == "holt_winters":
+        return _forecast_holt_winters(panel.values, panel.lengths, horizon).tolist(), []
+    rows = panel.rows()
+    if m == "linreg":
+        return _forecast_batch_linreg(rows, horizon), []
+    if m in ("global_rf", "global_linreg"):
+        return _forecast_global(rows, horizon, m.split("_", 1)[1]), []
+
+    fn, args = (_forecast_rf_chunk, (horizon,)) if m == "rf" else (_forecast_chunk, (horizon, model_type))
+    if deadline is None:
+        return _map_chunks(fn, rows, *args), []
+
+    order = np.argsort(-panel.lengths, kind="stable")
+    results = _map_chunks(fn, [rows[i] for i in order], *args, deadline=deadline)
+    preds: List[List[float]] = [[]] * len(rows)
+    degraded: List[int] = []
+    for i, res in zip(order, results):
+        if res is None:
+            degraded.append(int(i))
+            res = _naive(rows[i], horizon)
+        preds[i] = res
+    return preds, sorted(degraded)
+
+
+DEMAND_CLASSES = ("smooth", "erratic", "intermittent", "lumpy")
+
+
+def _classify_demand(panel: SeriesPanel) -> np.ndarray:
+    """Syntetos-Boylan demand classes from ADI and CV² of every series in one pass.
+
+    ADI is the average number of days per non-zero demand and CV² the squared
+    coefficient of variation of the non-zero demand sizes. Series without any demand
+    count as intermittent.
+    """
+    Y = panel.values
+    in_range = np.arange(Y.shape[1])[None, :] < panel.lengths[:, None]
+    nonzero = in_range & (Y > 0)
+    n_nz = nonzero.sum(axis=1)
+    safe_n = np.maximum(n_nz, 1)
+    adi = np.where(n_nz > 0, panel.lengths / safe_n, np.inf)
+    mean = np.where(nonzero, Y, 0.0).sum(axis=1) / safe_n
+    var = np.where(nonzero, (Y - mean[:, None]) ** 2, 0.0).sum(axis=1) / safe_n
+    cv2 = np.divide(var, mean**2, out=np.zeros_like(mean), where=mean > 0)
+
+    intermittent = adi >= AUTO_ADI_THRESHOLD
+    variable = cv2 >= AUTO_CV2_THRESHOLD
+    labels = np.where(
+        intermittent,
+        np.where(variable, "lumpy", "intermittent"),
+        np.where(variable, "erratic", "smooth"),
+    )
+    return labels
+
+
+def _forecast_auto(
+    panel: SeriesPanel, horizon: int, deadline: Optional[float] = None
+) -> Tuple[List[List[float]], List[int], Dict]:
+    """Route each demand class to the model configured in `AUTO_ROUTING` and merge the results."""
+    labels = _classify_demand(panel)
+    preds: List[Optional[List[float]]] = [None] * len(panel)
+    degraded: List[int] = []
+    routing: Dict[str, Dict] = {}
+    for cls in DEMAND_CLASSES:
+        idx = np.flatnonzero(labels == cls)
+        model = AUTO_ROUTING.get(cls, "naive")
+        if _canonical_model(model) == "auto":
+            raise ValueError(f"AUTO_ROUTING cho lớp '{cls}' không thể là 'auto'")
+        t0 = perf_counter()
+        part, part_degraded = _forecast_many(panel.take(idx), horizon, model, deadline) if len(idx) else ([], [])
+        for i, p in zip(idx, part):
+            preds[i] = p
+        degraded.extend(int(idx[j]) for j in part_degraded)
+        routing[cls] = {
+            "count": int(len(idx)),
+            "model": model,
+            "fit_ms": round((perf_counter() - t0) * 1000, 1),
+        }
+    return preds, sorted(degraded), {"routing": routing}
+
+
+def _budget_deadline(time_budget_ms: Optional[int], started: float) -> Optional[float]:
+    """Point after which no expensive fit is started; the reserve covers building the response."""
+    if not time_budget_ms:
+        return None
+    return started + time_budget_ms / 1000 * (1 - FORECAST_BUDGET_RESERVE)
+
+
+def _run_forecast(
+    panel: SeriesPanel,
+    horizon: int,
+    model_type: str,
+    key_cols: List[str],
+    deadline: Optional[float] = None,
+) -> Tuple[List[List[float]], Dict]:
+    """Forecast a panel and return the predictions with engine details for the response meta."""
+    t0 = perf_counter()
+    if _canonical_model(model_type) == "auto":
+        preds, degraded, meta = _forecast_auto(panel, horizon, deadline)
+    else:
+        preds, degraded = _forecast_many(panel, horizon, model_type, deadline)
+        meta = {}
+    meta["fit_ms"] = round((perf_counter() - t0) * 1000, 1)
+    if deadline is not None:
+        meta["degraded_count"] = len(degraded)
+        meta["degraded"] = [
+            {col: str(v) for col, v in zip(key_cols, panel.keys[i])} for i in degraded
+        ]
+    return preds, meta
+
+
+def _build_items(
+    key_cols: List[str],
+    panel: SeriesPanel,
+    preds_list: List[List[float]],
+    horizon: int,
+) -> List[Dict]:
+    items: List[Dict] = []
+    first_fc = panel.start + panel.lengths.astype("timedelta64[D]")
+    steps = np.arange(horizon).astype("timedelta64[D]")
+    for key, start, preds in zip(panel.keys, first_fc, preds_list):
+        dates = np.datetime_as_string(start + steps, unit="D")
+        base = {col: str(v) for col, v in zip(key_cols, key)}
+        for d, yhat in zip(dates, preds):
+            items.append({**base, "date": str(d), "forecast": float(yhat)})
+    return items
+
+
+def _engine_fingerprint() -> Tuple:
+    """Engine version plus every setting that changes forecast values."""
+    return (
+        ENGINE_VERSION,
+        RF_N_ESTIMATORS,
+        RF_MAX_DEPTH,
+        GLOBAL_RF_N_ESTIMATORS,
+        GLOBAL_RF_MAX_DEPTH,
+        GLOBAL_RF_MIN_SAMPLES_LEAF,
+        GLOBAL_MAX_TRAIN_ROWS,
+        CROSTON_ALPHA,
+        SES_ALPHA,
+        HW_ALPHA,
+        HW_BETA,
+        HW_GAMMA,
+        HW_SEASON_LENGTH,
+        AUTO_ADI_THRESHOLD,
+        AUTO_CV2_THRESHOLD,
+        sorted(AUTO_ROUTING.items()),
+    )
+
+
+def _cached_forecast(
+    kind: str,
+    content: bytes,
+    horizon: int,
+    model_type: str,
+    time_budget_ms: Optional[int],
+    compute,
+) -> Dict:
+    """Serve a forecast from the result cache, or compute and store it.
+
+    Results degraded by the time budget are never stored. A hit skips parsing,
+    persisting and fitting entirely.
+    """
+    if not FORECAST_CACHE_ENABLED:
+        return compute()
+
+    key = cache_key(content, kind, _canonical_model(model_type), horizon, _engine_fingerprint())
+    cached = load_cached_forecast(key)
+    if cached is not None:
+        log.info(f"Forecast cache hit {key} ({kind}, model={model_type}, horizon={horizon})")
+        meta = {**cached["meta"], "model": model_type, "cache": "hit"}
+        if time_budget_ms:
+            meta.update(degraded_count=0, degraded=[])
+        return {"forecast": cached["forecast"], "meta": meta}
+
+    result = compute()
+    if not result["meta"].get("degraded_count"):
+        stored_meta = {k: v for k, v in result["meta"].items() if k not in ("degraded_count", "degraded")}
+        save_cached_forecast(key, {"forecast": result["forecast"], "meta": stored_meta})
+    result["meta"]["cache"] = "miss"
+    return result
+
+
+def run_product_forecast(
+    content: bytes,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int] = None,
+) -> Dict:
+    """Parse, persist and forecast a product-level CSV upload (blocking; run off the event loop)."""
+    return _cached_forecast(
+        "product",
+        content,
+        horizon,
+        model_type,
+        time_budget_ms,
+        lambda: _compute_product_forecast(content, horizon, model_type, db, time_budget_ms),
+    )
+
+
+def _compute_product_forecast(
+    content: bytes,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int],
 ) -> Dict:
-    df = _read_csv_upload(file)
+    deadline = _budget_deadline(time_budget_ms, perf_counter())
+    df = _read_csv_bytes(content)
     _ensure_columns(df, ["product_id", "date", "quantity_sold"])
     try:
         save_product_sales_df(db, df[["product_id", "date", "quantity_sold"]])
     except Exception as e:  # noqa: BLE001
         log.warning(f"Persist product_sales failed: {e}")
 
-    series_list = _resample_series(df, ["product_id"])
-    items: List[Dict] = []
-    for (product_id,), s in series_list:
-        preds = _forecast_series(s, horizon, model_type)
-        start = (
-            s.index.max() + pd.Timedelta(days=1)
-            if len(s)
-            else pd.Timestamp.today().normalize()
-        )
-        dates = pd.date_range(start, periods=horizon, freq="D")
-        for d, yhat in zip(dates, preds):
-            items.append(
-                {
-                    "product_id": str(product_id),
-                    "date": d.strftime("%Y-%m-%d"),
-                    "forecast": float(yhat),
-                }
-            )
-    log.info(f"Product forecast done: groups={len(series_list)}, items={len(items)}")
-    return {"forecast": items, "meta": {"horizon": horizon, "model": model_type}}
+    panel = _resample_series(df, ["product_id"])
+    preds_list, run_meta = _run_forecast(panel, horizon, model_type, ["product_id"], deadline)
+    items = _build_items(["product_id"], panel, preds_list, horizon)
+    log.info(f"Product forecast done: groups={len(panel)}, items={len(items)}")
+    return {"forecast": items, "meta": {"horizon": horizon, "model": model_type, **run_meta}}
 
 
-async def forecast_by_product_customer(
-    file: UploadFile, horizon: int, model_type: str, db: Session
+def run_product_customer_forecast(
+    content: bytes,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int] = None,
+) -> Dict:
+    """Parse, persist and forecast a product-customer CSV upload (blocking; run off the event loop)."""
+    return _cached_forecast(
+        "product_customer",
+        content,
+        horizon,
+        model_type,
+        time_budget_ms,
+        lambda: _compute_product_customer_forecast(content, horizon, model_type, db, time_budget_ms),
+    )
+
+
+def _compute_product_customer_forecast(
+    content: bytes,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int],
 ) -> Dict:
-    df = _read_csv_upload(file)
+    deadline = _budget_deadline(time_budget_ms, perf_counter())
+    df = _read_csv_bytes(content)
     _ensure_columns(df, ["product_id", "customer_id", "date", "quantity_sold"])
     try:
         save_product_customer_sales_df(
@@ -153,26 +901,36 @@ async def forecast_by_product_customer(
     except Exception as e:  # noqa: BLE001
         log.warning(f"Persist product_customer_sales failed: {e}")
 
-    series_list = _resample_series(df, ["product_id", "customer_id"])
-    items: List[Dict] = []
-    for (product_id, customer_id), s in series_list:
-        preds = _forecast_series(s, horizon, model_type)
-        start = (
-            s.index.max() + pd.Timedelta(days=1)
-            if len(s)
-            else pd.Timestamp.today().normalize()
-        )
-        dates = pd.date_range(start, periods=horizon, freq="D")
-        for d, yhat in zip(dates, preds):
-            items.append(
-                {
-                    "product_id": str(product_id),
-                    "customer_id": str(customer_id),
-                    "date": d.strftime("%Y-%m-%d"),
-                    "forecast": float(yhat),
-                }
-            )
+    panel = _resample_series(df, ["product_id", "customer_id"])
+    preds_list, run_meta = _run_forecast(panel, horizon, model_type, ["product_id", "customer_id"], deadline)
+    items = _build_items(["product_id", "customer_id"], panel, preds_list, horizon)
     log.info(
-        f"Product-Customer forecast done: groups={len(series_list)}, items={len(items)}"
+        f"Product-Customer forecast done: groups={len(panel)}, items={len(items)}"
+    )
+    return {"forecast": items, "meta": {"horizon": horizon, "model": model_type, **run_meta}}
+
+
+async def forecast_by_product(
+    file: UploadFile,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int] = None,
+) -> Dict:
+    content = await file.read()
+    return await run_in_threadpool(
+        run_product_forecast, content, horizon, model_type, db, time_budget_ms
+    )
+
+
+async def forecast_by_product_customer(
+    file: UploadFile,
+    horizon: int,
+    model_type: str,
+    db: Session,
+    time_budget_ms: Optional[int] = None,
+) -> Dict:
+    content = await file.read()
+    return await run_in_threadpool(
+        run_product_customer_forecast, content, horizon, model_type, db, time_budget_ms
     )
-    return {"forecast": items, "meta": {"horizon": horizon, "model": model_type}}
@@ -1,6 +1,5 @@
 from __future__ import annotations
 from typing import Dict, Optional
-import numpy as np
 from scipy.stats import norm
 
 from .sku_forecast_service import find_sku_forecast_record
@@ -10,22 +9,19 @@ from ..utils.logger import get_logger
 log = get_logger("service.inventory")
 
 def get_demand_stats(product_code: str, model: str) -> Optional[Dict[str, float]]:
-    """Lấy dữ liệu lịch sử từ bản ghi dự báo và tính toán các chỉ số nhu cầu."""
+    """Lấy các chỉ số nhu cầu đã tính sẵn khi nạp file (khối `stats` của file, hoặc từ lịch sử)."""
     record = find_sku_forecast_record(product_code, model)
-    if not record or not record.get("history"):
+    if not record:
         log.warning(f"Không tìm thấy dữ liệu lịch sử cho SKU {product_code} với model {model}")
         return None
 
-    history = record["history"]
-    actuals = [item.get("actual") for item in history if item.get("actual") is not None]
-
-    if len(actuals) < 2: # Cần ít nhất 2 điểm dữ liệu để tính độ lệch chuẩn
-        log.warning(f"Không đủ dữ liệu lịch sử ({len(actuals)} điểm) để tính toán cho SKU {product_code}")
+    demand_mean = record.get("demand_mean")
+    demand_std = record.get("demand_std_dev")
+    if demand_mean is None or demand_std is None:
+        # Không có stats trong file và lịch sử có ít hơn 2 điểm để tính độ lệch chuẩn
+        log.warning(f"Không đủ dữ liệu lịch sử để tính toán cho SKU {product_code}")
         return None
 
-    demand_mean = np.mean(actuals)
-    demand_std = np.std(actuals, ddof=1) # ddof=1 for sample standard deviation
-
     return {"demand_mean": demand_mean, "demand_std": demand_std}
 
 def calculate_safety_stock(
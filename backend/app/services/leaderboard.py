@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .result_snapshot import prefix_total
+
+# Metrics a leaderboard can rank by; forecast_qty is the forecast total over the first n weeks (all when None)
+LEADERBOARD_METRICS = ("forecast_qty", "MAE", "RMSE", "MAPE", "demand_mean", "demand_std_dev")
+LEADERBOARD_WEEKS = (1, 2, 3, 4)
+
+
+class Leaderboard:
+    """Records ordered by one metric, largest value first; records without a value are left out."""
+
+    def __init__(self, records: Sequence[Mapping], values: np.ndarray) -> None:
+        valid = np.flatnonzero(~np.isnan(values))
+        # stable sort keeps load order among equal values
+        self.order = valid[np.argsort(-values[valid], kind="stable")]
+        self.records = records
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def page(self, offset: int, limit: int, ascending: bool = False) -> List[Tuple[int, float, Mapping]]:
+        """(rank, value, record) of ranks offset+1 .. offset+limit, smallest first when `ascending`."""
+        order = self.order[::-1] if ascending else self.order
+        return [
+            (offset + k + 1, float(self.values[i]), self.records[i])
+            for k, i in enumerate(order[offset : offset + limit].tolist())
+        ]
+
+
+def _metric_key(metric: str, weeks: Optional[int] = None) -> str:
+    return f"{metric}:{weeks}w" if weeks else metric
+
+
+def build_leaderboards(records: Sequence[Mapping]) -> Dict[str, Leaderboard]:
+    """One leaderboard per metric (and per forecast window for forecast_qty) over `records`.
+
+    Records must carry the hidden `forecast_cumsum` vector of the result schemas.
+    """
+    n = len(records)
+    columns: Dict[str, np.ndarray] = {
+        _metric_key(m, w): np.full(n, np.nan)
+        for m in LEADERBOARD_METRICS
+        for w in ((None,) + LEADERBOARD_WEEKS if m == "forecast_qty" else (None,))
+    }
+    for i, record in enumerate(records):
+        cumsum = record.get("forecast_cumsum")
+        if cumsum:
+            columns["forecast_qty"][i] = prefix_total(cumsum)
+            for w in LEADERBOARD_WEEKS:
+                columns[_metric_key("forecast_qty", w)][i] = prefix_total(cumsum, w)
+        metrics = record.get("metrics") or {}
+        for m in ("MAE", "RMSE", "MAPE"):
+            if metrics.get(m) is not None:
+                columns[m][i] = metrics[m]
+        for m in ("demand_mean", "demand_std_dev"):
+            if record.get(m) is not None:
+                columns[m][i] = record[m]
+    return {key: Leaderboard(records, values) for key, values in columns.items()}
+
+
+def leaderboard_page(
+    boards: Mapping[str, Leaderboard],
+    metric: str,
+    weeks: Optional[int],
+    offset: int,
+    limit: int,
+    ascending: bool = False,
+) -> Tuple[List[Tuple[int, float, Mapping]], int]:
+    """Page of the leaderboard for `metric` and the number of ranked records."""
+    if metric not in LEADERBOARD_METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Allowed: {list(LEADERBOARD_METRICS)}")
+    board = boards.get(_metric_key(metric, weeks if metric == "forecast_qty" else None))
+    if board is None:
+        return [], 0
+    return board.page(offset, limit, ascending), len(board)
@@ -1,13 +1,18 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
-import json
+import threading
 import time
-from functools import lru_cache
 from pathlib import Path
 
 import math
+from ..config.settings import RESULT_RELOAD_INTERVAL_S
 from ..utils.logger import get_logger
+from .forecast_rollup import ForecastCube
+from .leaderboard import Leaderboard, build_leaderboards
+from .result_snapshot import Field, iter_json_records, load_snapshot
+from .result_watcher import ResultWatcher
 
 log = get_logger("service.pc_forecast")
 
@@ -20,6 +25,17 @@ def _normalize_date(ds: Optional[str]) -> Optional[str]:
     # Input format: "YYYY-MM-DD HH:MM:SS" -> keep date part only
     return str(ds)[:10]
 
+def _history_demand_stats(history_list: List[Dict]) -> Tuple[Optional[float], Optional[float]]:
+    """Mean and sample std dev of the actuals in a history list."""
+    actuals = [h['actual'] for h in history_list if h.get('actual') is not None]
+    if len(actuals) > 1:
+        demand_mean = sum(actuals) / len(actuals)
+        variance = sum([((x - demand_mean) ** 2) for x in actuals]) / (len(actuals) - 1)
+        return demand_mean, math.sqrt(variance)
+    if len(actuals) == 1:
+        return actuals[0], 0  # Cannot compute std dev from a single point
+    return None, None
+
 def _normalize_record(rec: Dict) -> Dict:
     customer_code = rec.get("CustomerCode") or rec.get("customer_code")
     product_code = rec.get("ProductCode") or rec.get("product_code")
@@ -87,20 +103,20 @@ def _normalize_record(rec: Dict) -> Dict:
             transition_date = max(h.get("date") or "" for h in history_list)
         except ValueError:
             transition_date = None
-    
 
+    # Prefer the demand stats written by the modelling pipeline; fall back to the history
+    stats = rec.get("stats") or {}
+    demand_mean = stats.get("demand_mean")
+    demand_std_dev = stats.get("demand_std")
+    if demand_mean is None or demand_std_dev is None:
+        demand_mean, demand_std_dev = _history_demand_stats(history_list)
 
-    demand_mean = None
-    demand_std_dev = None
-    if history_list:
-        actuals = [h['actual'] for h in history_list if h.get('actual') is not None]
-        if len(actuals) > 1:
-            demand_mean = sum(actuals) / len(actuals)
-            variance = sum([((x - demand_mean) ** 2) for x in actuals]) / (len(actuals) - 1)
-            demand_std_dev = math.sqrt(variance)
-        elif len(actuals) == 1:
-            demand_mean = actuals[0]
-            demand_std_dev = 0 # Cannot compute std dev from a single point
+    fc_list = sorted(fc_list, key=lambda x: x.get('date', '')) if fc_list else []
+    forecast_cumsum: List[float] = []
+    running = 0.0
+    for r in fc_list:
+        running += r.get("yhat") or 0
+        forecast_cumsum.append(running)
 
     return {
         "customer_code": customer_code,
@@ -110,46 +126,122 @@ def _normalize_record(rec: Dict) -> Dict:
         "train_end_date": train_end_date,
         "transition_date": transition_date,
         "history": sorted(history_list, key=lambda x: x.get('date', '')) if history_list else [],
-        "forecast": sorted(fc_list, key=lambda x: x.get('date', '')) if fc_list else [],
+        "forecast": fc_list,
         "demand_mean": demand_mean,
         "demand_std_dev": demand_std_dev,
+        "forecast_cumsum": forecast_cumsum,
     }
 
-@lru_cache(maxsize=10) # Cache up to 10 model files
+# Column layout of a normalized record in the compiled snapshot
+PC_SCHEMA = (
+    Field("customer_code", "str"),
+    Field("product_code", "str"),
+    Field("model", "str"),
+    Field("metrics", "metrics", ("MAE", "RMSE", "MAPE")),
+    Field("train_end_date", "str"),
+    Field("transition_date", "str"),
+    Field("history", "series", ("actual",)),
+    Field("forecast", "series", ("yhat", "yhat_lower_80", "yhat_upper_80")),
+    Field("demand_mean", "float"),
+    Field("demand_std_dev", "float"),
+    # running total of yhat over the forecast, for O(1) totals of any forecast window
+    Field("forecast_cumsum", "vector", hidden=True),
+)
+
+
+def _parse_model_file(source_file: Path):
+    """Read a raw model result file and yield normalized records (used when compiling its snapshot)."""
+    for rec in iter_json_records(source_file, allow_object=False):
+        yield _normalize_record(rec)
+
+
+@dataclass
+class ModelResults:
+    """Normalized records of one model file plus a lookup index on (customer_code, product_code)."""
+
+    records: List[Dict]
+    index: Dict[Tuple[str, str], Dict]
+    duplicates: int = 0
+    # forecast rows as dense arrays for rollups (None when the model has no file)
+    cube: Optional[ForecastCube] = None
+    # metric -> records ordered by it (one record per key, as in `index`)
+    leaderboards: Dict[str, Leaderboard] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def _key_part(v) -> str:
+    return str(v if v is not None else "").strip().upper()
+
+
+def index_key(customer_code, product_code) -> Tuple[str, str]:
+    """Normalized lookup key; codes may be stored as numbers in some result files."""
+    return _key_part(customer_code), _key_part(product_code)
+
+
+def _build_index(records: List[Dict]) -> Tuple[Dict[Tuple[str, str], Dict], int]:
+    """Index records by normalized key. On duplicate keys the first record wins, as the old linear scan did."""
+    index: Dict[Tuple[str, str], Dict] = {}
+    duplicates = 0
+    for record in records:
+        key = index_key(record.get("customer_code"), record.get("product_code"))
+        if key in index:
+            duplicates += 1
+            continue
+        index[key] = record
+    return index, duplicates
+
+
 def load_records_from_model_file(model_name: str) -> List[Dict]:
     """Load and normalize records from a specific model's JSON file."""
+    return load_model_results(model_name).records
+
+
+def _load_model_file(source_file: Path) -> ModelResults:
+    """Load, normalize and index the records of one model result file (called by the result watcher)."""
     t0 = time.perf_counter()
-    
+    log.info(f"Loading PC forecast data from {source_file}...")
+    snapshot = load_snapshot(source_file, "pc", PC_SCHEMA, _parse_model_file)
+
+    normalized_records = snapshot.records()
+    index, duplicates = _build_index(normalized_records)
+    cube = ForecastCube.from_snapshot(snapshot)
+    leaderboards = build_leaderboards(list(index.values()))
+    dur = (time.perf_counter() - t0) * 1000
+    log.info(
+        f"Loaded and normalized {len(normalized_records)} records from {source_file.name} in {dur:.2f}ms "
+        f"(index keys={len(index)}, duplicate keys={duplicates}, forecast rows={len(cube)})"
+    )
+
+    return ModelResults(
+        records=normalized_records, index=index, duplicates=duplicates, cube=cube, leaderboards=leaderboards
+    )
+
+
+# Loaded model files, reloaded in the background when a file is added or changes
+pc_results: ResultWatcher[ModelResults] = ResultWatcher(
+    "pc", DATA_DIR, "*_results.json", _load_model_file, RESULT_RELOAD_INTERVAL_S
+)
+
+
+def _model_file_name(model_name: str) -> str:
     # Sanitize model_name to create a filename, e.g., "Random Forest" -> "random_forest_results.json"
     # Map frontend model name to backend filename if they differ
     filename_base = model_name.lower().replace(' ', '_')
     if filename_base == 'arima':
         filename_base = 'sarima'  # Map 'ARIMA' model to 'sarima_results.json' file
+    return f"{filename_base}_results.json"
 
-    file_name = f"{filename_base}_results.json"
-    source_file = DATA_DIR / file_name
-
-    if not source_file.exists():
-        log.warning(f"Source file not found for model '{model_name}': {source_file}")
-        return []
-
-    log.info(f"Loading PC forecast data for model '{model_name}' from {source_file}...")
-    try:
-        with open(source_file, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        log.error(f"Error reading or parsing {source_file}: {e}")
-        return []
-
-    if not isinstance(raw_data, list):
-        log.error(f"Data in {source_file} is not a list.")
-        return []
-
-    normalized_records = [_normalize_record(rec) for rec in raw_data]
-    dur = (time.perf_counter() - t0) * 1000
-    log.info(f"Loaded and normalized {len(normalized_records)} records for model '{model_name}' in {dur:.2f}ms")
 
-    return normalized_records
+def load_model_results(model_name: str) -> ModelResults:
+    """Records and index of a specific model's JSON file, from the current result registry."""
+    file_name = _model_file_name(model_name)
+    results = pc_results.current().entries.get(file_name)
+    if results is None:
+        log.warning(f"Source file not found for model '{model_name}': {DATA_DIR / file_name}")
+        return ModelResults(records=[], index={})
+    return results
 
 def find_pc_forecast_record(customer_code: str, product_code: str, model: str) -> Optional[Dict]:
     """Finds a forecast record from the specified model's file."""
@@ -157,31 +249,111 @@ def find_pc_forecast_record(customer_code: str, product_code: str, model: str) -
         log.error("Model name is required to find a forecast record.")
         return None
 
-    model_records = load_records_from_model_file(model)
-    if not model_records:
-        return None
-
-    customer_upper = customer_code.strip().upper()
-    product_upper = product_code.strip().upper()
-
-    for record in model_records:
-        if (
-            (record.get("customer_code") or "").strip().upper() == customer_upper
-            and (record.get("product_code") or "").strip().upper() == product_upper
-        ):
-            return record # Return the first match
+    record = load_model_results(model).index.get(index_key(customer_code, product_code))
+    if record is not None:
+        return record
 
     log.warning(f"No record found for C={customer_code}, P={product_code} in model '{model}'.")
     return None
 
+def iter_pc_forecast_records(keys: Iterable[Tuple[str, str, str]]) -> Iterator[Optional[Dict]]:
+    """Look up many (customer_code, product_code, model) keys in one pass over the current registry.
+
+    All keys are answered from the same registry version, even if a reload swaps in
+    a new one meanwhile; None is yielded for a key that has no record.
+    """
+    entries = pc_results.current().entries
+    by_model: Dict[str, Optional[ModelResults]] = {}
+    for customer_code, product_code, model in keys:
+        if model not in by_model:
+            by_model[model] = entries.get(_model_file_name(model)) if model else None
+        results = by_model[model]
+        yield results.index.get(index_key(customer_code, product_code)) if results else None
+
+# Display names of the known model files; others fall back to a title-cased file stem
+_MODEL_DISPLAY_NAMES = {
+    "random_forest": "Random Forest",
+    "xgboost": "XGBoost",
+    "croston": "Croston",
+    "sarima": "SARIMA",
+}
+
+
+def _model_display_name(file_name: str) -> str:
+    # "random_forest_results.json" -> "Random Forest"
+    slug = file_name[: -len("_results.json")]
+    return _MODEL_DISPLAY_NAMES.get(slug, slug.replace("_", " ").title())
+
+
+def pc_model_name(model_name: str) -> str:
+    """Canonical display name of a requested model, e.g. "xgboost" -> "XGBoost", "ARIMA" -> "SARIMA"."""
+    return _model_display_name(_model_file_name(model_name))
+
+
+@dataclass(frozen=True)
+class _PCState:
+    """Model list and cross-model key index derived from one registry version."""
+
+    version: int
+    models: List[str]
+    # index_key -> {model display name: record}, models in file name order
+    by_key: Dict[Tuple[str, str], Dict[str, Dict]]
+
+
+_state = _PCState(version=-1, models=[], by_key={})
+_state_lock = threading.Lock()
+
+
+def _build_state(registry) -> _PCState:
+    start = time.perf_counter()
+    by_key: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+    models: List[str] = []
+    for fname in sorted(registry.entries):
+        model_name = _model_display_name(fname)
+        models.append(model_name)
+        for key, record in registry.entries[fname].index.items():
+            by_key.setdefault(key, {})[model_name] = record
+
+    dur = (time.perf_counter() - start) * 1000
+    log.info(
+        f"Built PC cross-model index v{registry.version}: models={models} keys={len(by_key)} ({dur:.1f} ms)"
+    )
+    return _PCState(version=registry.version, models=sorted(models), by_key=by_key)
+
+
+def _install_state(registry) -> _PCState:
+    global _state
+    state = _build_state(registry)
+    with _state_lock:
+        # a slow rebuild for an older version must not replace a newer one
+        if state.version > _state.version:
+            _state = state
+    return state
+
+
+def _current_state() -> _PCState:
+    """Derived state for the current registry; built on each reload, or here if a read races ahead of it."""
+    registry = pc_results.current()
+    state = _state
+    if state.version != registry.version:
+        state = _install_state(registry)
+    return state
+
+
+# Build the cross-model index as soon as a new registry version is swapped in, not on the first request
+pc_results.subscribe(_install_state)
+
+
+def find_pc_forecast_records_all_models(customer_code: str, product_code: str) -> Dict[str, Dict]:
+    """Records of every model for one (customer_code, product_code) key, by model name; empty when none has it."""
+    return _current_state().by_key.get(index_key(customer_code, product_code), {})
+
+
+def get_pc_key_index() -> Dict[Tuple[str, str], Dict[str, Dict]]:
+    """Cross-model index of the current registry: index_key -> {model name: record}."""
+    return _current_state().by_key
+
+
 def get_pc_models() -> List[str]:
-    """Returns a list of available models by scanning for result files."""
-    model_names = []
-    for f in DATA_DIR.glob("*_result.json"):
-        # "random_forest_result.json" -> "Random Forest"
-        model_slug = f.name.replace("_result.json", "")
-        model_name = model_slug.replace("_", " ").title()
-        model_names.append(model_name)
-    
-    log.info(f"Discovered models from filenames: {model_names}")
-    return sorted(model_names)
+    """Returns the models that have a loaded result file."""
+    return _current_state().models
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import threading
+import hashlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+
+from ..config.settings import RESPONSE_CACHE_MAX_BYTES, RESULT_CACHE_CONTROL
+from ..utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+log = get_logger("service.response_cache")
+
+# --- In-memory state ---
+# (group, generation, endpoint, params) -> serialized JSON body; most recently used last
+_entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+_total_bytes = 0
+_lock = threading.Lock()
+
+
+def _default(obj: Any) -> Any:
+    # read-only record views and snapshot records are Mappings, not dicts
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a response payload to JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        payload, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _remember(key: Tuple, body: bytes) -> None:
+    """Insert into the LRU and evict least recently used bodies over budget (caller holds the lock)."""
+    global _total_bytes
+    if key in _entries:
+        _total_bytes -= len(_entries.pop(key))
+    if len(body) > RESPONSE_CACHE_MAX_BYTES:
+        return
+    _entries[key] = body
+    _total_bytes += len(body)
+    while _total_bytes > RESPONSE_CACHE_MAX_BYTES and _entries:
+        _, old = _entries.popitem(last=False)
+        _total_bytes -= len(old)
+
+
+def invalidate(group: str) -> None:
+    """Drop every cached body of a data group, e.g. after its result files were reloaded."""
+    global _total_bytes
+    with _lock:
+        stale = [k for k in _entries if k[0] == group]
+        for k in stale:
+            _total_bytes -= len(_entries.pop(k))
+    if stale:
+        log.info(f"Invalidated {len(stale)} cached responses of group '{group}'")
+
+
+def cached_json_response(
+    group: str, generation: int, endpoint: str, params: Hashable, build: Callable[[], Any]
+) -> Response:
+    """Serve the JSON body for (endpoint, params) from the byte cache, building and storing it on a miss.
+
+    `generation` is the version of the data the body is built from, so a body built
+    before a reload can never be served after it. `params` must be normalized: every
+    spelling of a request shares one body, so the body names the canonical values
+    (e.g. the model name) rather than echoing the query. Exceptions raised by `build`
+    (e.g. HTTPException for 404) propagate and nothing is cached.
+    """
+    key = (group, generation, endpoint, params)
+    with _lock:
+        body = _entries.get(key)
+        if body is not None:
+            _entries.move_to_end(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "hit"})
+
+    body = dumps(build())
+    if RESPONSE_CACHE_MAX_BYTES > 0:
+        with _lock:
+            _remember(key, body)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "miss"})
+
+
+
+# --- Conditional GET ---
+@dataclass(frozen=True)
+class Validators:
+    """ETag / Last-Modified of a result endpoint response, derived without touching the records."""
+
+    etag: str
+    last_modified: float
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": RESULT_CACHE_CONTROL,
+        }
+
+
+def result_validators(registry, endpoint: str, params: Hashable) -> Validators:
+    """Strong ETag from the content token of the result files and the normalized request key."""
+    h = hashlib.md5(f"{registry.token}\x00{endpoint}\x00{params!r}".encode("utf-8"))
+    return Validators(etag=f'"{h.hexdigest()}"', last_modified=registry.last_modified)
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    # Validators are computed before the record lookup, so "*" (any current representation) cannot be
+    # honoured here: it would turn a missing key into a 304 instead of a 404. Only exact tags match.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return any(t.removeprefix("W/") == validators.etag for t in tags)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(validators.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(validators: Validators) -> Response:
+    return Response(status_code=304, headers=validators.headers())
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+Key = Tuple[Any, ...]
+
+
+class InvalidCursor(ValueError):
+    """The cursor passed by a client is malformed or does not belong to this listing."""
+
+
+def norm_code(v: Any) -> str:
+    """Normalized value used for exact-match filters and sort keys (codes may be numbers)."""
+    return str(v if v is not None else "").strip().upper()
+
+
+def encode_cursor(key: Key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, width: int) -> Key:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(key, list) or len(key) != width or not isinstance(key[-1], int):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    if not all(isinstance(k, str) for k in key[:-1]):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    return tuple(key)
+
+
+class ListingIndex:
+    """Records of a result list in a stable sorted order, with per-field indexes for exact filters.
+
+    Records are sorted by the normalized `key_fields` (their load position breaks
+    ties), and each field in `filter_fields` maps a normalized value to the sorted
+    positions having it. A page is selected by intersecting those position lists and
+    resuming after the sort key carried by the cursor, so paging stays consistent
+    when the result files reload between two pages.
+    """
+
+    def __init__(self, records: Iterable[Mapping], key_fields: Sequence[str], filter_fields: Sequence[str]) -> None:
+        keyed = sorted(
+            (tuple(norm_code(r.get(f)) for f in key_fields) + (i,), r) for i, r in enumerate(records)
+        )
+        # sort key width: the normalized key fields plus the load position
+        self.width = len(key_fields) + 1
+        self.keys: List[Key] = [k for k, _ in keyed]
+        self.records: List[Mapping] = [r for _, r in keyed]
+        self.postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in filter_fields}
+        for pos, record in enumerate(self.records):
+            for f, posting in self.postings.items():
+                posting.setdefault(norm_code(record.get(f)), []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def select(self, filters: Mapping[str, Optional[str]]) -> Sequence[int]:
+        """Sorted positions of the records matching every non-empty filter."""
+        lists = [self.postings[f].get(norm_code(q), []) for f, q in filters.items() if q]
+        if not lists:
+            return range(len(self.records))
+        lists.sort(key=len)
+        if len(lists) == 1:
+            return lists[0]
+        others = [set(p) for p in lists[1:]]
+        return [pos for pos in lists[0] if all(pos in s for s in others)]
+
+    def page(
+        self, filters: Mapping[str, Optional[str]], cursor: Optional[str], size: int
+    ) -> Tuple[List[Mapping], int, Optional[str]]:
+        """(records of the page, number of matching records, cursor of the next page or None)."""
+        # decoded before anything else so a bad cursor is rejected even when nothing matches
+        after = decode_cursor(cursor, self.width) if cursor else None
+        positions = self.select(filters)
+        start = 0
+        if after is not None:
+            start = bisect_left(positions, bisect_right(self.keys, after))
+        end = min(start + size, len(positions))
+        page = [self.records[positions[i]] for i in range(start, end)]
+        next_cursor = encode_cursor(self.keys[positions[end - 1]]) if end < len(positions) else None
+        return page, len(positions), next_cursor
+
+
+def parse_fields(spec: Optional[str], allowed: Iterable[str], always: Iterable[str] = ()) -> Optional[frozenset]:
+    """Field names requested by a `fields=a,b,c` projection (None -> all fields).
+
+    `allowed` are the fields a client may name; `always` (the key fields) are returned
+    even when not named, so every projected record can still be told apart.
+    """
+    if not spec:
+        return None
+    requested = {f.strip() for f in spec.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}. Allowed: {sorted(allowed)}")
+    return frozenset(requested | set(always))
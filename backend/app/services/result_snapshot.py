@@ -0,0 +1,490 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import time
+import uuid
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: compiles are not serialized across processes
+    fcntl = None
+
+log = get_logger("service.result_snapshot")
+
+# --- Paths & Constants ---
+BASE_DIR = Path(__file__).resolve().parents[2]  # -> backend/
+SNAPSHOT_DIR = BASE_DIR / "data" / "snapshots"
+SNAPSHOT_VERSION = 1
+DATE_WIDTH = 10  # "YYYY-MM-DD"
+
+
+@dataclass(frozen=True)
+class Field:
+    """One field of a normalized result record.
+
+    kind:
+      - "str": optional string column
+      - "float": optional float column (None <-> NaN)
+      - "metrics": dict of optional floats named by `parts`
+      - "series": list of {date_key: "YYYY-MM-DD", <parts>: optional float} rows
+      - "vector": variable-length list of optional floats
+      - "datemap": {"YYYY-MM-DD": float} mapping
+
+    Hidden fields hold precomputed values for the handlers; they can be read by key
+    but are left out when a record is iterated (and so when it is serialized).
+    """
+
+    name: str
+    kind: str
+    parts: Tuple[str, ...] = ()
+    date_key: str = "date"
+    hidden: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "parts": list(self.parts),
+            "date_key": self.date_key,
+            "hidden": self.hidden,
+        }
+
+
+Schema = Tuple[Field, ...]
+
+
+def _opt_float(v: Any) -> float:
+    if v is None:
+        return math.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _py_float(v: float) -> Optional[float]:
+    return None if v != v else float(v)  # NaN check without numpy overhead
+
+
+# --- Source parsing ---
+def _first_token(f) -> bytes:
+    while True:
+        ch = f.read(1)
+        if not ch or not ch.isspace():
+            return ch
+
+
+def iter_json_records(source: Path, allow_object: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a result file one at a time.
+
+    A top-level array is streamed with ijson, so only the record being normalized is
+    held as raw Python objects; a top-level object is treated as a single record
+    (or rejected when `allow_object` is False). Without ijson the whole file is
+    loaded with json.load.
+    """
+    with source.open("rb") as f:
+        head = _first_token(f)
+        f.seek(0)
+        if head != b"[" and not allow_object:
+            raise ValueError(f"Data in {source} is not a list.")
+        if ijson is None or head != b"[":
+            payload = json.load(f)
+            yield from payload if isinstance(payload, list) else [payload]
+            return
+        try:
+            yield from ijson.items(f, "item", use_float=True)
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON in {source}: {e}") from e
+
+
+# --- Compiler ---
+class _ColumnBuilder:
+    """Accumulates normalized records straight into compact typed buffers."""
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.count = 0
+        self.strs: Dict[str, List[str]] = {}
+        self.nulls: Dict[str, array] = {}
+        self.floats: Dict[str, array] = {}
+        self.offsets: Dict[str, array] = {}
+        self.dates: Dict[str, bytearray] = {}
+        for f in schema:
+            if f.kind == "str":
+                self.strs[f.name] = []
+                self.nulls[f.name] = array("b")
+            elif f.kind in ("float", "metrics"):
+                self.floats[f.name] = array("d")
+            elif f.kind in ("series", "datemap"):
+                self.offsets[f.name] = array("q", [0])
+                self.dates[f.name] = bytearray()
+                self.floats[f.name] = array("d")
+            elif f.kind == "vector":
+                self.offsets[f.name] = array("q", [0])
+                self.floats[f.name] = array("d")
+            else:
+                raise ValueError(f"Unknown snapshot field kind '{f.kind}'")
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        for f in self.schema:
+            v = rec.get(f.name)
+            if f.kind == "str":
+                self.strs[f.name].append("" if v is None else str(v))
+                self.nulls[f.name].append(v is None)
+            elif f.kind == "float":
+                self.floats[f.name].append(_opt_float(v))
+            elif f.kind == "metrics":
+                v = v or {}
+                self.floats[f.name].extend(_opt_float(v.get(p)) for p in f.parts)
+            elif f.kind == "vector":
+                values = self.floats[f.name]
+                values.extend(_opt_float(x) for x in v or [])
+                self.offsets[f.name].append(len(values))
+            else:
+                dates = self.dates[f.name]
+                values = self.floats[f.name]
+                if f.kind == "datemap":
+                    rows = ({f.date_key: d, "value": x} for d, x in (v or {}).items())
+                    parts: Tuple[str, ...] = ("value",)
+                else:
+                    rows, parts = v or [], f.parts
+                for row in rows:
+                    d = str(row.get(f.date_key) or "").encode("ascii", "replace")[:DATE_WIDTH]
+                    dates += d.ljust(DATE_WIDTH, b"\0")
+                    values.extend(_opt_float(row.get(p)) for p in parts)
+                self.offsets[f.name].append(len(dates) // DATE_WIDTH)
+        self.count += 1
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        for f in self.schema:
+            if f.kind == "str":
+                out[f.name] = np.array(self.strs[f.name], dtype=str)
+                out[f"{f.name}.null"] = np.frombuffer(self.nulls[f.name], dtype=np.int8).astype(bool)
+            elif f.kind == "float":
+                out[f.name] = np.frombuffer(self.floats[f.name], dtype=np.float64)
+            elif f.kind == "metrics":
+                out[f.name] = np.frombuffer(self.floats[f.name], dtype=np.float64).reshape(-1, len(f.parts))
+            elif f.kind == "vector":
+                out[f"{f.name}.offsets"] = np.frombuffer(self.offsets[f.name], dtype=np.int64)
+                out[f"{f.name}.values"] = np.frombuffer(self.floats[f.name], dtype=np.float64)
+            else:
+                width = 1 if f.kind == "datemap" else len(f.parts)
+                out[f"{f.name}.offsets"] = np.frombuffer(self.offsets[f.name], dtype=np.int64)
+                out[f"{f.name}.dates"] = np.frombuffer(bytes(self.dates[f.name]), dtype=f"S{DATE_WIDTH}")
+                out[f"{f.name}.values"] = np.frombuffer(self.floats[f.name], dtype=np.float64).reshape(-1, width)
+        return out
+
+
+def _source_signature(source: Path) -> Dict[str, int]:
+    st = source.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _read_meta(snap_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((snap_dir / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def compile_snapshot(
+    records: Iterable[Dict[str, Any]], schema: Schema, snap_dir: Path, source: Optional[Path] = None
+) -> Path:
+    """Write normalized records as a columnar snapshot directory of .npy files plus meta.json.
+
+    The directory is built under a temporary name and swapped in by rename, so readers
+    never see a half-written snapshot and existing memory maps stay valid.
+    """
+    t0 = time.perf_counter()
+    builder = _ColumnBuilder(schema)
+    for rec in records:
+        builder.add(rec)
+
+    snap_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snap_dir.with_name(f"{snap_dir.name}.tmp-{uuid.uuid4().hex}")
+    tmp.mkdir()
+    for name, arr in builder.arrays().items():
+        np.save(tmp / f"{name}.npy", arr, allow_pickle=False)
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "schema": [f.to_json() for f in schema],
+        "count": builder.count,
+        "source": _source_signature(source) if source else None,
+        "compiled_at": time.time(),
+        "compile_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    old = snap_dir.with_name(f"{snap_dir.name}.old-{uuid.uuid4().hex}")
+    try:
+        os.rename(snap_dir, old)
+    except FileNotFoundError:
+        old = None
+    try:
+        os.rename(tmp, snap_dir)
+    except OSError:
+        # another process swapped in its own build first; theirs is just as fresh
+        shutil.rmtree(tmp, ignore_errors=True)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    log.info(f"Compiled snapshot {snap_dir} with {builder.count} records in {meta['compile_ms']} ms")
+    return snap_dir
+
+
+# --- Reader ---
+class Snapshot:
+    """Memory-mapped columnar snapshot; records are materialized lazily per field."""
+
+    def __init__(self, snap_dir: Path) -> None:
+        meta = _read_meta(snap_dir)
+        if meta is None:
+            raise FileNotFoundError(f"Snapshot meta not found in {snap_dir}")
+        self.path = snap_dir
+        self.meta = meta
+        self.schema: Schema = tuple(
+            Field(f["name"], f["kind"], tuple(f["parts"]), f["date_key"], f.get("hidden", False))
+            for f in meta["schema"]
+        )
+        self.fields: Dict[str, Field] = {f.name: f for f in self.schema}
+        self.visible: Tuple[str, ...] = tuple(f.name for f in self.schema if not f.hidden)
+        self.count: int = int(meta["count"])
+        self.arrays: Dict[str, np.ndarray] = {
+            p.name[: -len(".npy")]: np.load(p, mmap_mode="r", allow_pickle=False)
+            for p in snap_dir.glob("*.npy")
+        }
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def series(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(offsets, dates, values) of a series field; rows of record i are offsets[i]:offsets[i+1]."""
+        return (
+            self.arrays[f"{name}.offsets"],
+            self.arrays[f"{name}.dates"],
+            self.arrays[f"{name}.values"],
+        )
+
+    def value(self, i: int, name: str, limit: Optional[int] = None) -> Any:
+        f = self.fields[name]
+        if f.kind == "str":
+            return None if self.arrays[f"{name}.null"][i] else str(self.arrays[name][i])
+        if f.kind == "float":
+            return _py_float(self.arrays[name][i])
+        if f.kind == "metrics":
+            row = self.arrays[name][i].tolist()
+            return {p: _py_float(v) for p, v in zip(f.parts, row)}
+        if f.kind == "vector":
+            offsets, values = self.arrays[f"{name}.offsets"], self.arrays[f"{name}.values"]
+            return [_py_float(v) for v in values[int(offsets[i]) : int(offsets[i + 1])].tolist()]
+        offsets, dates, values = self.series(name)
+        lo, hi = int(offsets[i]), int(offsets[i + 1])
+        if f.kind == "datemap":
+            return {
+                d.decode("ascii"): _py_float(v)
+                for d, v in zip(dates[lo:hi].tolist(), values[lo:hi, 0].tolist())
+            }
+        if limit is not None:
+            hi = min(hi, lo + max(limit, 0))
+        out = []
+        for d, row in zip(dates[lo:hi].tolist(), values[lo:hi].tolist()):
+            item = {f.date_key: d.decode("ascii")}
+            item.update((p, _py_float(v)) for p, v in zip(f.parts, row))
+            out.append(item)
+        return out
+
+    def record(self, i: int) -> "SnapshotRecord":
+        return SnapshotRecord(self, i)
+
+    def records(self) -> List["SnapshotRecord"]:
+        return [SnapshotRecord(self, i) for i in range(self.count)]
+
+
+class SnapshotRecord(Mapping):
+    """Read-only dict-like view of one snapshot row.
+
+    Records are shared by every request; per-request changes (forecast windows,
+    derived totals) go through a RecordView instead of mutating the record.
+    """
+
+    __slots__ = ("_snap", "_i")
+
+    def __init__(self, snap: Snapshot, i: int) -> None:
+        self._snap = snap
+        self._i = i
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._snap.fields:
+            raise KeyError(key)
+        return self._snap.value(self._i, key)
+
+    def head(self, key: str, n: int) -> Any:
+        """First n rows of a series field, decoding only those rows."""
+        if self._snap.fields[key].kind != "series":
+            raise TypeError(f"Field '{key}' is not a series")
+        return self._snap.value(self._i, key, limit=n)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snap.visible)
+
+    def __len__(self) -> int:
+        return len(self._snap.visible)
+
+    def __repr__(self) -> str:
+        return f"SnapshotRecord({dict(self)!r})"
+
+
+def prefix_total(cumsum: Optional[List[float]], n: Optional[int] = None) -> float:
+    """Sum of the first n values given their running totals (all values when n is None)."""
+    if not cumsum:
+        return 0.0
+    k = len(cumsum) if n is None else min(n, len(cumsum))
+    return cumsum[k - 1] if k > 0 else 0.0
+
+
+class RecordView(Mapping):
+    """Read-only per-request view of a shared record.
+
+    `limits` truncates series fields (e.g. {"forecast": 2}) and `extra` adds derived
+    fields; callables in `extra` are evaluated with the view when the field is read,
+    i.e. while the response is serialized. `fields` restricts the keys the view
+    lists (a projection); hidden keys stay readable. Nothing is copied up front.
+    """
+
+    __slots__ = ("_record", "_limits", "_extra", "_fields")
+
+    def __init__(
+        self,
+        record: Mapping,
+        limits: Optional[Dict[str, Optional[int]]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        self._record = record
+        self._limits = {k: n for k, n in (limits or {}).items() if n is not None}
+        self._extra = extra or {}
+        self._fields = frozenset(fields) if fields is not None else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._extra:
+            value = self._extra[key]
+            return value(self) if callable(value) else value
+        n = self._limits.get(key)
+        if n is None:
+            return self._record[key]
+        head = getattr(self._record, "head", None)
+        return head(key, n) if head is not None else list(self._record[key] or [])[:n]
+
+    def _keys(self) -> Iterator[str]:
+        yield from self._record
+        yield from (k for k in self._extra if k not in self._record)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._fields is None:
+            return self._keys()
+        return (k for k in self._keys() if k in self._fields)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class SnapshotBusy(RuntimeError):
+    """The snapshot was swapped by another process while being opened; loading again will succeed."""
+
+    # the result watcher retries such failures instead of pinning the file as failed
+    retryable = True
+
+
+@contextmanager
+def _snapshot_lock(snap_dir: Path, exclusive: bool):
+    """Shared lock while a snapshot is checked and opened, exclusive while it is compiled and swapped in.
+
+    Serializes compiles of the same snapshot across API worker processes, so a worker
+    never opens a directory that another worker is renaming away.
+    """
+    if fcntl is None:
+        yield
+        return
+    snap_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(snap_dir.with_name(f"{snap_dir.name}.lock"), "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _is_fresh(snap_dir: Path, source: Path, schema: Schema) -> bool:
+    meta = _read_meta(snap_dir)
+    return (
+        meta is not None
+        and meta.get("version") == SNAPSHOT_VERSION
+        and meta.get("schema") == [f.to_json() for f in schema]
+        and meta.get("source") == _source_signature(source)
+    )
+
+
+def _open_snapshot(snap_dir: Path) -> Snapshot:
+    try:
+        snapshot = Snapshot(snap_dir)
+    except FileNotFoundError as e:
+        raise SnapshotBusy(f"Snapshot {snap_dir} disappeared while opening it") from e
+    if not snapshot.arrays:
+        raise SnapshotBusy(f"Snapshot {snap_dir} was swapped while opening it")
+    return snapshot
+
+
+def load_snapshot(
+    source: Path,
+    group: str,
+    schema: Schema,
+    parse: Callable[[Path], Iterable[Dict[str, Any]]],
+    force: bool = False,
+    attempts: int = 3,
+) -> Snapshot:
+    """Return the snapshot of `source`, compiling it first when missing or stale.
+
+    A snapshot is fresh when it was built from a source file of the same size and
+    mtime, with the same schema and snapshot format version. When several processes
+    find it stale at once, one compiles it and the others open its build.
+    """
+    snap_dir = SNAPSHOT_DIR / group / source.stem
+    for attempt in range(attempts):
+        try:
+            if not force:
+                with _snapshot_lock(snap_dir, exclusive=False):
+                    if _is_fresh(snap_dir, source, schema):
+                        return _open_snapshot(snap_dir)
+            with _snapshot_lock(snap_dir, exclusive=True):
+                # another process may have compiled it while this one waited for the lock
+                if not force and _is_fresh(snap_dir, source, schema):
+                    return _open_snapshot(snap_dir)
+                log.info(f"Snapshot for {source} missing or stale, compiling...")
+                compile_snapshot(parse(source), schema, snap_dir, source=source)
+                return _open_snapshot(snap_dir)
+        except SnapshotBusy as e:
+            if attempt == attempts - 1:
+                raise
+            log.warning(f"{e}, retrying")
+            force = False
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Generic, List, Mapping, Optional, Tuple, TypeVar
+
+from ..utils.logger import get_logger
+
+log = get_logger("service.result_watcher")
+
+T = TypeVar("T")
+
+# file name -> (size, mtime_ns)
+Signature = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Registry(Generic[T]):
+    """Immutable set of loaded result files. A reload builds a new one and swaps it in."""
+
+    version: int
+    entries: Mapping[str, T]  # file name -> loaded value
+    signatures: Mapping[str, Signature]
+    loaded_at: float = field(default_factory=time.time)
+
+    @cached_property
+    def token(self) -> str:
+        """Content token of the loaded files; unlike `version` it is the same in every worker process."""
+        return hashlib.md5(repr(sorted(self.signatures.items())).encode("utf-8")).hexdigest()
+
+    @cached_property
+    def last_modified(self) -> float:
+        """Newest mtime of the loaded files (load time when there are none)."""
+        return max((mtime_ns / 1e9 for _, mtime_ns in self.signatures.values()), default=self.loaded_at)
+
+
+class ResultWatcher(Generic[T]):
+    """Keeps the loaded form of the result files in a directory up to date.
+
+    A background thread polls the files' size and mtime, loads new or changed files
+    off the request path, and publishes a new Registry by a single reference
+    assignment. Readers call current() and keep using whatever registry they got;
+    they never take a lock. Registry.version is a generation counter that derived
+    caches can compare against. When no poller thread is running, current() checks
+    the files itself at most once per interval.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        data_dir: Path,
+        pattern: str,
+        load_file: Callable[[Path], T],
+        interval_s: float,
+    ) -> None:
+        self.name = name
+        self.data_dir = data_dir
+        self.pattern = pattern
+        self.load_file = load_file
+        self.interval_s = interval_s
+        self._registry: Optional[Registry[T]] = None
+        self._reload_lock = threading.Lock()  # serializes reloaders only, never readers
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_check: Optional[float] = None
+        self.last_reload_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.errors: Dict[str, str] = {}
+        self._failed: Dict[str, Signature] = {}
+        self._next_check = 0.0
+        self._listeners: List[Callable[[Registry[T]], None]] = []
+
+    # --- Reading ---
+    def current(self) -> Registry[T]:
+        registry = self._registry
+        if registry is None:
+            # first use before the watcher has run (scripts, or start() not called yet)
+            self.refresh()
+            return self._registry  # type: ignore[return-value]
+        if self._thread is None and self.interval_s > 0 and time.monotonic() >= self._next_check:
+            # no background poller: check inline at most once per interval, never blocking other readers
+            self.refresh(blocking=False)
+            return self._registry  # type: ignore[return-value]
+        return registry
+
+    @property
+    def version(self) -> int:
+        registry = self._registry
+        return registry.version if registry else 0
+
+    def subscribe(self, listener: Callable[[Registry[T]], None]) -> None:
+        """Call `listener(registry)` after each swap, e.g. to drop caches built from older versions."""
+        self._listeners.append(listener)
+
+    # --- Reloading ---
+    def _scan(self) -> Dict[str, Signature]:
+        signatures: Dict[str, Signature] = {}
+        if not self.data_dir.exists():
+            return signatures
+        for p in self.data_dir.glob(self.pattern):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            signatures[p.name] = (st.st_size, st.st_mtime_ns)
+        return signatures
+
+    def refresh(self, blocking: bool = True) -> bool:
+        """Reload new/changed files and swap in a new registry. Returns True when something changed."""
+        if not self._reload_lock.acquire(blocking):
+            return False
+        try:
+            return self._refresh()
+        finally:
+            self._reload_lock.release()
+
+    def _refresh(self) -> bool:
+        t0 = time.perf_counter()
+        old = self._registry
+        old_entries = old.entries if old else {}
+        old_sigs = old.signatures if old else {}
+        signatures = self._scan()
+        self.last_check = time.time()
+        self._next_check = time.monotonic() + self.interval_s
+
+        # files that failed to load are not retried until they change again
+        self._failed = {f: sig for f, sig in self._failed.items() if signatures.get(f) == sig}
+        self.errors = {f: msg for f, msg in self.errors.items() if f in self._failed}
+        known = {**old_sigs, **self._failed}
+        if old is not None and signatures == known:
+            return False
+
+        entries: Dict[str, T] = {}
+        loaded_sigs: Dict[str, Signature] = {}
+        for fname, sig in signatures.items():
+            if fname in old_entries and (old_sigs.get(fname) == sig or self._failed.get(fname) == sig):
+                entries[fname] = old_entries[fname]
+                loaded_sigs[fname] = old_sigs[fname]
+                continue
+            if self._failed.get(fname) == sig:
+                continue
+            try:
+                entries[fname] = self.load_file(self.data_dir / fname)
+                loaded_sigs[fname] = sig
+                self.errors.pop(fname, None)
+            except Exception as e:  # noqa: BLE001
+                self.last_error = f"{fname}: {e}"
+                self.errors[fname] = str(e)
+                if getattr(e, "retryable", False):
+                    # transient (e.g. another process was swapping its snapshot): try again next check
+                    log.warning(f"[{self.name}] Could not reload {fname} yet, will retry: {e}")
+                else:
+                    self._failed[fname] = sig
+                    log.error(f"[{self.name}] Failed to reload {fname}, keeping previous data: {e}")
+                if fname in old_entries:
+                    entries[fname] = old_entries[fname]
+                    loaded_sigs[fname] = old_sigs[fname]
+        removed = set(old_entries) - set(signatures)
+
+        if old is not None and loaded_sigs == dict(old_sigs):
+            return False
+        self._registry = Registry(
+            version=(old.version + 1) if old else 1,
+            entries=MappingProxyType(entries),
+            signatures=MappingProxyType(loaded_sigs),
+        )
+        self.last_reload_ms = round((time.perf_counter() - t0) * 1000, 1)
+        log.info(
+            f"[{self.name}] Swapped in result registry v{self._registry.version}: files={len(entries)} "
+            f"removed={sorted(removed)} in {self.last_reload_ms} ms"
+        )
+        for listener in self._listeners:
+            try:
+                listener(self._registry)
+            except Exception as e:  # noqa: BLE001
+                log.exception(f"[{self.name}] Registry listener failed: {e}")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.refresh()
+            except Exception as e:  # noqa: BLE001
+                self.last_error = str(e)
+                log.exception(f"[{self.name}] Result watcher iteration failed: {e}")
+
+    def start(self) -> None:
+        """Start background polling. The first load runs in the thread so startup is not blocked."""
+        if self.interval_s <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_with_initial_load, name=f"result-watcher-{self.name}", daemon=True)
+        self._thread.start()
+        log.info(f"[{self.name}] Result watcher started for {self.data_dir / self.pattern} (every {self.interval_s}s)")
+
+    def _run_with_initial_load(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:  # noqa: BLE001
+            self.last_error = str(e)
+            log.exception(f"[{self.name}] Initial result load failed: {e}")
+        self._run()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        registry = self._registry
+        files = {}
+        if registry is not None:
+            for fname, (size, mtime_ns) in registry.signatures.items():
+                entry = registry.entries.get(fname)
+                files[fname] = {
+                    "size": size,
+                    "mtime": mtime_ns / 1e9,
+                    "records": len(entry) if hasattr(entry, "__len__") else None,
+                }
+        return {
+            "name": self.name,
+            "version": registry.version if registry else 0,
+            "loaded_at": registry.loaded_at if registry else None,
+            "last_check": self.last_check,
+            "last_reload_ms": self.last_reload_ms,
+            "watching": bool(self._thread and self._thread.is_alive()),
+            "interval_s": self.interval_s,
+            "files": files,
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+        }
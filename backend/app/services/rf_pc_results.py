@@ -1,11 +1,16 @@
 from __future__ import annotations
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import json
+import threading
 import time
 
+from ..config.settings import RESULT_RELOAD_INTERVAL_S
 from ..utils.logger import get_logger
+from .result_listing import ListingIndex
+from .result_snapshot import Field, iter_json_records, load_snapshot
+from .result_watcher import ResultWatcher
 
 log = get_logger("service.rf_pc_results")
 
@@ -18,20 +23,6 @@ DATA_DIR = (
     / "RandomForest"
 )
 
-_cache: Dict = {"mtime": None, "records": []}
-
-
-def _dir_mtime(path: Path) -> float:
-    if not path.exists():
-        return 0.0
-    latest = 0.0
-    for p in path.glob("*.json"):
-        try:
-            latest = max(latest, p.stat().st_mtime)
-        except Exception:  # noqa: BLE001
-            pass
-    return latest
-
 
 def _normalize_date(ds: str | None) -> str:
     if not ds:
@@ -40,143 +31,207 @@ def _normalize_date(ds: str | None) -> str:
     return str(ds)[:10]
 
 
-def _load_files() -> List[Dict]:
-    records: List[Dict] = []
-    if not DATA_DIR.exists():
-        log.warning(f"Result directory not found: {DATA_DIR}")
-        return records
-
-    for fp in DATA_DIR.glob("*.json"):
-        try:
-            with fp.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
-        except Exception as e:  # noqa: BLE001
-            log.exception(f"Failed to read {fp}: {e}")
+def _normalize_record(rec: Dict) -> Dict:
+    # --- Basic fields ---
+    customer_code = rec.get("CustomerCode") or rec.get("customer_code")
+    product_code = rec.get("ProductCode") or rec.get("product_code")
+    model = rec.get("Model") or rec.get("model") or "RandomForest"
+    metrics = {
+        "MAE": float(rec.get("MAE", 0) or 0),
+        "RMSE": float(rec.get("RMSE", 0) or 0),
+        "MAPE": float(rec.get("MAPE", 0) or 0),
+    }
+
+    # --- Train end date (various possible keys) ---
+    train_end_raw: Optional[str] = (
+        rec.get("TrainEndDate")
+        or rec.get("train_end_date")
+        or rec.get("train_end")
+        or rec.get("LastTrainDate")
+        or rec.get("last_train_date")
+        or rec.get("train_last_date")
+        or rec.get("last_train_ds")
+    )
+    train_end_date = _normalize_date(train_end_raw)
+
+    # --- History (actual) ---
+    history_list: List[Dict] = []
+    history_src = (
+        rec.get("history")
+        or rec.get("actuals")
+        or rec.get("historical")
+        or rec.get("actual")
+    )
+    if isinstance(history_src, list):
+        for h in history_src:
+            date = _normalize_date(h.get("ds") or h.get("date"))
+            val = h.get("actual")
+            if val is None:
+                val = h.get("y") or h.get("y_true") or h.get("value")
+            if date:
+                try:
+                    history_list.append({"date": date, "actual": float(val) if val is not None else None})
+                except Exception:  # noqa: BLE001
+                    history_list.append({"date": date, "actual": None})
+
+    # --- Forecast ---
+    forecasts = rec.get("forecast") or rec.get("forecasts") or rec.get("predictions") or []
+    fc_list: List[Dict] = []
+    for r in forecasts or []:
+        date = _normalize_date(r.get("ds") or r.get("date"))
+        # skip entries that fall into training range if train_end_date is known
+        if train_end_date and date and date <= train_end_date:
+            # If combined timeline holds actuals inside forecast rows
+            actual_val = r.get("actual") or r.get("y") or r.get("y_true")
+            if actual_val is not None:
+                try:
+                    history_list.append({"date": date, "actual": float(actual_val)})
+                except Exception:  # noqa: BLE001
+                    history_list.append({"date": date, "actual": None})
             continue
 
-        rows = payload if isinstance(payload, list) else [payload]
-        for rec in rows:
-            # --- Basic fields ---
-            customer_code = rec.get("CustomerCode") or rec.get("customer_code")
-            product_code = rec.get("ProductCode") or rec.get("product_code")
-            model = rec.get("Model") or rec.get("model") or "RandomForest"
-            metrics = {
-                "MAE": float(rec.get("MAE", 0) or 0),
-                "RMSE": float(rec.get("RMSE", 0) or 0),
-                "MAPE": float(rec.get("MAPE", 0) or 0),
-            }
-
-            # --- Train end date (various possible keys) ---
-            train_end_raw: Optional[str] = (
-                rec.get("TrainEndDate")
-                or rec.get("train_end_date")
-                or rec.get("train_end")
-                or rec.get("LastTrainDate")
-                or rec.get("last_train_date")
-                or rec.get("train_last_date")
-                or rec.get("last_train_ds")
+        try:
+            fc_list.append(
+                {
+                    "date": date,
+                    "yhat": float(r.get("yhat", 0) or 0),
+                    "yhat_lower_80": float(r.get("yhat_lower_80", 0) or 0),
+                    "yhat_upper_80": float(r.get("yhat_upper_80", 0) or 0),
+                }
             )
-            train_end_date = _normalize_date(train_end_raw)
-
-            # --- History (actual) ---
-            history_list: List[Dict] = []
-            history_src = (
-                rec.get("history")
-                or rec.get("actuals")
-                or rec.get("historical")
-                or rec.get("actual")
+        except Exception:  # noqa: BLE001
+            fc_list.append(
+                {
+                    "date": date,
+                    "yhat": None,
+                    "yhat_lower_80": None,
+                    "yhat_upper_80": None,
+                }
             )
-            if isinstance(history_src, list):
-                for h in history_src:
-                    date = _normalize_date(h.get("ds") or h.get("date"))
-                    val = h.get("actual")
-                    if val is None:
-                        val = h.get("y") or h.get("y_true") or h.get("value")
-                    if date:
-                        try:
-                            history_list.append({"date": date, "actual": float(val) if val is not None else None})
-                        except Exception:  # noqa: BLE001
-                            history_list.append({"date": date, "actual": None})
-
-            # --- Forecast ---
-            forecasts = rec.get("forecast") or rec.get("forecasts") or rec.get("predictions") or []
-            fc_list: List[Dict] = []
-            for r in forecasts or []:
-                date = _normalize_date(r.get("ds") or r.get("date"))
-                # skip entries that fall into training range if train_end_date is known
-                if train_end_date and date and date <= train_end_date:
-                    # If combined timeline holds actuals inside forecast rows
-                    actual_val = r.get("actual") or r.get("y") or r.get("y_true")
-                    if actual_val is not None:
-                        try:
-                            history_list.append({"date": date, "actual": float(actual_val)})
-                        except Exception:  # noqa: BLE001
-                            history_list.append({"date": date, "actual": None})
-                    continue
 
-                try:
-                    fc_list.append(
-                        {
-                            "date": date,
-                            "yhat": float(r.get("yhat", 0) or 0),
-                            "yhat_lower_80": float(r.get("yhat_lower_80", 0) or 0),
-                            "yhat_upper_80": float(r.get("yhat_upper_80", 0) or 0),
-                        }
-                    )
-                except Exception:  # noqa: BLE001
-                    fc_list.append(
-                        {
-                            "date": date,
-                            "yhat": None,
-                            "yhat_lower_80": None,
-                            "yhat_upper_80": None,
-                        }
-                    )
-
-            # Transition date: prefer explicit train_end_date, else last history date
-            transition_date = train_end_date
-            if not transition_date and history_list:
-                try:
-                    transition_date = max(h.get("date") or "" for h in history_list) or None
-                except Exception:  # noqa: BLE001
-                    transition_date = None
-            # If still missing, infer as the day before the first forecast date
-            if not transition_date and fc_list:
-                try:
-                    fc_dates = [x.get("date") for x in fc_list if x.get("date")]
-                    if fc_dates:
-                        first_fc = min(fc_dates)
-                        d = datetime.strptime(first_fc, "%Y-%m-%d") - timedelta(days=1)
-                        transition_date = d.strftime("%Y-%m-%d")
-                except Exception:  # noqa: BLE001
-                    pass
-
-            item = {
-                "customer_code": customer_code,
-                "product_code": product_code,
-                "model": model,
-                "metrics": metrics,
-                "train_end_date": train_end_date,
-                "transition_date": transition_date,
-                "history": history_list,
-                "forecast": fc_list,
-            }
-            records.append(item)
-    return records
+    # Transition date: prefer explicit train_end_date, else last history date
+    transition_date = train_end_date
+    if not transition_date and history_list:
+        try:
+            transition_date = max(h.get("date") or "" for h in history_list) or None
+        except Exception:  # noqa: BLE001
+            transition_date = None
+    # If still missing, infer as the day before the first forecast date
+    if not transition_date and fc_list:
+        try:
+            fc_dates = [x.get("date") for x in fc_list if x.get("date")]
+            if fc_dates:
+                first_fc = min(fc_dates)
+                d = datetime.strptime(first_fc, "%Y-%m-%d") - timedelta(days=1)
+                transition_date = d.strftime("%Y-%m-%d")
+        except Exception:  # noqa: BLE001
+            pass
 
+    item = {
+        "customer_code": customer_code,
+        "product_code": product_code,
+        "model": model,
+        "metrics": metrics,
+        "train_end_date": train_end_date,
+        "transition_date": transition_date,
+        "history": history_list,
+        "forecast": fc_list,
+    }
+    return item
+
+
+# Column layout of a normalized record in the compiled snapshot
+RF_SCHEMA = (
+    Field("customer_code", "str"),
+    Field("product_code", "str"),
+    Field("model", "str"),
+    Field("metrics", "metrics", ("MAE", "RMSE", "MAPE")),
+    Field("train_end_date", "str"),
+    Field("transition_date", "str"),
+    Field("history", "series", ("actual",)),
+    Field("forecast", "series", ("yhat", "yhat_lower_80", "yhat_upper_80")),
+)
+
+
+def _parse_file(fp: Path):
+    """Read a raw result file and yield normalized records (used when compiling its snapshot)."""
+    for rec in iter_json_records(fp):
+        yield _normalize_record(rec)
+
+
+def _load_file(fp: Path) -> List[Dict]:
+    """Records of one result file, served from its snapshot (called by the result watcher)."""
+    return load_snapshot(fp, "rf", RF_SCHEMA, _parse_file).records()
+
+
+# Loaded RandomForest result files, reloaded in the background when a file is added or changes
+rf_results: ResultWatcher[List[Dict]] = ResultWatcher(
+    "rf", DATA_DIR, "*.json", _load_file, RESULT_RELOAD_INTERVAL_S
+)
+
+# Sort order and exact-match filters of the list endpoint
+RF_LIST_KEY = ("customer_code", "product_code", "model")
+RF_LIST_FILTERS = ("customer_code", "product_code")
+
+
+@dataclass(frozen=True)
+class _RFState:
+    """Concatenated records and list index derived from one registry version."""
+
+    version: int
+    records: List[Dict]
+    listing: ListingIndex
+
+
+_state = _RFState(version=-1, records=[], listing=ListingIndex([], RF_LIST_KEY, RF_LIST_FILTERS))
+_state_lock = threading.Lock()
 
-def load_rf_pc_records(force_reload: bool = False) -> List[Dict]:
-    start = time.perf_counter()
-    mtime = _dir_mtime(DATA_DIR)
-    if not force_reload and _cache.get("mtime") == mtime and _cache.get("records"):
-        return _cache["records"]
 
-    records = _load_files()
-    _cache["mtime"] = mtime
-    _cache["records"] = records
+def _build_state(registry) -> _RFState:
+    start = time.perf_counter()
+    if not DATA_DIR.exists():
+        log.warning(f"Result directory not found: {DATA_DIR}")
+    records: List[Dict] = []
+    for fname in sorted(registry.entries):
+        records.extend(registry.entries[fname])
+    listing = ListingIndex(records, RF_LIST_KEY, RF_LIST_FILTERS)
     dur = (time.perf_counter() - start) * 1000
     log.info(
-        f"Loaded RF Product-Customer results: files={len(list(DATA_DIR.glob('*.json')))} "
+        f"Loaded RF Product-Customer results v{registry.version}: files={len(registry.entries)} "
         f"records={len(records)} ({dur:.1f} ms)"
     )
-    return records
+    return _RFState(version=registry.version, records=records, listing=listing)
+
+
+def _install_state(registry) -> _RFState:
+    global _state
+    state = _build_state(registry)
+    with _state_lock:
+        # a slow rebuild for an older version must not replace a newer one
+        if state.version > _state.version:
+            _state = state
+    return state
+
+
+def _current_state() -> _RFState:
+    """Derived state for the current registry; built on each reload, or here if a read races ahead of it."""
+    registry = rf_results.current()
+    state = _state
+    if state.version != registry.version:
+        state = _install_state(registry)
+    return state
+
+
+# Build the list index as soon as a new registry version is swapped in
+rf_results.subscribe(_install_state)
+
+
+def load_rf_pc_records(force_reload: bool = False) -> List[Dict]:
+    if force_reload:
+        rf_results.refresh()
+    return _current_state().records
+
+
+def get_rf_pc_listing() -> ListingIndex:
+    """Sorted, filter-indexed records of the current registry for the list endpoint."""
+    return _current_state().listing
@@ -1,11 +1,19 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import json
+import threading
 import time
 
+import numpy as np
+
+from ..config.settings import RESULT_RELOAD_INTERVAL_S
 from ..utils.logger import get_logger
+from .leaderboard import Leaderboard, build_leaderboards
+from .result_listing import ListingIndex
+from .result_snapshot import Field, iter_json_records, load_snapshot
+from .result_watcher import ResultWatcher
 
 log = get_logger("service.sku_forecast")
 
@@ -17,20 +25,6 @@ DATA_DIR = (
     / "DemandForecast_Skus"
 )
 
-_cache: Dict = {"mtime": None, "_sku_models": [], "records": [], "lookup_map": {}}
-
-
-def _dir_mtime(path: Path) -> float:
-    if not path.exists():
-        return 0.0
-    latest = 0.0
-    for p in path.glob("*.json"):
-        try:
-            latest = max(latest, p.stat().st_mtime)
-        except Exception:  # noqa: BLE001
-            pass
-    return latest
-
 
 def _normalize_date(ds: Optional[str]) -> str:
     if not ds:
@@ -45,143 +39,260 @@ def _as_float(v) -> Optional[float]:
         return None
 
 
-def _load_files() -> List[Dict]:
-    records: List[Dict] = []
-    if not DATA_DIR.exists():
-        log.warning(f"SKU result directory not found: {DATA_DIR}")
-        return records
-
-    for fp in DATA_DIR.glob("*.json"):
-        try:
-            with fp.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
-        except Exception as e:  # noqa: BLE001
-            log.exception(f"Failed to read {fp}: {e}")
-            continue
+def _normalize_record(rec: Dict) -> Dict:
+    product_code = rec.get("product_code") or rec.get("ProductCode")
+    # Cast to string to keep consistency in frontend filters
+    if product_code is not None:
+        product_code = str(product_code)
+
+    model = rec.get("model") or rec.get("Model")
+
+    # metrics can be nested or flattened
+    metrics_obj = rec.get("metrics") or {}
+    mae = metrics_obj.get("MAE", rec.get("MAE"))
+    rmse = metrics_obj.get("RMSE", rec.get("RMSE"))
+    mape = metrics_obj.get("MAPE", rec.get("MAPE"))
+    metrics = {
+        "MAE": _as_float(mae),
+        "RMSE": _as_float(rmse),
+        "MAPE": _as_float(mape),
+    }
+
+    train_end_date = _normalize_date(
+        rec.get("train_end_date")
+        or rec.get("TrainEndDate")
+        or rec.get("LastTrainDate")
+    )
 
-        rows = payload if isinstance(payload, list) else [payload]
-        for rec in rows:
-            product_code = rec.get("product_code") or rec.get("ProductCode")
-            # Cast to string to keep consistency in frontend filters
-            if product_code is not None:
-                product_code = str(product_code)
-
-            model = rec.get("model") or rec.get("Model")
-
-            # metrics can be nested or flattened
-            metrics_obj = rec.get("metrics") or {}
-            mae = metrics_obj.get("MAE", rec.get("MAE"))
-            rmse = metrics_obj.get("RMSE", rec.get("RMSE"))
-            mape = metrics_obj.get("MAPE", rec.get("MAPE"))
-            metrics = {
-                "MAE": _as_float(mae),
-                "RMSE": _as_float(rmse),
-                "MAPE": _as_float(mape),
-            }
-
-            train_end_date = _normalize_date(
-                rec.get("train_end_date")
-                or rec.get("TrainEndDate")
-                or rec.get("LastTrainDate")
+    # History: list of {date, actual}
+    history_list: List[Dict] = []
+    history_src = rec.get("history") or rec.get("actuals") or rec.get("historical")
+    if isinstance(history_src, list):
+        for h in history_src:
+            d = _normalize_date(h.get("date") or h.get("ds"))
+            a = h.get("actual") if "actual" in h else h.get("y")
+            history_list.append({"date": d, "actual": _as_float(a)})
+    # sort history
+    history_list = sorted([h for h in history_list if h.get("date")], key=lambda x: x["date"])  # type: ignore
+
+    # Forecast: list of {date, forecast, lower_80, upper_80}
+    forecast_list: List[Dict] = []
+    fc_src = rec.get("forecast") or rec.get("forecasts") or []
+    if isinstance(fc_src, list):
+        for r in fc_src:
+            d = _normalize_date(r.get("date") or r.get("Week") or r.get("ds"))
+            if train_end_date and d and d <= train_end_date:
+                # ignore any points that sit in train range
+                continue
+            y = r.get("forecast") if "forecast" in r else (r.get("yhat"))
+            lo = r.get("lower_80") if "lower_80" in r else (r.get("yhat_lower_80") or r.get("lower80"))
+            up = r.get("upper_80") if "upper_80" in r else (r.get("yhat_upper_80") or r.get("upper80"))
+            forecast_list.append(
+                {
+                    "date": d,
+                    "forecast": _as_float(y),
+                    "lower_80": _as_float(lo),
+                    "upper_80": _as_float(up),
+                }
             )
+    # sort forecast
+    forecast_list = sorted([r for r in forecast_list if r.get("date")], key=lambda x: x["date"])  # type: ignore
+
+    # Derived values served as-is by the handlers (see SKU_SCHEMA hidden fields)
+    forecast_cumsum: List[float] = []
+    running = 0.0
+    for r in forecast_list:
+        if r.get("forecast") is not None:
+            running += r["forecast"]
+        forecast_cumsum.append(running)
+    ci_lower = {r["date"]: r["lower_80"] for r in forecast_list if r.get("lower_80") is not None}
+    ci_upper = {r["date"]: r["upper_80"] for r in forecast_list if r.get("upper_80") is not None}
+
+    # Demand stats: prefer the file's stats block, else mean / sample std of the history
+    stats = rec.get("stats") or {}
+    demand_mean = _as_float(stats.get("demand_mean"))
+    demand_std = _as_float(stats.get("demand_std"))
+    if demand_mean is None or demand_std is None:
+        actuals = [h["actual"] for h in history_list if h.get("actual") is not None]
+        if len(actuals) >= 2:  # at least 2 points are needed for a standard deviation
+            demand_mean = float(np.mean(actuals))
+            demand_std = float(np.std(actuals, ddof=1))
+        else:
+            demand_mean = demand_std = None
+
+    item = {
+        "product_code": product_code,
+        "model": model,
+        "metrics": metrics,
+        "train_end_date": train_end_date,
+        "history": history_list,
+        "forecast": forecast_list,
+        "forecast_cumsum": forecast_cumsum,
+        "ci_lower": ci_lower,
+        "ci_upper": ci_upper,
+        "demand_mean": demand_mean,
+        "demand_std_dev": demand_std,
+    }
+    return item
+
+
+# Column layout of a normalized record in the compiled snapshot
+SKU_SCHEMA = (
+    Field("product_code", "str"),
+    Field("model", "str"),
+    Field("metrics", "metrics", ("MAE", "RMSE", "MAPE")),
+    Field("train_end_date", "str"),
+    Field("history", "series", ("actual",)),
+    Field("forecast", "series", ("forecast", "lower_80", "upper_80")),
+    Field("forecast_cumsum", "vector", hidden=True),
+    Field("ci_lower", "datemap", hidden=True),
+    Field("ci_upper", "datemap", hidden=True),
+    Field("demand_mean", "float", hidden=True),
+    Field("demand_std_dev", "float", hidden=True),
+)
+
+
+def _parse_file(fp: Path):
+    """Read a raw SKU result file and yield normalized records (used when compiling its snapshot)."""
+    for rec in iter_json_records(fp):
+        yield _normalize_record(rec)
+
+
+def _load_file(fp: Path) -> List[Dict]:
+    """Records of one SKU result file, served from its snapshot (called by the result watcher)."""
+    return load_snapshot(fp, "sku", SKU_SCHEMA, _parse_file).records()
+
+
+# Loaded SKU result files, reloaded in the background when a file is added or changes
+sku_results: ResultWatcher[List[Dict]] = ResultWatcher(
+    "sku", DATA_DIR, "*.json", _load_file, RESULT_RELOAD_INTERVAL_S
+)
+
+
+@dataclass(frozen=True)
+class _SkuState:
+    """Records, lookup map and model list derived from one registry version."""
+
+    version: int
+    records: List[Dict]
+    lookup_map: Dict[str, Dict[str, Dict]]
+    models: List[str]
+    # list endpoint order (product_code, model) and indexes of its filters
+    listing: ListingIndex
+    # normalized model name -> metric -> records ordered by it (the records find_sku_forecast_record returns)
+    leaderboards: Dict[str, Dict[str, Leaderboard]]
+    # normalized model name -> display name, as listed by get_sku_models
+    model_names: Dict[str, str]
+
+
+_state = _SkuState(
+    version=-1, records=[], lookup_map={}, models=[], listing=ListingIndex([], (), ()), leaderboards={},
+    model_names={},
+)
+_state_lock = threading.Lock()
+
+
+def _build_state(registry) -> _SkuState:
+    start = time.perf_counter()
+    if not DATA_DIR.exists():
+        log.warning(f"SKU result directory not found: {DATA_DIR}")
 
-            # History: list of {date, actual}
-            history_list: List[Dict] = []
-            history_src = rec.get("history") or rec.get("actuals") or rec.get("historical")
-            if isinstance(history_src, list):
-                for h in history_src:
-                    d = _normalize_date(h.get("date") or h.get("ds"))
-                    a = h.get("actual") if "actual" in h else h.get("y")
-                    history_list.append({"date": d, "actual": _as_float(a)})
-            # sort history
-            history_list = sorted([h for h in history_list if h.get("date")], key=lambda x: x["date"])  # type: ignore
-
-            # Forecast: list of {date, forecast, lower_80, upper_80}
-            forecast_list: List[Dict] = []
-            fc_src = rec.get("forecast") or rec.get("forecasts") or []
-            if isinstance(fc_src, list):
-                for r in fc_src:
-                    d = _normalize_date(r.get("date") or r.get("Week") or r.get("ds"))
-                    if train_end_date and d and d <= train_end_date:
-                        # ignore any points that sit in train range
-                        continue
-                    y = r.get("forecast") if "forecast" in r else (r.get("yhat"))
-                    lo = r.get("lower_80") if "lower_80" in r else (r.get("yhat_lower_80") or r.get("lower80"))
-                    up = r.get("upper_80") if "upper_80" in r else (r.get("yhat_upper_80") or r.get("upper80"))
-                    forecast_list.append(
-                        {
-                            "date": d,
-                            "forecast": _as_float(y),
-                            "lower_80": _as_float(lo),
-                            "upper_80": _as_float(up),
-                        }
-                    )
-            # sort forecast
-            forecast_list = sorted([r for r in forecast_list if r.get("date")], key=lambda x: x["date"])  # type: ignore
-
-            item = {
-                "product_code": product_code,
-                "model": model,
-                "metrics": metrics,
-                "train_end_date": train_end_date,
-                "history": history_list,
-                "forecast": forecast_list,
-            }
-            records.append(item)
+    records: List[Dict] = []
+    for fname in sorted(registry.entries):
+        records.extend(registry.entries[fname])
 
     # Build a lookup map for faster access
     # { product_code: { model_name: record } }
     lookup_map = {}
+    all_models = set()
+    model_names: Dict[str, str] = {}
     for item in records:
         pc = item.get("product_code")
         mdl = item.get("model")
+        if mdl:
+            # Normalize common typo
+            if mdl.strip().lower() == 'lighgbm':
+                all_models.add('LightGBM')
+            else:
+                all_models.add(mdl.strip())
         if not pc or not mdl:
             continue
 
         # Normalize model name for robust matching
         mdl_key = str(mdl).strip().lower()
+        model_names.setdefault(mdl_key, 'LightGBM' if mdl_key == 'lighgbm' else str(mdl).strip())
 
         if pc not in lookup_map:
             lookup_map[pc] = {}
         lookup_map[pc][mdl_key] = item
 
-    return records, lookup_map
+    by_model: Dict[str, List[Dict]] = {}
+    for per_model in lookup_map.values():
+        for mdl_key, item in per_model.items():
+            by_model.setdefault(mdl_key, []).append(item)
+    leaderboards = {mdl_key: build_leaderboards(items) for mdl_key, items in by_model.items()}
+
+    dur = (time.perf_counter() - start) * 1000
+    log.info(
+        f"Loaded SKU results v{registry.version}: files={len(registry.entries)} records={len(records)} ({dur:.1f} ms)"
+    )
+    return _SkuState(
+        version=registry.version,
+        records=records,
+        lookup_map=lookup_map,
+        models=sorted(all_models),
+        listing=ListingIndex(records, ("product_code", "model"), ("product_code", "model")),
+        leaderboards=leaderboards,
+        model_names=model_names,
+    )
+
+
+def _install_state(registry) -> _SkuState:
+    global _state
+    state = _build_state(registry)
+    with _state_lock:
+        # a slow rebuild for an older version must not replace a newer one
+        if state.version > _state.version:
+            _state = state
+    return state
+
+
+def _current_state() -> _SkuState:
+    """Derived state for the current registry; built on each reload, or here if a read races ahead of it."""
+    registry = sku_results.current()
+    state = _state
+    if state.version != registry.version:
+        state = _install_state(registry)
+    return state
+
+
+# Build the lookup map, listing and leaderboards as soon as a new registry version is swapped in
+sku_results.subscribe(_install_state)
 
 
 def load_sku_records(force_reload: bool = False) -> List[Dict]:
-    start = time.perf_counter()
-    mtime = _dir_mtime(DATA_DIR)
-    if not force_reload and _cache.get("mtime") == mtime and _cache.get("lookup_map"):
-        return _cache["records"]
+    if force_reload:
+        sku_results.refresh()
+    return _current_state().records
 
-    records, lookup_map = _load_files()
-    all_models = set()
-    for record in records:
-        model_name = record.get("model")
-        if model_name:
-            # Normalize common typo
-            if model_name.strip().lower() == 'lighgbm':
-                all_models.add('LightGBM')
-            else:
-                all_models.add(model_name.strip())
-    _cache["_sku_models"] = sorted(list(all_models))
 
-    _cache["mtime"] = mtime
-    _cache["records"] = records
-    _cache["lookup_map"] = lookup_map
-    dur = (time.perf_counter() - start) * 1000
-    log.info(
-        f"Loaded SKU results: files={len(list(DATA_DIR.glob('*.json')))} records={len(records)} ({dur:.1f} ms)"
-    )
-    return records
+def get_sku_listing() -> ListingIndex:
+    """Sorted, filter-indexed SKU records of the current registry for the list endpoint."""
+    return _current_state().listing
+
+
+def get_sku_leaderboards(model: str) -> Tuple[str, Dict[str, Leaderboard]]:
+    """(display name of the model, its leaderboards by metric); empty boards when the model has no results."""
+    state = _current_state()
+    model_key = model.strip().lower()
+    if model_key not in state.leaderboards and model_key == "lightgbm":
+        model_key = "lighgbm"  # same typo fallback as find_sku_forecast_record
+    return state.model_names.get(model_key, model.strip()), state.leaderboards.get(model_key, {})
 
 
 def find_sku_forecast_record(product_code: str, model: str) -> Optional[Dict]:
     """Finds a specific SKU forecast record from the cache."""
-    # Ensure cache is populated and up-to-date
-    load_sku_records()
-
-    lookup_map = _cache.get("lookup_map", {})
+    lookup_map = _current_state().lookup_map
 
     # Normalize inputs for matching
     p_code_key = str(product_code).strip()
@@ -201,6 +312,4 @@ def find_sku_forecast_record(product_code: str, model: str) -> Optional[Dict]:
 
 def get_sku_models() -> list[str]:
     """Returns a list of available SKU forecast models."""
-    # Ensure cache is populated and up-to-date
-    load_sku_records()
-    return _cache.get("_sku_models", [])
+    return _current_state().models
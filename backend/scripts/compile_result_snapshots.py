@@ -0,0 +1,41 @@
+from pathlib import Path
+import sys
+
+# Add project root to sys.path to allow for relative imports
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+
+from app.services import pc_forecast_service, rf_pc_results, sku_forecast_service
+from app.services.result_snapshot import load_snapshot
+from app.utils.logger import get_logger
+
+log = get_logger("script.compile_result_snapshots")
+
+# (snapshot group, source directory, schema, parser)
+SOURCES = [
+    ("pc", pc_forecast_service.DATA_DIR, pc_forecast_service.PC_SCHEMA, pc_forecast_service._parse_model_file),
+    ("sku", sku_forecast_service.DATA_DIR, sku_forecast_service.SKU_SCHEMA, sku_forecast_service._parse_file),
+    ("rf", rf_pc_results.DATA_DIR, rf_pc_results.RF_SCHEMA, rf_pc_results._parse_file),
+]
+
+
+def compile_all(force: bool = False):
+    """
+    Compiles every model result JSON file into its columnar snapshot, so that
+    API workers start by memory-mapping the snapshots instead of parsing JSON.
+    """
+    for group, data_dir, schema, parse in SOURCES:
+        if not data_dir.exists():
+            log.warning(f"Result directory not found, skipping: {data_dir}")
+            continue
+        pattern = "*_results.json" if group == "pc" else "*.json"
+        for fp in sorted(data_dir.glob(pattern)):
+            try:
+                snapshot = load_snapshot(fp, group, schema, parse, force=force)
+                log.info(f"[{group}] {fp.name}: {len(snapshot)} records -> {snapshot.path}")
+            except Exception as e:
+                log.error(f"[{group}] Failed to compile {fp}: {e}")
+
+
+if __name__ == "__main__":
+    compile_all(force="--force" in sys.argv[1:])
@@ -0,0 +1,74 @@
+from functools import partial
+from pathlib import Path
+import shutil
+import sys
+
+import pytest
+
+# Add the backend root to sys.path so tests import the app package the way the scripts do
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_snapshot_dir(tmp_path_factory):
+    """Compile result snapshots into a temporary directory instead of data/snapshots."""
+    from app.services import result_snapshot
+
+    original = result_snapshot.SNAPSHOT_DIR
+    result_snapshot.SNAPSHOT_DIR = tmp_path_factory.mktemp("snapshots")
+    yield result_snapshot.SNAPSHOT_DIR
+    result_snapshot.SNAPSHOT_DIR = original
+
+
+@pytest.fixture
+def forecast_settings(monkeypatch):
+    """Override forecast_service settings here and in the workers of a fresh process pool.
+
+    Pool workers do not fork from the test process, so they only see overrides applied
+    by their initializer; call the returned function before the pool is first used.
+    """
+    from app.services import forecast_service
+    from reference import init_pool_worker
+
+    overrides = {}
+
+    def apply(**values):
+        overrides.update(values)
+        for name, value in values.items():
+            monkeypatch.setattr(forecast_service, name, value)
+        monkeypatch.setattr(forecast_service, "_mark_pool_worker", partial(init_pool_worker, dict(overrides)))
+
+    forecast_service.shutdown_process_pool()
+    yield apply
+    forecast_service.shutdown_process_pool()
+
+
+@pytest.fixture
+def pc_copy(tmp_path):
+    """Point the PC result watcher at a writable copy of the result files."""
+    from app.services.pc_forecast_service import pc_results
+
+    original = pc_results.data_dir
+    for src in original.glob("*_results.json"):
+        shutil.copy(src, tmp_path / src.name)
+    pc_results.data_dir = tmp_path
+    pc_results.refresh()
+    yield tmp_path
+    pc_results.data_dir = original
+    pc_results.refresh()
+
+
+@pytest.fixture
+def sku_copy(tmp_path):
+    """Point the SKU result watcher at a writable copy of the result files."""
+    from app.services.sku_forecast_service import sku_results
+
+    original = sku_results.data_dir
+    for src in original.glob("*.json"):
+        shutil.copy(src, tmp_path / src.name)
+    sku_results.data_dir = tmp_path
+    sku_results.refresh()
+    yield tmp_path
+    sku_results.data_dir = original
+    sku_results.refresh()
@@ -0,0 +1,183 @@
+"""Straightforward per-series implementations the vectorized forecast engines must reproduce."""
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+
+def regression_forecast(y: np.ndarray, horizon: int, model) -> List[float]:
+    """Lag-1/lag-7 regression fitted on one series and rolled forward one step at a time."""
+    df = pd.DataFrame({"y": y})
+    for lag in [1, 7]:
+        df[f"lag_{lag}"] = df["y"].shift(lag)
+    df = df.dropna()
+    if len(df) < 5:
+        return [float(y[-1]) if len(y) else 0.0] * horizon
+    X = df[[c for c in df.columns if c.startswith("lag_")]].values
+    model.fit(X, df["y"].values)
+
+    last_values = list(y[-7:])
+    while len(last_values) < 7:
+        last_values = [last_values[0]] + last_values
+    preds: List[float] = []
+    for _ in range(horizon):
+        yhat = max(0.0, float(model.predict(np.array([[last_values[-1], last_values[-7]]]))[0]))
+        preds.append(yhat)
+        last_values = (last_values + [yhat])[-7:]
+    return preds
+
+
+def linreg_forecast(y: np.ndarray, horizon: int) -> List[float]:
+    return regression_forecast(y, horizon, LinearRegression())
+
+
+def rf_forecast(y: np.ndarray, horizon: int, n_estimators: int) -> List[float]:
+    return regression_forecast(y, horizon, RandomForestRegressor(n_estimators=n_estimators, random_state=42))
+
+
+def global_forecast(values: List[np.ndarray], horizon: int, model) -> List[List[float]]:
+    """One regressor fitted on the mean-scaled lag rows of every series, rolled out per series."""
+    rows, targets, statics = [], [], {}
+    for i, y in enumerate(values):
+        if not len(y):
+            continue
+        level = y.mean()
+        scale = level if level > 0 else 1.0
+        statics[i] = (scale, [np.log1p(max(level, 0.0)), float(np.mean(y == 0))])
+        v = list(y / scale)
+        for t in range(7, len(v)):
+            rows.append([v[t - 1], v[t - 7]] + statics[i][1])
+            targets.append(v[t])
+    if len(targets) < 5:
+        return [[float(y[-1]) if len(y) else 0.0] * horizon for y in values]
+    model.fit(np.array(rows), np.array(targets))
+
+    out = []
+    for i, y in enumerate(values):
+        if i not in statics:
+            out.append([0.0] * horizon)
+            continue
+        scale, static = statics[i]
+        window = list(y[-7:] / scale)
+        window = [window[0]] * (7 - len(window)) + window
+        preds = []
+        for _ in range(horizon):
+            yhat = max(0.0, float(model.predict(np.array([[window[-1], window[0]] + static]))[0]))
+            preds.append(yhat * scale)
+            window = window[1:] + [yhat]
+        out.append(preds)
+    return out
+
+
+def resample_daily(df: pd.DataFrame, group_cols: List[str]):
+    """(key, daily series) per group, missing days filled with 0, groups in sorted key order."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce").dt.tz_convert(None)
+    df = df.dropna(subset=["date"]).sort_values("date")
+    out = []
+    for key, g in df.groupby(group_cols):
+        s = g.set_index("date")["quantity_sold"].astype(float).resample("D").sum().sort_index()
+        out.append((key if isinstance(key, tuple) else (key,), s))
+    return out
+
+
+def ses_forecast(y: np.ndarray, horizon: int, alpha: float) -> List[float]:
+    level = y[0] if len(y) else 0.0
+    for v in y[1:]:
+        level = alpha * v + (1 - alpha) * level
+    return [max(level, 0.0)] * horizon
+
+
+def croston_forecast(y: np.ndarray, horizon: int, alpha: float, sba: bool = False) -> List[float]:
+    z = p = None
+    q = 1
+    for v in y:
+        if v > 0:
+            if z is None:
+                z, p = v, q
+            else:
+                z += alpha * (v - z)
+                p += alpha * (q - p)
+            q = 1
+        else:
+            q += 1
+    if z is None:
+        return [0.0] * horizon
+    rate = z / p
+    if sba:
+        rate *= 1 - alpha / 2
+    return [rate] * horizon
+
+
+def holt_winters_forecast(
+    y: np.ndarray, horizon: int, m: int, alpha: float, beta: float, gamma: float, ses_alpha: float
+) -> List[float]:
+    """Additive Holt-Winters initialised from the first two seasons; SES for shorter series."""
+    if len(y) < 2 * m:
+        return ses_forecast(y, horizon, ses_alpha)
+    level = y[:m].mean()
+    trend = (y[m : 2 * m].mean() - level) / m
+    season = list(y[:m] - level)
+    for t in range(m, len(y)):
+        s_prev = season[t % m]
+        new_level = alpha * (y[t] - s_prev) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[t % m] = gamma * (y[t] - new_level) + (1 - gamma) * s_prev
+        level = new_level
+    n = len(y)
+    return [max(level + h * trend + season[(n - 1 + h) % m], 0.0) for h in range(1, horizon + 1)]
+
+
+def random_panel_rows(n_series: int, seed: int = 0, min_len: int = 3, max_len: int = 60) -> List[np.ndarray]:
+    """Demand-like series of varied length: some smooth, some intermittent, some too short to fit."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_series):
+        n = int(rng.integers(min_len, max_len))
+        base = rng.gamma(2.0, 20.0, n)
+        if i % 3 == 0:
+            base *= rng.random(n) < 0.3  # intermittent
+        rows.append(np.round(base, 2))
+    return rows
+
+
+
+def panel_from_rows(rows: List[np.ndarray]):
+    """Left-aligned SeriesPanel holding `rows`, as _resample_series would build it."""
+    from app.services.forecast_service import SeriesPanel
+
+    lengths = np.array([len(r) for r in rows])
+    values = np.zeros((len(rows), lengths.max()))
+    for i, r in enumerate(rows):
+        values[i, : len(r)] = r
+    return SeriesPanel(
+        keys=[(i,) for i in range(len(rows))],
+        values=values,
+        start=np.zeros(len(rows), dtype="datetime64[D]"),
+        lengths=lengths,
+    )
+
+
+def classify_demand(y: np.ndarray, adi_threshold: float, cv2_threshold: float) -> str:
+    """Syntetos-Boylan class of one series from ADI and CV² of its non-zero demand."""
+    sizes = y[y > 0]
+    if not len(sizes):
+        return "intermittent"
+    adi = len(y) / len(sizes)
+    cv2 = sizes.var() / sizes.mean() ** 2 if sizes.mean() > 0 else 0.0
+    if adi >= adi_threshold:
+        return "lumpy" if cv2 >= cv2_threshold else "intermittent"
+    return "erratic" if cv2 >= cv2_threshold else "smooth"
+
+
+def init_pool_worker(overrides: dict) -> None:
+    """Forecast pool initializer used by tests: mark the worker and apply the test's settings."""
+    from app.services import forecast_service
+
+    forecast_service._mark_pool_worker()
+    for name, value in overrides.items():
+        setattr(forecast_service, name, value)
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import code_search_service
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/search/products", "/search/customers"])
+def test_search_rejects_blank_query(path):
+    assert client.get(path, params={"q": "   "}).status_code == 400
+    assert client.get(path, params={"q": ""}).status_code == 422
+    body = client.get(path, params={"q": " 2" if path.endswith("products") else " c0", "limit": 5}).json()
+    assert 0 < len(body["data"]) <= 5 <= body["total"]
+
+
+def test_prefix_search_matches_a_scan_of_the_index():
+    codes = code_search_service._current_state().products.codes
+    body = client.get("/search/products", params={"q": "2010", "limit": 3}).json()
+    matching = [c for c in codes if c.startswith("2010")]
+    assert body["total"] == len(matching)
+    assert [m["code"] for m in body["data"]] == matching[:3]
+
+
+def test_reload_rebuilds_the_index_before_any_search(pc_copy):
+    from app.services.pc_forecast_service import pc_results
+
+    client.get("/search/customers", params={"q": "C"})
+    path = pc_copy / "xgboost_results.json"
+    records = json.loads(path.read_text())
+    records[0] = {**records[0], "customer_code": "ZNEWCUSTOMER"}
+    path.write_text(json.dumps(records))
+    assert pc_results.refresh()
+
+    state = code_search_service._state
+    assert state.versions[0] == pc_results.current().version
+    assert "ZNEWCUSTOMER" in state.customers.codes
+    body = client.get("/search/customers", params={"q": "znew"}).json()
+    assert [m["code"] for m in body["data"]] == ["ZNEWCUSTOMER"]
+    assert body["data"][0]["models"] == {"pc": ["XGBoost"]}
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.services import forecast_service
+from reference import classify_demand, panel_from_rows, random_panel_rows
+
+
+def test_demand_classes_match_reference():
+    rows = random_panel_rows(60, seed=4, min_len=1, max_len=45)
+    rows.append(np.zeros(10))
+    got = forecast_service._classify_demand(panel_from_rows(rows))
+    expected = [
+        classify_demand(y, forecast_service.AUTO_ADI_THRESHOLD, forecast_service.AUTO_CV2_THRESHOLD) for y in rows
+    ]
+    assert list(got) == expected
+    assert len(set(expected)) > 1
+
+
+def test_auto_merges_each_class_forecast_in_input_order():
+    rows = random_panel_rows(30, seed=8, min_len=5, max_len=40)
+    panel = panel_from_rows(rows)
+    labels = forecast_service._classify_demand(panel)
+    preds, degraded, info = forecast_service._forecast_auto(panel, 5)
+
+    assert degraded == []
+    assert sum(r["count"] for r in info["routing"].values()) == len(rows)
+    for i, label in enumerate(labels):
+        model = forecast_service.AUTO_ROUTING[label]
+        single, _ = forecast_service._forecast_many(panel.take(np.array([i])), 5, model)
+        np.testing.assert_allclose(preds[i], single[0], rtol=1e-12, atol=1e-12)
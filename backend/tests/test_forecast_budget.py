@@ -0,0 +1,65 @@
+import time
+from time import perf_counter
+
+import numpy as np
+import pytest
+
+from app.services import forecast_service
+from reference import random_panel_rows
+
+DELAY = 0.02  # seconds per item of _slow_double
+
+
+def _slow_double(chunk, delay):
+    time.sleep(delay * len(chunk))
+    return [x * 2 for x in chunk]
+
+
+@pytest.fixture(params=["serial", "pool"])
+def engine(request, forecast_settings):
+    forecast_settings(FORECAST_BUDGET_CHUNK_SIZE=2, RF_N_ESTIMATORS=10)
+    if request.param == "serial":
+        forecast_settings(FORECAST_WORKERS=1)
+    else:
+        forecast_settings(FORECAST_WORKERS=2, FORECAST_PARALLEL_MIN_SERIES=1)
+        # start the workers now so their start-up does not eat into the deadlines under test
+        forecast_service._map_chunks(_slow_double, list(range(4)), 0.1)
+    return request.param
+
+
+def test_generous_deadline_returns_every_result(engine):
+    items = list(range(40))
+    got = forecast_service._map_chunks(_slow_double, items, DELAY, deadline=perf_counter() + 30)
+    assert got == [x * 2 for x in items]
+
+
+def test_short_deadline_keeps_finished_chunks_and_stops_in_time(engine):
+    items = list(range(200))  # ~4 s of work in total
+    budget = 0.5
+    t0 = perf_counter()
+    got = forecast_service._map_chunks(_slow_double, items, DELAY, deadline=t0 + budget)
+    elapsed = perf_counter() - t0
+
+    done = [x for x in got if x is not None]
+    assert 0 < len(done) < len(items)
+    assert all(g is None or g == x * 2 for g, x in zip(got, items))
+    # at most one small chunk per worker may still be running when the deadline passes
+    assert elapsed < budget + 2 * DELAY * 2 + 0.5
+
+
+def test_reasonable_budget_is_not_degraded(engine):
+    rows = random_panel_rows(40, seed=5, min_len=20)
+    panel = forecast_service.SeriesPanel(
+        keys=[(i,) for i in range(len(rows))],
+        values=np.array([np.pad(r, (0, 60 - len(r))) for r in rows]),
+        start=np.full(len(rows), np.datetime64("2024-01-01")),
+        lengths=np.array([len(r) for r in rows]),
+    )
+    t0 = perf_counter()
+    unbudgeted, _ = forecast_service._run_forecast(panel, 7, "rf", ["id"])
+    took = perf_counter() - t0
+
+    deadline = perf_counter() + 5 * took + 5
+    preds, meta = forecast_service._run_forecast(panel, 7, "rf", ["id"], deadline)
+    assert meta["degraded_count"] == 0
+    np.testing.assert_allclose(preds, unbudgeted)
@@ -0,0 +1,88 @@
+import pickle
+
+import pytest
+
+from app.services import forecast_cache, forecast_service
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(forecast_cache, "_memory", forecast_cache.OrderedDict())
+    monkeypatch.setattr(forecast_cache, "_memory_bytes", 0)
+    monkeypatch.setattr(forecast_service, "FORECAST_CACHE_ENABLED", True)
+    return forecast_cache
+
+
+def _result(n, degraded=0):
+    items = [{"product_id": str(i), "date": "2025-01-01", "forecast": float(i)} for i in range(n)]
+    meta = {"horizon": 1, "model": "naive", "fit_ms": 1.0}
+    if degraded:
+        meta.update(degraded_count=degraded, degraded=[{"product_id": "0"}])
+    return {"forecast": items, "meta": meta}
+
+
+def _run(content, result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pickle.loads(pickle.dumps(result))
+
+    out = forecast_service._cached_forecast("product", content, 1, "naive", None, compute)
+    return out, len(calls)
+
+
+def test_miss_then_hit_from_memory_and_disk(cache):
+    result = _result(50)
+    out, computed = _run(b"csv-a", result)
+    assert computed == 1 and out["meta"]["cache"] == "miss"
+
+    out, computed = _run(b"csv-a", result)
+    assert computed == 0 and out["meta"]["cache"] == "hit"
+    assert out["forecast"] == result["forecast"]
+
+    # a fresh process only has the disk layer
+    cache._memory.clear()
+    cache._memory_bytes = 0
+    out, computed = _run(b"csv-a", result)
+    assert computed == 0 and out["forecast"] == result["forecast"]
+
+    _, computed = _run(b"csv-b", result)
+    assert computed == 1
+
+
+def test_hits_return_independent_copies(cache):
+    _run(b"csv", _result(3))
+    first, _ = _run(b"csv", _result(3))
+    first["forecast"].clear()
+    second, _ = _run(b"csv", _result(3))
+    assert len(second["forecast"]) == 3
+
+
+def test_degraded_results_are_not_stored(cache):
+    _, computed = _run(b"csv", _result(5, degraded=1))
+    assert computed == 1
+    _, computed = _run(b"csv", _result(5, degraded=1))
+    assert computed == 1
+    assert not list(cache.CACHE_DIR.glob("*.joblib"))
+    assert not cache._memory
+
+
+def test_memory_budget_counts_held_bytes_and_evicts_lru(cache, monkeypatch):
+    size = len(pickle.dumps(_result(200), protocol=pickle.HIGHEST_PROTOCOL))
+    monkeypatch.setattr(cache, "FORECAST_CACHE_MEMORY_BYTES", int(size * 2.5))
+    for name in (b"a", b"b", b"c"):
+        _run(name, _result(200))
+    assert len(cache._memory) == 2
+    assert cache._memory_bytes == sum(len(b) for b in cache._memory.values()) <= cache.FORECAST_CACHE_MEMORY_BYTES
+    key_a = forecast_service.cache_key(b"a", "product", "naive", 1, forecast_service._engine_fingerprint())
+    assert key_a not in cache._memory  # least recently used went first
+
+
+def test_disk_budget_evicts_oldest_files(cache, monkeypatch):
+    _run(b"a", _result(200))
+    file_size = next(cache.CACHE_DIR.glob("*.joblib")).stat().st_size
+    monkeypatch.setattr(cache, "FORECAST_CACHE_DISK_BYTES", int(file_size * 1.5))
+    _run(b"b", _result(200))
+    assert len(list(cache.CACHE_DIR.glob("*.joblib"))) == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from app.services import forecast_service
+from reference import global_forecast, random_panel_rows
+
+HORIZON = 6
+
+
+def _ar_series(seed, n=40, a=0.6, b=0.3):
+    """y(t) = a*y(t-1) + b*y(t-7): scale-free, so every series shares one pooled fit."""
+    rng = np.random.default_rng(seed)
+    y = list(rng.uniform(5, 50, 7) * (seed + 1))
+    while len(y) < n + HORIZON:
+        y.append(a * y[-1] + b * y[-7])
+    return np.array(y[:n]), np.array(y[n:])
+
+
+def test_global_linreg_recovers_a_shared_recursion():
+    series = [_ar_series(seed) for seed in range(5)]
+    preds = forecast_service._forecast_global([y for y, _ in series], HORIZON, "linreg")
+    np.testing.assert_allclose(preds, [future for _, future in series], rtol=1e-6)
+
+
+def test_global_linreg_matches_pooled_reference():
+    rows = random_panel_rows(25, seed=6, min_len=1, max_len=50)
+    got = forecast_service._forecast_global(rows, HORIZON, "linreg")
+    np.testing.assert_allclose(got, global_forecast(rows, HORIZON, LinearRegression()), rtol=1e-7, atol=1e-6)
+
+
+def test_global_rf_matches_pooled_reference(monkeypatch):
+    monkeypatch.setattr(forecast_service, "GLOBAL_RF_N_ESTIMATORS", 20)
+    rows = random_panel_rows(15, seed=7, min_len=1, max_len=40)
+    model = RandomForestRegressor(
+        n_estimators=20,
+        max_depth=forecast_service.GLOBAL_RF_MAX_DEPTH or None,
+        min_samples_leaf=forecast_service.GLOBAL_RF_MIN_SAMPLES_LEAF,
+        random_state=42,
+    )
+    got = forecast_service._forecast_global(rows, HORIZON, "rf")
+    np.testing.assert_allclose(got, global_forecast(rows, HORIZON, model), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("model", ["global_linreg", "global_rf"])
+def test_shapes_and_short_series(model, monkeypatch):
+    monkeypatch.setattr(forecast_service, "GLOBAL_RF_N_ESTIMATORS", 5)
+    long_rows = [y for y, _ in (_ar_series(seed) for seed in range(3))]
+    short = np.array([4.0, 0.0, 6.0])  # too short to give a lag row of its own
+    rows = long_rows + [short, np.zeros(0)]
+    preds = forecast_service._forecast_global(rows, HORIZON, model.split("_", 1)[1])
+
+    assert len(preds) == len(rows) and all(len(p) == HORIZON for p in preds)
+    assert preds[-1] == [0.0] * HORIZON  # empty series
+    # the short series is forecast from the pooled fit, not just repeated
+    assert preds[-2] != [short[-1]] * HORIZON and min(preds[-2]) >= 0.0
+
+
+def test_too_few_pooled_rows_fall_back_to_naive():
+    rows = [np.arange(1.0, 11.0), np.array([3.0, 1.0])]  # 3 lag rows in total
+    assert forecast_service._forecast_global(rows, 4, "linreg") == [[10.0] * 4, [1.0] * 4]
+    assert forecast_service._forecast_global(rows, 0, "linreg") == [[], []]
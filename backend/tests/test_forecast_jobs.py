@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import forecast_job_service
+
+client = TestClient(app)
+
+CSV = b"date,product_code,quantity_sold\n2025-01-01,P1,3\n2025-01-02,P1,4\n"
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    """Replace the product forecast runner (it writes to the database) with a controllable fake."""
+    release = threading.Event()
+    calls = []
+
+    def run(content, horizon, model, db, time_budget_ms):
+        calls.append((content, horizon, model, time_budget_ms))
+        release.wait(10)
+        if model == "broken":
+            raise ValueError("Thiếu cột quantity_sold")
+        return {"status": "success", "horizon": horizon, "model": model}
+
+    monkeypatch.setattr(forecast_job_service, "_RUNNERS", {"product": run})
+    yield release, calls
+    release.set()
+
+
+def _submit(model="arima", **form):
+    r = client.post(
+        "/forecast/jobs/product",
+        files={"file": ("sales.csv", CSV, "text/csv")},
+        data={"horizon": "5", "model": model, **form},
+    )
+    assert r.status_code == 200
+    return r.json()["job_id"]
+
+
+def _wait_for(job_id, status):
+    for _ in range(200):
+        body = client.get(f"/forecast/jobs/{job_id}").json()
+        if body["status"] == status:
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {status}: {body}")
+
+
+def test_job_runs_to_completion(runner):
+    release, calls = runner
+    job_id = _submit(time_budget_ms="500")
+
+    pending = client.get(f"/forecast/jobs/{job_id}/result")
+    assert pending.status_code == 202
+    assert pending.json()["status"] in ("queued", "running")
+
+    release.set()
+    status = _wait_for(job_id, "finished")
+    assert status["error"] is None and status["time_budget_ms"] == 500
+    result = client.get(f"/forecast/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json() == {"status": "success", "horizon": 5, "model": "arima"}
+    assert calls == [(CSV, 5, "arima", 500)]
+
+
+def test_failed_job_surfaces_its_error(runner):
+    release, _ = runner
+    release.set()
+    job_id = _submit(model="broken")
+    status = _wait_for(job_id, "failed")
+    assert status["error"] == "Thiếu cột quantity_sold"
+    result = client.get(f"/forecast/jobs/{job_id}/result")
+    assert result.status_code == 500
+    assert result.json()["detail"] == {"status": "failed", "message": "Thiếu cột quantity_sold"}
+
+
+def test_unknown_job_is_404():
+    assert client.get("/forecast/jobs/nope").status_code == 404
+    assert client.get("/forecast/jobs/nope/result").status_code == 404
+
+
+def test_full_queue_is_429(runner, monkeypatch):
+    monkeypatch.setattr(forecast_job_service, "FORECAST_JOB_MAX_PENDING", 1)
+    _submit()
+    r = client.post("/forecast/jobs/product", files={"file": ("sales.csv", CSV, "text/csv")})
+    assert r.status_code == 429
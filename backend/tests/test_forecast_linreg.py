@@ -0,0 +1,34 @@
+import numpy as np
+
+from app.services import forecast_service
+from reference import linreg_forecast, panel_from_rows, random_panel_rows
+
+
+def test_batched_linreg_matches_per_series_fit():
+    # lengths from 1 day: too short to fit (naive forecast) up to well past the lag window
+    rows = random_panel_rows(40, seed=11, min_len=1, max_len=45)
+    rows.append(np.zeros(20))
+    got = forecast_service._forecast_batch_linreg(rows, 9)
+    expected = [linreg_forecast(y, 9) for y in rows]
+    np.testing.assert_allclose(got, expected, rtol=1e-7, atol=1e-6)
+
+
+def test_collinear_and_constant_lags_match_minimum_norm_fit():
+    t = np.arange(40, dtype=float)
+    rows = [
+        np.full(30, 5.0),  # constant: both lags centered to zero
+        np.tile([3.0, 0.0, 1.0, 8.0, 2.0, 5.0], 6),  # period 6: y(t-1) == y(t-7)
+        10 + 2.5 * t,  # linear trend: the centered lags coincide
+        np.r_[np.zeros(20), 4.0, np.zeros(9)],  # a single demand spike
+    ]
+    got = forecast_service._forecast_batch_linreg(rows, 9)
+    expected = [linreg_forecast(y, 9) for y in rows]
+    np.testing.assert_allclose(got, expected, rtol=1e-7, atol=1e-6)
+
+
+def test_linreg_dispatch_uses_the_batched_solver():
+    rows = random_panel_rows(6, seed=2)
+    panel = panel_from_rows(rows)
+    preds, degraded = forecast_service._forecast_many(panel, 5, "linear_regression", deadline=0.0)
+    assert degraded == []
+    np.testing.assert_allclose(preds, [linreg_forecast(y, 5) for y in rows], rtol=1e-7, atol=1e-6)
@@ -0,0 +1,45 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import forecast_service
+from reference import random_panel_rows
+
+
+@pytest.fixture
+def pool(forecast_settings):
+    forecast_settings(FORECAST_WORKERS=2, FORECAST_PARALLEL_MIN_SERIES=1, RF_N_ESTIMATORS=10)
+
+
+@pytest.mark.parametrize("chunk_size", [0, 3])
+def test_pooled_results_match_serial_in_input_order(pool, forecast_settings, chunk_size):
+    forecast_settings(FORECAST_CHUNK_SIZE=chunk_size)
+    rows = random_panel_rows(20, seed=9)
+    got = forecast_service._map_chunks(forecast_service._forecast_rf_chunk, rows, 5)
+    np.testing.assert_allclose(got, forecast_service._forecast_rf_chunk(rows, 5))
+
+
+def test_concurrent_callers_share_one_pool(pool, monkeypatch):
+    created = []
+    executor = forecast_service.ProcessPoolExecutor
+
+    def counting_executor(*args, **kwargs):
+        created.append(kwargs["mp_context"].get_start_method())
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(forecast_service, "ProcessPoolExecutor", counting_executor)
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def get():
+        barrier.wait()
+        pools.append(forecast_service._get_process_pool())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1 and len({id(p) for p in pools}) == 1
+    assert created[0] == forecast_service.FORECAST_POOL_START_METHOD != "fork"
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import forecast_service
+from reference import resample_daily
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(5)
+    n = 400
+    days = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 60, n), unit="D")
+    df = pd.DataFrame(
+        {
+            "date": [d.strftime("%Y-%m-%d") for d in days],
+            "product_code": rng.choice(["P1", "P2", "P3", "P10"], n),
+            "customer_code": rng.choice(["C1", "C2"], n),
+            "quantity_sold": np.round(rng.gamma(2.0, 10.0, n), 2),
+        }
+    )
+    df.loc[5, "date"] = "not a date"
+    df.loc[2, "quantity_sold"] = np.nan
+    df.loc[3, "product_code"] = None
+    return df
+
+
+@pytest.mark.parametrize("group_cols", [["product_code"], ["product_code", "customer_code"]])
+def test_panel_matches_per_group_resample(sales, group_cols):
+    panel = forecast_service._resample_series(sales, group_cols)
+    expected = resample_daily(sales, group_cols)
+    assert panel.keys == [key for key, _ in expected]
+    for i, (_, series) in enumerate(expected):
+        assert panel.start[i] == series.index[0].to_datetime64().astype("datetime64[D]")
+        assert panel.lengths[i] == len(series)
+        np.testing.assert_allclose(panel.row(i), series.to_numpy(), rtol=1e-12)
+        assert not panel.values[i, panel.lengths[i] :].any()  # padding stays zero
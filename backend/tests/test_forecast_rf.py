@@ -0,0 +1,50 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from app.services import forecast_service
+from reference import random_panel_rows, rf_forecast
+
+N_ESTIMATORS = 25
+
+
+@pytest.fixture
+def small_forest(forecast_settings):
+    forecast_settings(RF_N_ESTIMATORS=N_ESTIMATORS, RF_MAX_DEPTH=0, RF_ROLLOUT_BATCH=4)
+
+
+def test_compiled_forest_rollout_matches_sklearn(small_forest):
+    rows = random_panel_rows(10, seed=3)
+    got = forecast_service._forecast_rf_chunk(rows, 7)
+    expected = [rf_forecast(y, 7, N_ESTIMATORS) for y in rows]
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
+
+
+def _pool_flag():
+    return forecast_service._in_pool_worker
+
+
+def _report_flag(queue):
+    queue.put(forecast_service._in_pool_worker)
+
+
+def test_only_pool_workers_build_trees_single_threaded(small_forest, monkeypatch):
+    seen = []
+    fit = forecast_service._fit_rf_table
+    monkeypatch.setattr(forecast_service, "_fit_rf_table", lambda v, n_jobs: seen.append(n_jobs) or fit(v, n_jobs))
+    forecast_service._forecast_rf_chunk(random_panel_rows(2), 3)
+    assert set(seen) == {forecast_service.RF_N_JOBS}
+
+    # any other child process (e.g. a uvicorn worker) keeps using RF_N_JOBS
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    child = ctx.Process(target=_report_flag, args=(queue,))
+    child.start()
+    child.join()
+    assert queue.get(timeout=5) is False
+
+    try:
+        assert forecast_service._get_process_pool().submit(_pool_flag).result(timeout=30) is True
+    finally:
+        forecast_service.shutdown_process_pool()
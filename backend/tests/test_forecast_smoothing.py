@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from app.services import forecast_service
+from reference import croston_forecast, holt_winters_forecast, panel_from_rows, random_panel_rows, ses_forecast
+
+HORIZON = 9
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rows = random_panel_rows(40, seed=11, min_len=1, max_len=45)
+    rows.append(np.zeros(20))  # no demand at all
+    return panel_from_rows(rows)
+
+
+def test_ses_matches_reference(panel):
+    got = forecast_service._forecast_ses(panel.values, panel.lengths, HORIZON, alpha=0.3)
+    expected = [ses_forecast(y, HORIZON, 0.3) for y in panel.rows()]
+    np.testing.assert_allclose(got, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("sba", [False, True])
+def test_croston_matches_reference(panel, sba):
+    got = forecast_service._forecast_croston(panel.values, panel.lengths, HORIZON, sba=sba, alpha=0.15)
+    expected = [croston_forecast(y, HORIZON, 0.15, sba=sba) for y in panel.rows()]
+    np.testing.assert_allclose(got, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_holt_winters_matches_reference(panel):
+    assert (panel.lengths >= 14).any() and (panel.lengths < 14).any()
+    got = forecast_service._forecast_holt_winters(
+        panel.values, panel.lengths, HORIZON, m=7, alpha=0.3, beta=0.05, gamma=0.2
+    )
+    # series shorter than two seasons fall back to SES with the configured alpha
+    expected = [holt_winters_forecast(y, HORIZON, 7, 0.3, 0.05, 0.2, forecast_service.SES_ALPHA) for y in panel.rows()]
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
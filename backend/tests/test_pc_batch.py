@@ -0,0 +1,34 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+PC_KEY = {"customer_code": "C0000457", "product_code": "20100590", "model": "XGBoost"}
+PC_MISSING = {"customer_code": "C0000457", "product_code": "NOPE", "model": "XGBoost"}
+
+
+def test_batch_streams_one_line_per_item_in_order():
+    items = [
+        {**PC_KEY, "forecast_weeks": 2},
+        {**PC_MISSING},
+        {"customer_code": " c0000457", "product_code": "20100590", "model": "xgboost"},
+        {**PC_KEY, "model": "NoSuchModel"},
+    ]
+    r = client.post("/pc-forecast/batch", json={"items": items})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(line["index"], line["status"]) for line in lines] == [
+        (0, "ok"), (1, "not_found"), (2, "ok"), (3, "not_found")
+    ]
+
+    single = client.get("/pc-forecast", params={**PC_KEY, "forecast_weeks": 2}).json()
+    assert lines[0]["data"] == single["data"]
+    assert lines[2]["data"] == client.get("/pc-forecast", params=PC_KEY).json()["data"]
+
+
+def test_batch_rejects_invalid_items():
+    assert client.post("/pc-forecast/batch", json={"items": [{**PC_KEY, "forecast_weeks": 5}]}).status_code == 422
@@ -0,0 +1,181 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+# No `with` block: startup (DB init, background reloaders) is skipped and the watchers load inline
+client = TestClient(app)
+
+PC_KEY = {"customer_code": "C0000457", "product_code": "20100590", "model": "XGBoost"}
+PC_MISSING = {"customer_code": "C0000457", "product_code": "NOPE", "model": "XGBoost"}
+SKU_KEY = {"product_code": "20100002", "model": "Holt-Winters"}
+SKU_MISSING = {"product_code": "NOPE", "model": "Holt-Winters"}
+
+
+@pytest.mark.parametrize(
+    "path, found, missing",
+    [("/pc-forecast", PC_KEY, PC_MISSING), ("/forecast/sku", SKU_KEY, SKU_MISSING)],
+)
+def test_conditional_get(path, found, missing):
+    first = client.get(path, params=found)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get(path, params=found, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert client.get(path, params=found, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get(path, params=found, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get(path, params=found, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+    assert client.get(path, params=missing).status_code == 404
+    assert client.get(path, params=missing, headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get(path, params=found, headers={"If-None-Match": "*"}).status_code == 200
+
+
+def test_cached_body_is_reused():
+    first = client.get("/pc-forecast", params=PC_KEY)
+    second = client.get("/pc-forecast", params=PC_KEY)
+    assert second.headers["x-cache"] == "hit"
+    assert second.content == first.content
+
+
+def test_compare_echoes_normalized_codes():
+    exact = client.get("/pc-forecast/compare", params={"customer_code": "C0000457", "product_code": "20100590"})
+    spelled = client.get("/pc-forecast/compare", params={"customer_code": " c0000457 ", "product_code": "20100590 "})
+    assert exact.status_code == spelled.status_code == 200
+    assert spelled.headers["etag"] == exact.headers["etag"]
+    assert spelled.json() == exact.json()
+    body = exact.json()
+    assert (body["customer_code"], body["product_code"]) == ("C0000457", "20100590")
+    assert "XGBoost" in body["models"]
+    assert sorted(body["models"] + body["missing_models"]) == client.get("/pc-forecast/models").json()["models"]
+
+
+def test_reload_invalidates_bodies_and_etags(pc_copy):
+    from app.services import pc_forecast_service
+
+    first = client.get("/pc-forecast", params=PC_KEY)
+    compare = client.get("/pc-forecast/compare", params=PC_KEY)
+    assert first.status_code == compare.status_code == 200
+
+    path = pc_copy / "xgboost_results.json"
+    records = [
+        r for r in json.loads(path.read_text())
+        if (r["customer_code"], r["product_code"]) != (PC_KEY["customer_code"], PC_KEY["product_code"])
+    ]
+    path.write_text(json.dumps(records))
+    assert pc_forecast_service.pc_results.refresh()
+    # the cross-model index is rebuilt by the reload itself, before any request reads it
+    registry = pc_forecast_service.pc_results.current()
+    assert pc_forecast_service._state.version == registry.version
+
+    assert client.get("/pc-forecast", params=PC_KEY, headers={"If-None-Match": first.headers["etag"]}).status_code == 404
+    after = client.get("/pc-forecast/compare", params=PC_KEY, headers={"If-None-Match": compare.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != compare.headers["etag"]
+    assert "XGBoost" in after.json()["missing_models"]
+
+
+def _walk(path, params):
+    records, cursor, totals = [], None, set()
+    while True:
+        r = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["count"] == len(body["data"])
+        totals.add(body["total"])
+        records += body["data"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return records, totals
+
+
+def test_sku_list_cursor_walk():
+    full = client.get("/forecast/sku/list", params={"page_size": 10000}).json()
+    assert full["next_cursor"] is None and full["count"] == full["total"]
+
+    records, totals = _walk("/forecast/sku/list", {"page_size": 7, "fields": "product_code,model,metrics"})
+    assert totals == {full["total"]}
+    assert [(r["product_code"], r["model"]) for r in records] == [(r["product_code"], r["model"]) for r in full["data"]]
+    assert set(records[0]) == {"product_code", "model", "metrics"}
+    assert records[0]["metrics"] == full["data"][0]["metrics"]
+
+    lightgbm, _ = _walk("/forecast/sku/list", {"page_size": 5, "model": "lightgbm"})
+    assert lightgbm and {r["model"] for r in lightgbm} == {"LightGBM"}
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/forecast/sku/list", {"cursor": "not-a-cursor"}),
+        ("/forecast/sku/list", {"cursor": "WzEsMl0="}),  # [1,2]: wrong width and types
+        ("/forecast/sku/list", {"fields": "product_code,nope"}),
+        ("/forecast/sku/list", {"product_code": "NOPE", "cursor": "not-a-cursor"}),
+        # no RandomForest result files are shipped, so this listing is empty
+        ("/forecast/product-customer/randomforest", {"cursor": "not-a-cursor"}),
+    ],
+)
+def test_listing_rejects_bad_parameters(path, params):
+    assert client.get(path, params=params).status_code == 400
+
+
+def test_sku_path_is_the_single_record_lookup():
+    assert client.get("/forecast/sku", params=SKU_KEY).json()["product_code"] == SKU_KEY["product_code"]
+    assert client.get("/forecast/sku").status_code == 422
+
+
+def _raw_pc_records(model_file):
+    from app.services.pc_forecast_service import DATA_DIR
+
+    return json.loads((DATA_DIR / model_file).read_text())
+
+
+def test_rollup_matches_brute_force_and_names_the_canonical_model():
+    body = client.get("/pc-forecast/rollup", params={"model": "xgboost", "group_by": "product", "forecast_weeks": 2})
+    canonical = client.get("/pc-forecast/rollup", params={"model": "XGBoost", "group_by": "product", "forecast_weeks": 2})
+    assert body.status_code == 200
+    assert body.json()["model"] == "XGBoost"
+    assert body.content == canonical.content and body.headers["etag"] == canonical.headers["etag"]
+
+    expected = {}
+    for r in _raw_pc_records("xgboost_results.json"):
+        product = str(r["product_code"]).strip().upper()
+        for point in r["forecast"][:2]:
+            total = expected.setdefault(product, [0.0, 0])
+            total[0] += point["yhat"]
+            total[1] += 1
+    data = body.json()["data"]
+    assert {row["product_code"] for row in data} == set(expected)
+    for row in data:
+        assert row["yhat"] == pytest.approx(expected[row["product_code"]][0])
+        assert row["points"] == expected[row["product_code"]][1]
+    assert body.json()["totals"]["points"] == sum(n for _, n in expected.values())
+
+
+@pytest.mark.parametrize(
+    "path, spellings, canonical",
+    [
+        ("/pc-forecast/leaderboard", ["xgboost", "XGBOOST"], "XGBoost"),
+        ("/forecast/sku/leaderboard", ["lightgbm", " LightGBM "], "LightGBM"),
+        ("/forecast/sku/leaderboard", ["holt-winters"], "Holt-Winters"),
+    ],
+)
+def test_leaderboards_name_the_canonical_model(path, spellings, canonical):
+    expected = client.get(path, params={"model": canonical, "metric": "MAPE", "limit": 5})
+    assert expected.status_code == 200 and expected.json()["model"] == canonical
+    for spelling in spellings:
+        r = client.get(path, params={"model": spelling, "metric": "MAPE", "limit": 5})
+        assert r.content == expected.content
+
+
+def test_pc_leaderboard_matches_brute_force():
+    body = client.get("/pc-forecast/leaderboard", params={"model": "XGBoost", "metric": "MAPE", "limit": 10}).json()
+    values = sorted(
+        (r["metrics"]["MAPE"] for r in _raw_pc_records("xgboost_results.json") if r["metrics"].get("MAPE") is not None),
+        reverse=True,
+    )
+    assert body["total"] == len(values)
+    assert [row["rank"] for row in body["data"]] == list(range(1, 11))
+    assert [row["value"] for row in body["data"]] == pytest.approx(values[:10])
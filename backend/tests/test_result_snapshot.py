@@ -0,0 +1,104 @@
+import json
+import multiprocessing
+import os
+import random
+import time
+
+import pytest
+
+from app.services import result_snapshot
+from app.services.pc_forecast_service import PC_SCHEMA, DATA_DIR as PC_DIR, _normalize_record, _parse_model_file
+from app.services.result_snapshot import Field, SnapshotBusy, load_snapshot
+from app.services.result_watcher import ResultWatcher
+
+SCHEMA = (
+    Field("code", "str"),
+    Field("value", "float"),
+    Field("forecast", "series", ("yhat",)),
+    Field("cumsum", "vector", hidden=True),
+)
+
+
+def _write_source(path, n=50):
+    recs = [
+        {"code": f"P{i:03d}", "value": i / 2 if i % 5 else None, "forecast": [{"date": "2025-01-0%d" % (d + 1), "yhat": i + d} for d in range(3)], "cumsum": [i, 2 * i]}
+        for i in range(n)
+    ]
+    path.write_text(json.dumps(recs))
+    return recs
+
+
+def _slow_parse(path):
+    for rec in result_snapshot.iter_json_records(path):
+        time.sleep(0.002)
+        yield rec
+
+
+def test_snapshot_records_match_normalized_source():
+    source = PC_DIR / "xgboost_results.json"
+    expected = [_normalize_record(r) for r in json.loads(source.read_text())]
+    snapshot = load_snapshot(source, "pc", PC_SCHEMA, _parse_model_file)
+    got = snapshot.records()
+    assert len(got) == len(expected)
+    for record, exp in zip(got, expected):
+        assert dict(record) == {k: v for k, v in exp.items() if k != "forecast_cumsum"}
+        assert record["forecast_cumsum"] == pytest.approx(exp["forecast_cumsum"])
+
+
+def _slow_rename(src, dst, _rename=os.rename):
+    # Widens the gap between moving the old snapshot away and moving the new one in
+    _rename(src, dst)
+    time.sleep(0.05)
+
+
+def _load_in_child(source, force, barrier, queue):
+    result_snapshot.os.rename = _slow_rename
+    barrier.wait()
+    time.sleep(random.random() * 0.05)
+    try:
+        snapshot = load_snapshot(source, "race", SCHEMA, _slow_parse, force=force)
+        queue.put(("ok", [dict(r) for r in snapshot.records()]))
+    except Exception as e:  # noqa: BLE001
+        queue.put(("error", repr(e)))
+
+
+@pytest.mark.parametrize("force", [False, True])
+def test_concurrent_compiles_all_succeed(tmp_path, force):
+    source = tmp_path / "race.json"
+    recs = _write_source(source)
+    ctx = multiprocessing.get_context("fork")
+    n = 6
+    barrier, queue = ctx.Barrier(n), ctx.Queue()
+    children = [ctx.Process(target=_load_in_child, args=(source, force, barrier, queue)) for _ in range(n)]
+    for c in children:
+        c.start()
+    outcomes = [queue.get(timeout=60) for _ in children]
+    for c in children:
+        c.join()
+    assert [status for status, _ in outcomes] == ["ok"] * n, outcomes
+    expected = [{k: v for k, v in r.items() if k != "cumsum"} for r in recs]
+    for _, records in outcomes:
+        assert [r["code"] for r in records] == [r["code"] for r in expected]
+        assert records[1]["value"] == 0.5 and records[5]["value"] is None
+
+
+def test_watcher_retries_transient_failures_but_pins_real_ones(tmp_path):
+    (tmp_path / "a.json").write_text("[]")
+    (tmp_path / "b.json").write_text("[]")
+    calls = {"a.json": 0, "b.json": 0}
+
+    def load(path):
+        calls[path.name] += 1
+        if path.name == "a.json" and calls["a.json"] == 1:
+            raise SnapshotBusy("swapped by another worker")
+        if path.name == "b.json":
+            raise ValueError("broken file")
+        return [path.name]
+
+    watcher = ResultWatcher("t", tmp_path, "*.json", load, interval_s=0)
+    watcher.refresh()
+    assert "a.json" not in watcher.current().entries
+    watcher.refresh()
+    assert watcher.current().entries["a.json"] == ["a.json"]
+    assert calls == {"a.json": 2, "b.json": 1}  # b is not retried until it changes
+    assert "b.json" in watcher.errors
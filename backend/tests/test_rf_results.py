@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import rf_pc_results
+
+client = TestClient(app)
+
+
+def _record(customer, product, mape):
+    return {
+        "CustomerCode": customer,
+        "ProductCode": product,
+        "MAPE": mape,
+        "TrainEndDate": "2025-01-05 00:00:00",
+        "forecast": [{"ds": f"2025-01-0{6 + d} 00:00:00", "yhat": d + 1.0} for d in range(3)],
+    }
+
+
+@pytest.fixture
+def rf_dir(tmp_path):
+    original = rf_pc_results.rf_results.data_dir
+    records = [_record(f"C{i % 3}", f"P{i:02d}", i / 10) for i in range(10)]
+    (tmp_path / "rf_a.json").write_text(json.dumps(records[:6]))
+    (tmp_path / "rf_b.json").write_text(json.dumps(records[6:]))
+    rf_pc_results.rf_results.data_dir = tmp_path
+    rf_pc_results.rf_results.refresh()
+    yield tmp_path
+    rf_pc_results.rf_results.data_dir = original
+    rf_pc_results.rf_results.refresh()
+
+
+def test_state_is_installed_by_the_reload(rf_dir):
+    registry = rf_pc_results.rf_results.current()
+    state = rf_pc_results._state
+    assert state.version == registry.version
+    assert len(state.records) == len(state.listing) == 10
+
+    (rf_dir / "rf_b.json").unlink()
+    assert rf_pc_results.rf_results.refresh()
+    assert len(rf_pc_results._state.records) == 6  # rebuilt by the listener, no request in between
+
+
+def test_listing_pages_and_filters(rf_dir):
+    path = "/forecast/product-customer/randomforest"
+    first = client.get(path, params={"limit": 4}).json()
+    assert first["total"] == 10 and len(first["data"]) == 4
+    second = client.get(path, params={"limit": 4, "cursor": first["next_cursor"]}).json()
+    keys = [(r["customer_code"], r["product_code"]) for r in first["data"] + second["data"]]
+    assert keys == sorted(keys) and len(set(keys)) == 8
+
+    c1 = client.get(path, params={"customer_code": "c1"}).json()
+    assert c1["total"] == 3 and {r["customer_code"] for r in c1["data"]} == {"C1"}
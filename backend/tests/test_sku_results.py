@@ -0,0 +1,42 @@
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import sku_forecast_service
+
+client = TestClient(app)
+
+
+def test_reload_builds_state_once_before_any_request(sku_copy, monkeypatch):
+    builds = []
+    build = sku_forecast_service._build_state
+    monkeypatch.setattr(sku_forecast_service, "_build_state", lambda registry: builds.append(registry.version) or build(registry))
+
+    path = sku_copy / "all_forecasts.json"
+    records = json.loads(path.read_text())
+    target = next(r for r in records if r["model"] == "Holt-Winters")
+    target["metrics"]["MAPE"] = 1e9
+    path.write_text(json.dumps(records))
+    assert sku_forecast_service.sku_results.refresh()
+    version = sku_forecast_service.sku_results.current().version
+    assert builds == [version] and sku_forecast_service._state.version == version
+
+    barrier = threading.Barrier(6)
+    bodies = []
+
+    def request():
+        barrier.wait()
+        bodies.append(
+            client.get("/forecast/sku/leaderboard", params={"model": "Holt-Winters", "metric": "MAPE", "limit": 1}).json()
+        )
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert builds == [version]  # requests only read the state installed by the reload
+    assert [b["data"][0]["value"] for b in bodies] == [1e9] * 6
+    assert bodies[0]["data"][0]["product_code"] == str(target["product_code"])